@@ -1,3 +1,17 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import BulkJob
+
+
+@admin.register(BulkJob)
+class BulkJobAdmin(admin.ModelAdmin):
+    list_display = [
+        "id",
+        "operation",
+        "status",
+        "processed_rows",
+        "total_rows",
+        "created_at",
+    ]
+    list_filter = ["operation", "status"]
+    readonly_fields = [field.name for field in BulkJob._meta.fields]
@@ -1,6 +1,21 @@
+import logging
+
 from django.apps import AppConfig
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # Crear restricciones e índices al iniciar, si así se configuró
+        if settings.NEO4J_BOOTSTRAP_SCHEMA:
+            from . import schema
+
+            try:
+                schema.bootstrap(report=logger.info)
+            except Exception:
+                logger.exception("No se pudo crear el esquema de Neo4j al iniciar")
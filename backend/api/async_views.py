@@ -0,0 +1,748 @@
+"""
+Versiones asíncronas de los endpoints de views.py.
+
+Usan el driver asíncrono de Neo4j (AsyncGraphDatabase), por lo que bajo un
+servidor ASGI (uvicorn, daphne) un solo proceso puede mantener cientos de
+consultas en curso sin bloquear un hilo por cada viaje a la base de datos.
+Reciben y retornan los mismos JSON que las vistas síncronas, y comparten con
+ellas la construcción de las consultas (cypher.py), las funciones de
+transacción (ver cypher.run_steps) y los serializers; aquí solo queda la
+ejecución con el driver asíncrono.
+"""
+
+import asyncio
+import functools
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+from neo4j.exceptions import Neo4jError
+
+from .serializers import (
+    NodeSerializer,
+    NodeBulkCreateSerializer,
+    NodeCreateSingleSerializer,
+    NodeCreateMultipleLabelsSerializer,
+    NodeSearchSerializer,
+    AggregatedDataSerializer,
+    MultiAggregatedDataSerializer,
+    MultipleNodesUpdateSerializer,
+    MultipleNodesPropertiesRemoveSerializer,
+    RelationshipCreationSerializer,
+    RelationshipBulkUpdateSerializer,
+    RelationshipBulkRemoveSerializer,
+    MultipleNodesDeleteWithChecksSerializer,
+    RelationshipBulkDeleteSerializer,
+    BulkStreamOptionsSerializer,
+    NodesUpdateStreamSerializer,
+    UserRecommendationSerializer,
+    HomeFeedSerializer,
+)
+from .neo4j_connection import async_neo4j_conn
+from .renderers import JsonResponse
+from . import (
+    bulk,
+    caching,
+    coercion,
+    cypher,
+    feed,
+    ndjson,
+    pagination,
+    parallel,
+    recommendations,
+    validation,
+)
+from .catalog import LABEL, RELATIONSHIP_TYPE, catalog
+
+
+def _check(serializer):
+    # La validación usa el catálogo (catalog.resolve) y los tipos de las
+    # propiedades (coercion), que al recargarse consultan la base con el driver
+    # síncrono. Los tipos se cargan aquí para que la construcción de la
+    # consulta, ya en el loop, no tenga que hacerlo.
+    coercion.registry.types()
+    return serializer.is_valid()
+
+
+async def _is_valid(serializer):
+    # En un hilo del executor, para no bloquear el loop con esas consultas
+    return await sync_to_async(_check, thread_sensitive=False)(serializer)
+
+
+async def _validate(serializer_class, request):
+    """
+    Equivalente a serializer_class(data=request.data) de DRF para vistas async.
+    Retorna (validated_data, None) o (None, respuesta de error).
+    """
+    try:
+        data = json.loads(request.body or b"{}")
+    except ValueError as e:
+        return None, JsonResponse({"detail": f"JSON parse error - {e}"}, status=400)
+
+    serializer = serializer_class(data=data)
+    if await _is_valid(serializer):
+        return serializer.validated_data, None
+    return None, JsonResponse(serializer.errors, status=400)
+
+
+_DONE = object()
+
+
+async def _iterate_in_thread(iterator):
+    """
+    Recorre un iterador síncrono en un hilo del executor: la lectura del cuerpo
+    NDJSON y la validación de cada fila (que también puede consultar el
+    catálogo) no bloquean el loop.
+    """
+    next_item = sync_to_async(next, thread_sensitive=False)
+    while True:
+        item = await next_item(iterator, _DONE)
+        if item is _DONE:
+            return
+        yield item
+
+
+async def _single(query, params=None):
+    async with async_neo4j_conn.session() as session:
+        result = await session.run(query, params)
+        return await result.single()
+
+
+async def _run_steps(tx, steps_fn, *args):
+    # Equivalente asíncrono de cypher.run_steps
+    steps = steps_fn(*args)
+    try:
+        query, params = next(steps)
+        while True:
+            result = await tx.run(query, params)
+            query, params = steps.send([record async for record in result])
+    except StopIteration as done:
+        return done.value
+
+
+async def _run_bulk_relationships(rels, props_fn, query_fn, mode=bulk.BEST_EFFORT):
+    groups = bulk.group_relationships(rels, props_fn)
+    try:
+        async with async_neo4j_conn.session() as session:
+            matched = await session.execute_write(
+                _run_steps, bulk.run_groups, groups, query_fn, mode
+            )
+    except bulk.PartialMatchError as e:
+        return e.matched, True
+    feed.cache.relationships_changed(rels)
+    return matched, False
+
+
+async def _run_chunk(chunk, query_fn):
+    # Equivalente asíncrono de parallel.run_chunk
+    attempt = 0
+    while True:
+        try:
+            async with async_neo4j_conn.session() as session:
+                async with await session.begin_transaction() as tx:
+                    matched = await _run_steps(tx, bulk.run_groups, chunk, query_fn)
+                    await tx.commit()
+            return matched, {}
+        except parallel.CHUNK_ERRORS as e:
+            attempt += 1
+            delay = parallel.retry_delay(e, attempt)
+            if delay is None:
+                return {}, parallel.chunk_failure(chunk, e)
+            await asyncio.sleep(delay)
+
+
+async def _run_parallel(groups, query_fn, chunk_size=None):
+    """
+    Equivalente asíncrono de parallel.run_parallel: en lugar de un pool de
+    hilos, a lo sumo BULK_PARALLEL_WORKERS lotes en curso a la vez en el loop.
+    """
+    chunks = parallel.partition_by_start_node(groups, chunk_size)
+    semaphore = asyncio.Semaphore(settings.BULK_PARALLEL_WORKERS)
+
+    async def run(chunk):
+        async with semaphore:
+            return await _run_chunk(chunk, query_fn)
+
+    return parallel.merge_results(await asyncio.gather(*map(run, chunks)))
+
+
+async def _ingest_ndjson(request, options, row_error, run_batch, not_found):
+    # Equivalente asíncrono de views._ingest_ndjson
+    batches = _iterate_in_thread(bulk.stream_batches(request, options, row_error))
+    report = bulk.StreamReport()
+
+    async with async_neo4j_conn.session() as session:
+        if options["mode"] == bulk.ALL_OR_NOTHING:
+            async with await session.begin_transaction() as tx:
+                async for batch, errors, read in batches:
+                    matched = await _run_steps(tx, run_batch, batch) if batch else {}
+                    report.add(batch, matched, errors, read, not_found)
+                if report.failed():
+                    await tx.rollback()
+                    return report, True
+                await tx.commit()
+        else:
+            async for batch, errors, read in batches:
+                matched = (
+                    await session.execute_write(_run_steps, run_batch, batch)
+                    if batch
+                    else {}
+                )
+                report.add(batch, matched, errors, read, not_found)
+    return report, False
+
+
+async def _stream_bulk_relationships(
+    request,
+    props_fn,
+    query_fn,
+    count_key,
+    message,
+    schema,
+    with_type=False,
+):
+    serializer = BulkStreamOptionsSerializer(data=request.GET)
+    if not await _is_valid(serializer):
+        return JsonResponse(serializer.errors, status=400)
+
+    written_types = set() if schema.new_names else None
+    report, rolled_back = await _ingest_ndjson(
+        request,
+        serializer.validated_data,
+        schema.row_error,
+        functools.partial(
+            bulk.relationships_batch,
+            props_fn=props_fn,
+            query_fn=query_fn,
+            written_types=written_types,
+        ),
+        functools.partial(bulk.not_found_errors, with_type=with_type),
+    )
+    if written_types and not rolled_back:
+        catalog.register(RELATIONSHIP_TYPE, written_types)
+    response_data, status = report.response(
+        count_key, message, bulk.RELATIONSHIPS_ROLLED_BACK if rolled_back else None
+    )
+    return JsonResponse(response_data, status=status)
+
+
+async def _stream_update_nodes(request):
+    serializer = NodesUpdateStreamSerializer(data=request.GET)
+    if not await _is_valid(serializer):
+        return JsonResponse(serializer.errors, status=400)
+
+    label = serializer.validated_data["label"]
+
+    report, rolled_back = await _ingest_ndjson(
+        request,
+        serializer.validated_data,
+        bulk.node_update_row_error,
+        functools.partial(bulk.update_nodes_batch, label),
+        bulk.nodes_not_found_errors,
+    )
+    if report.count and not rolled_back:
+        await caching.ainvalidate_labels([label])
+    response_data, status = report.response(
+        "updatedCount",
+        "Nodos actualizados correctamente",
+        bulk.NODES_ROLLED_BACK if rolled_back else None,
+    )
+    return JsonResponse(response_data, status=status)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def create_node_single_label(request):
+    data, error = await _validate(NodeCreateSingleSerializer, request)
+    if error:
+        return error
+
+    nodo_creado = await _single(cypher.create_node_single_label_query(data["label"]))
+    if nodo_creado:
+        await caching.ainvalidate_labels([data["label"]])
+        catalog.register(LABEL, [data["label"]])
+        return JsonResponse(
+            {
+                "message": "Nodo creado",
+                "node": {
+                    "id": nodo_creado["node_id"],
+                    "labels": nodo_creado["labels"],
+                },
+            }
+        )
+    return JsonResponse({"error": "No se pudo crear el nodo"}, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def create_node_multiple_labels(request):
+    data, error = await _validate(NodeCreateMultipleLabelsSerializer, request)
+    if error:
+        return error
+
+    labels = data.get("labels", [])
+    if not labels or len(labels) < 2:  # Validar que haya al menos 2 etiquetas
+        return JsonResponse(
+            {"error": "Debes proporcionar al menos dos labels."}, status=400
+        )
+
+    labels_str = ":".join(labels)
+    nodo_creado = await _single(cypher.create_node_multiple_labels_query(labels_str))
+    if nodo_creado:
+        await caching.ainvalidate_labels(labels)
+        catalog.register(LABEL, labels)
+        return JsonResponse(
+            {
+                "message": "Nodo con múltiples labels creado",
+                "labels_str": labels_str,
+                "node": {
+                    "id": nodo_creado["node_id"],
+                    "labels": nodo_creado["labels"],
+                },
+            }
+        )
+    return JsonResponse({"error": "No se pudo crear el nodo"}, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def create_node_with_properties(request):
+    data, error = await _validate(NodeSerializer, request)
+    if error:
+        return error
+
+    label = data.get("label")
+    properties = data.get("properties", {})
+
+    # Validar que al menos 5 propiedades sean proporcionadas
+    if len(properties) < 5:
+        return JsonResponse(
+            {"error": "Debes proporcionar al menos 5 propiedades."}, status=400
+        )
+
+    query = cypher.create_node_with_properties_query(label, properties)
+    nodo_creado = await _single(query, properties)
+    if nodo_creado:
+        await caching.ainvalidate_labels([label])
+        catalog.register(LABEL, [label])
+        return JsonResponse(
+            {
+                "message": "Nodo con propiedades creado",
+                "node": {
+                    "id": nodo_creado["node_id"],
+                    "labels": nodo_creado["labels"],
+                    "properties": cypher.serialize_properties(
+                        nodo_creado["properties"]
+                    ),
+                },
+            }
+        )
+    return JsonResponse({"error": "No se pudo crear el nodo"}, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def create_nodes_bulk(request):
+    if ndjson.is_ndjson(request):
+        serializer = NodeBulkCreateSerializer(data=request.GET)
+        if not await _is_valid(serializer):
+            return JsonResponse(serializer.errors, status=400)
+        data = serializer.validated_data
+        # El servidor ASGI ya dejó el cuerpo en un archivo temporal
+        rows = ndjson.request_objects(request)
+    else:
+        data, error = await _validate(NodeBulkCreateSerializer, request)
+        if error:
+            return error
+        rows = ((node, None) for node in data.get("nodes", []))
+
+    labels = data["labels"]
+    labels_str = ":".join(labels)
+    chunk_size = data.get("chunk_size", settings.BULK_CREATE_CHUNK_SIZE)
+
+    created, errors, total = {}, [], 0
+    async with async_neo4j_conn.session() as session:
+        chunks = _iterate_in_thread(bulk.node_chunks(rows, chunk_size))
+        async for chunk, chunk_errors, total in chunks:
+            errors.extend(chunk_errors)
+            if not chunk:
+                continue
+            try:
+                created.update(
+                    await session.execute_write(
+                        _run_steps, bulk.create_nodes_chunk, labels_str, chunk
+                    )
+                )
+            except Neo4jError as e:
+                errors.extend((row["idx"], str(e)) for row in chunk)
+
+    if created:
+        await caching.ainvalidate_labels(labels)
+        catalog.register(LABEL, labels)
+    return JsonResponse(bulk.node_creation_response(labels, total, created, errors))
+
+
+async def _stream_nodes(query, params):
+    async with async_neo4j_conn.session() as session:
+        result = await session.run(query, params)
+        async for record in result:
+            yield cypher.node_to_ndjson(record)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def search_nodes(request):
+    data, error = await _validate(NodeSearchSerializer, request)
+    if error:
+        return error
+
+    order_by, after, limit = pagination.search_options(data)
+    query, params = cypher.search_nodes_query(
+        data.get("labels", []), data.get("filters", {}), limit, order_by, after
+    )
+
+    if data["stream"]:
+        return StreamingHttpResponse(
+            _stream_nodes(query, params), content_type="application/x-ndjson"
+        )
+
+    async with async_neo4j_conn.session() as session:
+        result = await session.run(query, params)
+        nodes = [cypher.node_from_record(record) async for record in result]
+
+    response_data = {"message": f"Se encontraron {len(nodes)} nodos", "nodes": nodes}
+    if order_by:
+        response_data["next_cursor"] = pagination.next_cursor(nodes, order_by, limit)
+    return JsonResponse(response_data)
+
+
+@require_http_methods(["GET"])
+async def recommend_users(request):
+    serializer = UserRecommendationSerializer(data=request.GET)
+    if not await _is_valid(serializer):
+        return JsonResponse(serializer.errors, status=400)
+
+    user_id = serializer.validated_data["user_id"]
+    # recommend() solo lee la memoria: el índice se construye en otro hilo
+    try:
+        results, built_on = recommendations.index.recommend(
+            user_id, serializer.validated_data["limit"]
+        )
+    except recommendations.IndexNotReady:
+        return JsonResponse(
+            {"error": recommendations.NOT_READY_MESSAGE},
+            status=503,
+            headers={"Retry-After": str(recommendations.RETRY_AFTER)},
+        )
+    if results is None:
+        return JsonResponse(
+            {"error": f"Usuario con id {user_id} no encontrado."}, status=404
+        )
+    return JsonResponse(
+        {"userId": user_id, "recommendations": results, "indexBuiltAt": built_on}
+    )
+
+
+@require_http_methods(["GET"])
+async def home_feed(request):
+    serializer = HomeFeedSerializer(data=request.GET)
+    if not await _is_valid(serializer):
+        return JsonResponse(serializer.errors, status=400)
+
+    user_id = serializer.validated_data["user_id"]
+    limit = serializer.validated_data["limit"]
+    cursor = serializer.validated_data.get("cursor")
+    head = cursor is None and limit <= settings.FEED_HEAD_SIZE
+
+    items = feed.cache.get(user_id) if head else None
+    if items is None:
+        size = settings.FEED_HEAD_SIZE if head else limit
+        async with async_neo4j_conn.session() as session:
+            loaded = await session.execute_read(
+                _run_steps, feed.load, user_id, cursor, size
+            )
+        if loaded is None:
+            return JsonResponse(
+                {"error": f"Usuario con id {user_id} no encontrado."}, status=404
+            )
+        items, authors = loaded
+        if head:
+            feed.cache.set(user_id, items, authors)
+    return JsonResponse({"userId": user_id, **feed.page(items, limit)})
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def get_aggregated_data(request):
+    data, error = await _validate(AggregatedDataSerializer, request)
+    if error:
+        return error
+
+    label = data["label"]
+    prop = data["property"]
+
+    cache_key, cached = await caching.aget_aggregate(label, prop)
+    if cached is not None:
+        return JsonResponse(cached)
+
+    record = await _single(cypher.aggregated_data_query(label, prop))
+    if record:
+        response_data = {
+            "message": f"Datos agregados para nodos con label '{label}' y propiedad '{prop}'",
+            "count": record["count"],
+            "avg": record["avg"],
+            "max": record["max"],
+            "min": record["min"],
+            "sum": record["sum"],
+        }
+        await caching.aset_aggregate(cache_key, response_data)
+        return JsonResponse(response_data)
+    return JsonResponse({"error": "No se encontraron datos agregados."}, status=404)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def get_multi_aggregated_data(request):
+    data, error = await _validate(MultiAggregatedDataSerializer, request)
+    if error:
+        return error
+
+    label = data["label"]
+    cache_key, cached = await caching.aget_aggregate(label, caching.spec_key(data))
+    if cached is not None:
+        return JsonResponse(cached)
+
+    async with async_neo4j_conn.session() as session:
+        groups = await session.execute_read(
+            _run_steps, cypher.multi_aggregation, data
+        )
+
+    response_data = {
+        "message": f"Datos agregados para nodos con label '{label}' y propiedades {data['properties']}",
+        "groups": groups,
+    }
+    await caching.aset_aggregate(cache_key, response_data)
+    return JsonResponse(response_data)
+
+
+@csrf_exempt
+@require_http_methods(["PUT"])
+async def update_multiple_nodes_properties(request):
+    if ndjson.is_ndjson(request):
+        return await _stream_update_nodes(request)
+
+    data, error = await _validate(MultipleNodesUpdateSerializer, request)
+    if error:
+        return error
+
+    query, params = cypher.update_multiple_nodes_query(
+        data["label"], data["node_ids"], data["properties"]
+    )
+    record = await _single(query, params)
+    if record:
+        await caching.ainvalidate_labels([data["label"]])
+        return JsonResponse(
+            {
+                "message": "Nodos actualizados correctamente",
+                "updatedCount": record["updatedCount"],
+            }
+        )
+    return JsonResponse({"error": "Error al actualizar nodos"}, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["PUT"])
+async def remove_multiple_nodes_properties(request):
+    data, error = await _validate(MultipleNodesPropertiesRemoveSerializer, request)
+    if error:
+        return error
+
+    query, params = cypher.remove_multiple_nodes_properties_query(
+        data["label"], data["node_ids"], data["properties"]
+    )
+    try:
+        record = await _single(query, params)
+    except Neo4jError as e:
+        return JsonResponse({"error": str(e)}, status=500)
+    if record is not None:
+        await caching.ainvalidate_labels([data["label"]])
+        return JsonResponse(
+            {
+                "message": "Propiedades eliminadas de los nodos",
+                "updatedCount": record["updatedCount"],
+            }
+        )
+    return JsonResponse({"error": "Error al actualizar nodos"}, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def create_relationship(request):
+    data, error = await _validate(RelationshipCreationSerializer, request)
+    if error:
+        return error
+
+    # Validar que se envíe al menos 3 propiedades para la relación
+    if len(data["properties"]) < 3:
+        return JsonResponse(
+            {"error": "Debe proveer al menos 3 propiedades para la relación."},
+            status=400,
+        )
+
+    query, params = cypher.create_relationship_query(data)
+    record = await _single(query, params)
+    if record:
+        catalog.register(RELATIONSHIP_TYPE, [data["rel_type"]])
+        feed.cache.relationships_changed([data])
+        return JsonResponse(
+            {
+                "message": "Relación creada correctamente",
+                "relationship": {
+                    "id": record["rel_id"],
+                    "properties": record["rel_properties"],
+                },
+            }
+        )
+    return JsonResponse(
+        {"error": "No se pudo crear la relación. Verifique que ambos nodos existan."},
+        status=404,
+    )
+
+
+@csrf_exempt
+@require_http_methods(["PUT"])
+async def update_bulk_relationships(request):
+    if ndjson.is_ndjson(request):
+        return await _stream_bulk_relationships(
+            request,
+            bulk.update_props,
+            cypher.update_relationships_batch_query,
+            "updatedCount",
+            "Proceso completado.",
+            validation.RELATIONSHIP_MERGE_SCHEMA,
+        )
+
+    data, error = await _validate(RelationshipBulkUpdateSerializer, request)
+    if error:
+        return error
+
+    rels = data["relationships"]
+    failed = None
+    if data["parallel"]:
+        matched, failed = await _run_parallel(
+            bulk.group_relationships(rels, bulk.update_props),
+            cypher.update_relationships_batch_query,
+            data.get("chunk_size"),
+        )
+        feed.cache.relationships_changed(rels)
+    else:
+        matched, _ = await _run_bulk_relationships(
+            rels, bulk.update_props, cypher.update_relationships_batch_query
+        )
+    catalog.register(
+        RELATIONSHIP_TYPE, bulk.relationship_types(rels[idx] for idx in matched)
+    )
+
+    response_data, status = bulk.relationships_response(
+        rels, matched, "updatedCount", "Proceso completado.", failed=failed
+    )
+    return JsonResponse(response_data, status=status)
+
+
+@csrf_exempt
+@require_http_methods(["PUT"])
+async def remove_bulk_relationships(request):
+    if ndjson.is_ndjson(request):
+        return await _stream_bulk_relationships(
+            request,
+            bulk.remove_props,
+            cypher.remove_relationships_properties_batch_query,
+            "updatedCount",
+            "Proceso completado.",
+            validation.RELATIONSHIP_REMOVE_SCHEMA,
+        )
+
+    data, error = await _validate(RelationshipBulkRemoveSerializer, request)
+    if error:
+        return error
+
+    rels = data["relationships"]
+    matched, rolled_back = await _run_bulk_relationships(
+        rels,
+        bulk.remove_props,
+        cypher.remove_relationships_properties_batch_query,
+        data["mode"],
+    )
+
+    response_data, status = bulk.relationships_response(
+        rels, matched, "updatedCount", "Proceso completado.", rolled_back=rolled_back
+    )
+    return JsonResponse(response_data, status=status)
+
+
+@csrf_exempt
+@require_http_methods(["DELETE"])
+async def delete_multiple_nodes_with_checks(request):
+    data, error = await _validate(MultipleNodesDeleteWithChecksSerializer, request)
+    if error:
+        return error
+
+    node_ids = cypher.parse_node_ids(data["node_ids"], data["label"])
+    batch_size = data.get("batch_size")
+
+    query = cypher.delete_nodes_with_checks_query(
+        data["label"], in_transactions=batch_size is not None
+    )
+    params = {"node_ids": node_ids, "batch_size": batch_size}
+
+    async with async_neo4j_conn.session() as session:
+        if batch_size is not None:
+            # CALL {} IN TRANSACTIONS solo se permite en transacciones implícitas
+            result = await session.run(query, params)
+            records = [record async for record in result]
+        else:
+            records = await session.execute_write(
+                _run_steps, cypher.fetch_all, query, params
+            )
+
+    response_data = bulk.node_deletion_response(records)
+    if response_data["deletedCount"]:
+        await caching.ainvalidate_labels([data["label"]])
+    return JsonResponse(response_data)
+
+
+@csrf_exempt
+@require_http_methods(["DELETE"])
+async def delete_bulk_relationships(request):
+    if ndjson.is_ndjson(request):
+        return await _stream_bulk_relationships(
+            request,
+            None,
+            cypher.delete_relationships_batch_query,
+            "deletedCount",
+            "Proceso de eliminación completado.",
+            validation.RELATIONSHIP_SCHEMA,
+            with_type=True,
+        )
+
+    data, error = await _validate(RelationshipBulkDeleteSerializer, request)
+    if error:
+        return error
+
+    rels = data["relationships"]
+    matched, rolled_back = await _run_bulk_relationships(
+        rels, None, cypher.delete_relationships_batch_query, data["mode"]
+    )
+
+    response_data, status = bulk.relationships_response(
+        rels,
+        matched,
+        "deletedCount",
+        "Proceso de eliminación completado.",
+        with_type=True,
+        rolled_back=rolled_back,
+    )
+    return JsonResponse(response_data, status=status)
@@ -0,0 +1,377 @@
+"""
+Utilidades para los endpoints masivos.
+
+En los endpoints de relaciones, en lugar de ejecutar una consulta por cada
+objeto de 'relationships', los objetos se agrupan por su firma (label1, label2,
+rel_type) y cada grupo se envía como una sola consulta UNWIND, todas dentro de
+una misma transacción de escritura. Cada fila lleva el índice ('idx') que tenía
+en el payload original, y la consulta retorna los índices que sí coincidieron,
+de modo que se puede seguir reportando el error de cada objeto por separado.
+
+La creación masiva de nodos sigue la misma idea: las filas válidas se envían en
+lotes de chunk_size filas, un UNWIND por lote y una transacción por lote, y la
+respuesta retorna el elementId de cada nodo en el orden de entrada.
+
+Con un cuerpo NDJSON (ver ndjson.py) los endpoints masivos leen, validan y
+envían las filas en lotes de tamaño fijo a medida que llegan, y StreamReport
+solo guarda las filas que fallaron, por lo que la memoria no depende del tamaño
+del cuerpo.
+
+Las funciones de transacción de este módulo son generadores (ver
+cypher.run_steps), compartidos por las vistas síncronas y asíncronas.
+"""
+
+from django.conf import settings
+
+from . import catalog, coercion, cypher, feed, ndjson, validation
+
+# Mínimo de propiedades por nodo, igual que en create_node_with_properties
+MIN_NODE_PROPERTIES = 5
+
+# Modos de los endpoints masivos de relaciones
+BEST_EFFORT = "best_effort"  # se aplican las filas que coinciden
+ALL_OR_NOTHING = "all_or_nothing"  # si alguna fila no coincide, no se aplica nada
+MODES = [BEST_EFFORT, ALL_OR_NOTHING]
+
+# Mensajes de las ingestas all_or_nothing revertidas
+RELATIONSHIPS_ROLLED_BACK = (
+    "No se aplicó ningún cambio: algunas relaciones no coincidieron."
+)
+NODES_ROLLED_BACK = "No se aplicó ningún cambio: algunos nodos no se encontraron."
+
+
+class PartialMatchError(Exception):
+    """
+    Se lanza dentro de la función de transacción en modo all_or_nothing cuando
+    alguna fila no coincide, para que el driver revierta la transacción.
+    """
+
+    def __init__(self, matched):
+        super().__init__("Algunas relaciones no coincidieron; transacción revertida.")
+        self.matched = matched
+
+
+def relationship_signature(rel):
+    return (rel.get("label1"), rel.get("label2"), rel.get("rel_type"))
+
+
+def group_indexed(items, props_fn=None):
+    """
+    Agrupa los pares (idx, objeto) por firma y retorna {firma: [filas]}, donde
+    cada fila es {"idx", "node1_id", "node2_id"} y, si se indica props_fn, "props".
+    """
+    groups = {}
+    for idx, rel in items:
+        row = {
+            "idx": idx,
+            "node1_id": rel.get("node1_id"),
+            "node2_id": rel.get("node2_id"),
+        }
+        if props_fn is not None:
+            row["props"] = props_fn(rel)
+        groups.setdefault(relationship_signature(rel), []).append(row)
+    return groups
+
+
+def group_relationships(rels, props_fn=None):
+    return group_indexed(enumerate(rels), props_fn)
+
+
+def update_props(rel):
+    # Propiedades adicionales del objeto (sin las claves de control)
+    return {k: v for k, v in rel.items() if k not in cypher.RELATIONSHIP_KEYS}
+
+
+def remove_props(rel):
+    # Asignar null con SET r += {...} elimina la propiedad, lo que permite que
+    # objetos con distintas listas de propiedades compartan la misma consulta.
+    return {prop: None for prop in rel.get("properties", [])}
+
+
+def count_rows(groups):
+    return sum(len(rows) for rows in groups.values())
+
+
+def run_groups(groups, query_fn, mode=BEST_EFFORT):
+    """
+    Función de transacción: ejecuta un UNWIND por grupo y retorna
+    {idx: relaciones afectadas} de las filas que coincidieron.
+    """
+    matched = {}
+    for signature, rows in groups.items():
+        # Cada registro es (idx, count): se cargan directamente en el dict
+        matched.update((yield query_fn(*signature), {"rows": rows}))
+    if mode == ALL_OR_NOTHING and len(matched) < count_rows(groups):
+        raise PartialMatchError(matched)
+    return matched
+
+
+def relationships_batch(batch, props_fn, query_fn, written_types=None):
+    """
+    Función de transacción: aplica un lote NDJSON {idx: relación}. Si se indica
+    el set written_types, agrega los rel_type de las filas que coincidieron.
+    """
+    feed.cache.relationships_changed(batch.values())
+    groups = group_indexed(batch.items(), props_fn)
+    matched = yield from run_groups(groups, query_fn)
+    if written_types is not None:
+        written_types.update(relationship_types(batch[idx] for idx in matched))
+    return matched
+
+
+def relationship_types(rels):
+    return {rel["rel_type"] for rel in rels}
+
+
+def not_found_errors(rels, indices, with_type=False):
+    errors = []
+    for idx in indices:
+        rel = rels[idx]
+        rel_type = f" {rel.get('rel_type')}" if with_type else ""
+        errors.append(
+            f"No se encontró la relación{rel_type} entre {rel.get('label1')} con id {rel.get('node1_id')} "
+            f"y {rel.get('label2')} con id {rel.get('node2_id')}."
+        )
+    return errors
+
+
+def relationships_response(
+    rels, matched, count_key, message, with_type=False, rolled_back=False, failed=None
+):
+    """
+    Construye la respuesta de los endpoints masivos de relaciones a partir de
+    {idx: relaciones afectadas} y, si se indica, {idx: mensaje} de las filas de
+    los lotes que fallaron (ver parallel.py). Retorna (response_data, status).
+    """
+    matched_indices = sorted(matched)
+    unmatched = [idx for idx in range(len(rels)) if idx not in matched]
+    response_data = {
+        "message": message,
+        count_key: 0 if rolled_back else sum(matched.values()),
+        "matchedIndices": matched_indices,
+        "unmatchedIndices": unmatched,
+    }
+    failed = failed or {}
+    errors = not_found_errors(
+        rels, [idx for idx in unmatched if idx not in failed], with_type
+    )
+    errors.extend(
+        f"Relación en la posición {idx}: {failed[idx]}" for idx in sorted(failed)
+    )
+    if errors:
+        response_data["errors"] = errors
+    if rolled_back:
+        response_data["message"] = RELATIONSHIPS_ROLLED_BACK
+        return response_data, 409
+    return response_data, 200
+
+
+def node_status_error(nid, status):
+    # Mensaje de un id de delete_nodes_with_checks_query que no se eliminó
+    if status == "not_found":
+        return f"Nodo con id {nid} no encontrado."
+    return f"Nodo con id {nid} no puede ser eliminado porque tiene relaciones."
+
+
+def summarize_node_deletion(records):
+    """
+    Separa los registros (nid, status) de cypher.delete_nodes_with_checks_query
+    en ids eliminados, no encontrados y con relaciones, junto con los errores.
+    """
+    deleted, not_found, has_relationships, errors = [], [], [], []
+    for nid, status in records:
+        if status == "deleted":
+            deleted.append(nid)
+        elif status == "not_found":
+            not_found.append(nid)
+            errors.append(node_status_error(nid, status))
+        else:
+            has_relationships.append(nid)
+            errors.append(node_status_error(nid, status))
+    return deleted, not_found, has_relationships, errors
+
+
+def node_deletion_response(records):
+    deleted, not_found, has_relationships, errors = summarize_node_deletion(records)
+    response_data = {
+        "message": "Proceso de eliminación completado.",
+        "deletedCount": len(deleted),
+        "deleted": deleted,
+        "notFound": not_found,
+        "hasRelationships": has_relationships,
+    }
+    if errors:
+        response_data["errors"] = errors
+    return response_data
+
+
+def node_row_error(node):
+    if not isinstance(node, dict):
+        return "Se esperaba un objeto con las propiedades del nodo."
+    if len(node) < MIN_NODE_PROPERTIES:
+        return f"Debes proporcionar al menos {MIN_NODE_PROPERTIES} propiedades."
+    invalid = [key for key in node if not catalog.is_identifier(key)]
+    if invalid:
+        return f"Nombres de propiedad inválidos: {', '.join(invalid)}."
+    return None
+
+
+def indexed_batches(rows, batch_size, row_error):
+    """
+    Recorre (objeto, error de lectura) y retorna lotes (filas, errores, leídas):
+    filas es {idx: objeto} con a lo sumo batch_size filas válidas, errores es
+    [(idx, mensaje)] de las filas descartadas por row_error(objeto), y 'leídas'
+    es la cantidad de filas de entrada recorridas hasta ese lote.
+    """
+    batch, errors, idx = {}, [], -1
+    for idx, (obj, error) in enumerate(rows):
+        error = error or row_error(obj)
+        if error:
+            errors.append((idx, error))
+            continue
+        batch[idx] = obj
+        if len(batch) >= batch_size:
+            yield batch, errors, idx + 1
+            batch, errors = {}, []
+    if batch or errors:
+        yield batch, errors, idx + 1
+
+
+def stream_batches(request, options, row_error):
+    """
+    Lotes de indexed_batches del cuerpo NDJSON del request, de
+    options["batch_size"] filas (BULK_STREAM_BATCH_SIZE por defecto).
+    """
+    batch_size = options.get("batch_size", settings.BULK_STREAM_BATCH_SIZE)
+    return indexed_batches(ndjson.request_objects(request), batch_size, row_error)
+
+
+def node_chunks(rows, chunk_size):
+    """
+    Como indexed_batches, pero cada lote es una lista de filas {"idx", "props"}
+    lista para create_nodes_batch_query.
+    """
+    for batch, errors, read in indexed_batches(rows, chunk_size, node_row_error):
+        chunk = [{"idx": idx, "props": props} for idx, props in batch.items()]
+        yield chunk, errors, read
+
+
+def chunk_date_keys(labels, chunk):
+    keys = set()
+    for row in chunk:
+        keys.update(row["props"])
+    return sorted(key for key in keys if coercion.is_date_property(labels, key))
+
+
+def create_nodes_chunk(labels_str, chunk):
+    """Función de transacción: crea un lote y retorna {idx: elementId}."""
+    date_keys = chunk_date_keys(labels_str.split(":"), chunk)
+    query = cypher.create_nodes_batch_query(labels_str, date_keys)
+    return dict((yield query, {"rows": chunk}))
+
+
+def node_creation_response(labels, total, created, errors):
+    """
+    Construye la respuesta de la creación masiva a partir de {idx: elementId} y
+    [(idx, mensaje)]. 'nodeIds' tiene un elemento por fila de entrada (null si
+    la fila no se creó).
+    """
+    response_data = {
+        "message": "Proceso de creación completado.",
+        "labels": labels,
+        "createdCount": len(created),
+        "nodeIds": [created.get(idx) for idx in range(total)],
+    }
+    if errors:
+        response_data["errors"] = [
+            f"Nodo en la posición {idx}: {message}" for idx, message in sorted(errors)
+        ]
+    return response_data
+
+
+def node_update_row_error(row):
+    return validation.NODE_UPDATE_SCHEMA.row_error(row)
+
+
+def node_update_rows(label, batch):
+    # Los ids de todo el lote se convierten de una sola vez
+    node_ids = [row["node_id"] for row in batch.values()]
+    node_ids = cypher.parse_node_ids(node_ids, label)
+    return [
+        {
+            "idx": idx,
+            "node_id": node_id,
+            "props": coercion.coerce_properties(label, row["properties"]),
+        }
+        for (idx, row), node_id in zip(batch.items(), node_ids)
+    ]
+
+
+def update_nodes_batch(label, batch):
+    """Función de transacción: aplica un lote {idx: fila} y retorna {idx: nodos}."""
+    rows = node_update_rows(label, batch)
+    return dict((yield cypher.update_nodes_batch_query(label), {"rows": rows}))
+
+
+def nodes_not_found_errors(batch, indices):
+    return [f"Nodo con id {batch[idx]['node_id']} no encontrado." for idx in indices]
+
+
+class StreamReport:
+    """
+    Resultado acumulado de una ingesta NDJSON. Solo guarda los índices y los
+    mensajes de las filas que fallaron, y a lo sumo max_errors
+    (BULK_STREAM_MAX_ERRORS): las demás filas que fallan solo se cuentan, igual
+    que las que se aplicaron.
+    """
+
+    def __init__(self, max_errors=None):
+        self.count = 0
+        self.read = 0
+        self.failed_count = 0
+        self.errors = []  # [(idx, mensaje)]
+        if max_errors is None:
+            max_errors = settings.BULK_STREAM_MAX_ERRORS
+        self.max_errors = max_errors
+
+    def add(self, batch, matched, row_errors, read, not_found):
+        """
+        Registra un lote: matched es {idx: elementos afectados} y not_found(batch,
+        índices) retorna los mensajes de las filas que no coincidieron.
+        """
+        self.read = read
+        self.count += sum(matched.values())
+        unmatched = [idx for idx in batch if idx not in matched]
+        self._add_errors(row_errors)
+        if unmatched:
+            self._add_errors(list(zip(unmatched, not_found(batch, unmatched))))
+
+    def _add_errors(self, errors):
+        self.failed_count += len(errors)
+        self.errors.extend(errors[: max(self.max_errors - len(self.errors), 0)])
+
+    def failed(self):
+        return self.failed_count > 0
+
+    def truncated(self):
+        return self.failed_count > len(self.errors)
+
+    def response(self, count_key, message, rolled_back_message=None):
+        """Retorna (response_data, status); con rolled_back_message responde 409."""
+        self.errors.sort()
+        response_data = {
+            "message": message,
+            count_key: 0 if rolled_back_message else self.count,
+            "processedCount": self.read,
+            "failedCount": self.failed_count,
+            "unmatchedIndices": [idx for idx, _ in self.errors],
+            "errorsTruncated": self.truncated(),
+        }
+        if self.errors:
+            response_data["errors"] = [
+                f"Fila {idx}: {error}" for idx, error in self.errors
+            ]
+        if rolled_back_message:
+            response_data["message"] = rolled_back_message
+            return response_data, 409
+        return response_data, 200
@@ -0,0 +1,84 @@
+"""
+Caché de resultados de get_aggregated_data y get_multi_aggregated_data sobre
+el framework de caché de Django.
+
+Las entradas se guardan por (label, property) con un TTL; las consultas de
+varias propiedades usan spec_key() de la consulta completa en lugar de property.
+Para invalidar todas las entradas de un label sin recorrer claves, cada label
+tiene una "generación" que forma parte de la clave: al escribir nodos de ese
+label la generación se reemplaza por un token nuevo y las entradas anteriores
+dejan de leerse (y expiran solas por TTL). Los tokens son aleatorios, de modo
+que si el backend descarta una generación la nueva no coincide con la de
+entradas anteriores. Se invalidan también los labels que comparten nodos con
+los escritos (ver coercion.TypeRegistry.related_labels): actualizar un Usuario
+que además es Influencer cambia los agregados de Influencer.
+
+Con LocMemCache la caché es por proceso: una escritura solo invalida la caché
+del worker que la atendió. Para invalidar entre workers se debe usar un backend
+compartido como Redis (CACHE_URL=redis://...).
+"""
+
+import hashlib
+import json
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import coercion
+
+
+def _generation_key(label):
+    return f"aggregate:gen:{label}"
+
+
+def _entry_key(label, prop, generation):
+    return f"aggregate:{label}:{generation}:{prop}"
+
+
+def _new_generation():
+    return uuid.uuid4().hex
+
+
+def _new_generations(labels):
+    return {
+        _generation_key(label): _new_generation()
+        for label in coercion.registry.related_labels(labels)
+    }
+
+
+def spec_key(spec):
+    # Clave corta y estable para consultas con varios parámetros
+    payload = json.dumps(spec, sort_keys=True, default=str)
+    return hashlib.md5(payload.encode("utf-8")).hexdigest()
+
+
+def get_aggregate(label, prop):
+    """Retorna (clave, datos en caché o None)."""
+    generation = cache.get_or_set(_generation_key(label), _new_generation, timeout=None)
+    key = _entry_key(label, prop, generation)
+    return key, cache.get(key)
+
+
+def set_aggregate(key, data):
+    cache.set(key, data, timeout=settings.AGGREGATE_CACHE_TTL)
+
+
+def invalidate_labels(labels):
+    cache.set_many(_new_generations(labels), timeout=None)
+
+
+async def aget_aggregate(label, prop):
+    generation = await cache.aget_or_set(
+        _generation_key(label), _new_generation, timeout=None
+    )
+    key = _entry_key(label, prop, generation)
+    return key, await cache.aget(key)
+
+
+async def aset_aggregate(key, data):
+    await cache.aset(key, data, timeout=settings.AGGREGATE_CACHE_TTL)
+
+
+async def ainvalidate_labels(labels):
+    await cache.aset_many(_new_generations(labels), timeout=None)
@@ -0,0 +1,164 @@
+"""
+Catálogo de labels, tipos de relación y claves de propiedad de la base de datos.
+
+Los labels, tipos y propiedades se interpolan en el texto de las consultas, por
+lo que antes de construirlas se validan contra este catálogo: un identificador
+que no existe se rechaza sin consultar la base de datos, y uno escrito con otras
+mayúsculas ("usuario") se reemplaza por el nombre real ("Usuario"), de modo que
+no se generan textos de consulta distintos para el mismo label. En la creación
+(must_exist=False) los nombres se usan tal como llegan.
+
+El catálogo se carga con db.labels(), db.relationshipTypes() y db.propertyKeys()
+y se recarga cuando tiene más de SCHEMA_CATALOG_TTL segundos. Un nombre que no
+está en el catálogo provoca una recarga (como mucho una cada
+SCHEMA_CATALOG_MIN_REFRESH segundos) antes de rechazarlo, por si otro worker lo
+creó hace poco. Si la base de datos no responde, solo se valida la sintaxis.
+Las recargas usan el driver síncrono también desde async_views.py, que valida
+las peticiones en un hilo del executor para no bloquear el loop.
+"""
+
+import logging
+import re
+import threading
+import time
+
+from django.conf import settings
+
+from .neo4j_connection import neo4j_conn
+
+logger = logging.getLogger(__name__)
+
+LABEL = "label"
+RELATIONSHIP_TYPE = "relationshipType"
+PROPERTY_KEY = "propertyKey"
+
+PROCEDURES = {
+    LABEL: "CALL db.labels() YIELD label RETURN collect(label) AS names",
+    RELATIONSHIP_TYPE: "CALL db.relationshipTypes() YIELD relationshipType "
+    "RETURN collect(relationshipType) AS names",
+    PROPERTY_KEY: "CALL db.propertyKeys() YIELD propertyKey "
+    "RETURN collect(propertyKey) AS names",
+}
+
+NOUNS = {
+    LABEL: ("label", "el label"),
+    RELATIONSHIP_TYPE: ("tipo de relación", "el tipo de relación"),
+    PROPERTY_KEY: ("propiedad", "la propiedad"),
+}
+
+
+# Identificador de Cypher sin comillas: letras, números y '_', sin empezar con número
+IDENTIFIER_RE = re.compile(r"[^\W\d]\w*")
+
+
+class InvalidIdentifier(ValueError):
+    pass
+
+
+def is_identifier(value):
+    return isinstance(value, str) and IDENTIFIER_RE.fullmatch(value) is not None
+
+
+def _load(session):
+    # Consultas en transacciones implícitas: si la base no responde se falla de
+    # inmediato en lugar de reintentar como execute_read
+    return {
+        kind: session.run(query).single()["names"] for kind, query in PROCEDURES.items()
+    }
+
+
+class SchemaCatalog:
+    def __init__(self):
+        self._names = None  # {tipo: {nombre: nombre}}
+        self._folded = None  # {tipo: {nombre en minúsculas: nombre}}
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Recarga el catálogo. Retorna False si la base de datos no respondió."""
+        try:
+            with neo4j_conn.session() as session:
+                loaded = _load(session)
+        except Exception:
+            logger.exception("No se pudo cargar el catálogo de esquema")
+            with self._lock:
+                self._loaded_at = time.monotonic()  # no reintentar en cada petición
+            return False
+
+        names = {
+            kind: {name: name for name in values} for kind, values in loaded.items()
+        }
+        with self._lock:
+            self._names = names
+            self._folded = {
+                kind: {name.casefold(): name for name in values}
+                for kind, values in loaded.items()
+            }
+            self._loaded_at = time.monotonic()
+        return True
+
+    def _age(self):
+        if self._loaded_at is None:
+            return float("inf")
+        return time.monotonic() - self._loaded_at
+
+    def _ensure_fresh(self):
+        if self._age() > settings.SCHEMA_CATALOG_TTL:
+            self.refresh()
+
+    def _lookup(self, kind, name):
+        names = self._names
+        if names is None:
+            return name  # catálogo no disponible: solo se valida la sintaxis
+        if name in names[kind]:
+            return name
+        if kind == PROPERTY_KEY:
+            return None  # las propiedades distinguen mayúsculas
+        return self._folded[kind].get(name.casefold())
+
+    def resolve(self, kind, name, must_exist=True):
+        """
+        Retorna el nombre canónico de un identificador o lanza InvalidIdentifier.
+        Con must_exist=False (creación) solo se valida la sintaxis y el nombre se
+        usa tal como llegó: crear el label 'persona' cuando existe 'Persona' crea
+        un label distinto, como en Neo4j.
+        """
+        noun, with_article = NOUNS[kind]
+        if not is_identifier(name):
+            raise InvalidIdentifier(
+                f"'{name}' no es un nombre de {noun} válido: solo se permiten "
+                "letras, números y '_' (sin empezar con un número)."
+            )
+        if not must_exist:
+            return name
+        self._ensure_fresh()
+        canonical = self._lookup(kind, name)
+        if canonical is None and self._age() > settings.SCHEMA_CATALOG_MIN_REFRESH:
+            self.refresh()
+            canonical = self._lookup(kind, name)
+        if canonical is None:
+            raise InvalidIdentifier(f"No existe {with_article} '{name}'.")
+        return canonical
+
+    def register(self, kind, names):
+        # Los endpoints de creación agregan los nombres nuevos sin esperar la recarga
+        with self._lock:
+            if self._names is None:
+                return
+            for name in names:
+                self._names[kind][name] = name
+                self._folded[kind].setdefault(name.casefold(), name)
+
+    def snapshot(self):
+        self._ensure_fresh()
+        names = self._names or {}
+        return {
+            "labels": sorted(names.get(LABEL, [])),
+            "relationshipTypes": sorted(names.get(RELATIONSHIP_TYPE, [])),
+            "propertyKeys": sorted(names.get(PROPERTY_KEY, [])),
+            "available": self._names is not None,
+            "ageSeconds": round(self._age(), 1),
+        }
+
+
+catalog = SchemaCatalog()
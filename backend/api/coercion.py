@@ -0,0 +1,323 @@
+"""
+Conversión de los valores de las peticiones al tipo de cada propiedad.
+
+Antes cada endpoint adivinaba el tipo de cada valor con try: int(...) except
+ValueError: float(...), y detectaba fechas por el prefijo 'fecha_' en cada valor
+de cada petición. Ahora el tipo se busca por (label, propiedad) en un registro:
+
+1. PROPERTY_TYPES en settings.py ({"Usuario.edad": "Integer", ...}).
+2. Las fechas conocidas de schema.DATE_PROPERTIES.
+3. Los tipos que reporta db.schema.nodeTypeProperties() (propiedades con un
+   solo tipo), recargados cada PROPERTY_TYPES_TTL segundos; esa consulta
+   recorre la base, por lo que el TTL por defecto es de una hora. Al vencer, las
+   peticiones siguen usando los tipos anteriores mientras un solo hilo en
+   segundo plano los recarga. Tampoco se espera la primera carga del proceso:
+   mientras corre se usan solo los tipos de 1 y 2. Con gunicorn la primera
+   carga se hace al iniciar (ver gunicorn.conf.py).
+
+Si la propiedad no está en el registro se usa la regla por nombre ('fecha_' o
+'_fecha' son fechas), calculada una sola vez por nombre. Para una lista de
+valores (por ejemplo, node_ids) el conversor se elige una vez y se aplica a
+toda la lista, con expresiones regulares en lugar de excepciones.
+"""
+
+import datetime
+import functools
+import logging
+import re
+import threading
+import time
+
+import neo4j.time
+from django.conf import settings
+
+from . import schema
+from .neo4j_connection import neo4j_conn
+
+logger = logging.getLogger(__name__)
+
+INTEGER = "Integer"
+FLOAT = "Float"
+STRING = "String"
+DATE = "Date"
+BOOLEAN = "Boolean"
+
+# Tipos de db.schema.nodeTypeProperties() que se registran
+NEO4J_TYPES = {
+    "Long": INTEGER,
+    "Integer": INTEGER,
+    "Double": FLOAT,
+    "Float": FLOAT,
+    "String": STRING,
+    "Date": DATE,
+    "Boolean": BOOLEAN,
+}
+
+_INT_RE = re.compile(r"\s*[+-]?\d+\s*")
+_FLOAT_RE = re.compile(r"\s*[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?\s*")
+_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def to_integer(value):
+    if type(value) is str and _INT_RE.fullmatch(value):
+        return int(value)
+    return value
+
+
+def to_float(value):
+    if type(value) is str and _FLOAT_RE.fullmatch(value):
+        return float(value)
+    if type(value) is int:
+        return float(value)
+    return value
+
+
+def to_date(value):
+    if type(value) is str and _DATE_RE.fullmatch(value):
+        try:
+            return datetime.date.fromisoformat(value)
+        except ValueError:  # por ejemplo, 2024-02-30
+            return value
+    return value
+
+
+def to_string(value):
+    return value if type(value) is str else str(value)
+
+
+def to_boolean(value):
+    if type(value) is str and value.lower() in ("true", "false"):
+        return value.lower() == "true"
+    return value
+
+
+def guess(value):
+    # Propiedad sin tipo conocido: entero, decimal o el valor tal cual
+    if type(value) is str:
+        if _INT_RE.fullmatch(value):
+            return int(value)
+        if _FLOAT_RE.fullmatch(value):
+            return float(value)
+    return value
+
+
+CONVERTERS = {
+    INTEGER: to_integer,
+    FLOAT: to_float,
+    STRING: to_string,
+    DATE: to_date,
+    BOOLEAN: to_boolean,
+    None: guess,
+}
+
+
+@functools.lru_cache(maxsize=1024)
+def name_type(prop):
+    # Regla por nombre para propiedades fuera del registro
+    if prop.startswith("fecha_") or prop.endswith("_fecha"):
+        return DATE
+    return None
+
+
+def _configured_types():
+    types = {}
+    for label, props in schema.DATE_PROPERTIES.items():
+        for prop in props:
+            types[(label, prop)] = DATE
+    for key, type_name in settings.PROPERTY_TYPES.items():
+        label, prop = key.split(".", 1)
+        types[(label, prop)] = type_name
+    return types
+
+
+class TypeRegistry:
+    def __init__(self):
+        self._types = None  # {(label, propiedad): tipo}
+        self._label_sets = set()  # combinaciones de labels de los nodos
+        self._loaded_at = None
+        self._lock = threading.Lock()
+        # Tomado mientras se recarga: una sola recarga a la vez por proceso
+        self._refresh_lock = threading.Lock()
+
+    def _load_from_database(self):
+        """Retorna ({(label, propiedad): tipo}, {frozenset de labels de un nodo})."""
+        query = """
+        CALL db.schema.nodeTypeProperties()
+        YIELD nodeLabels, propertyName, propertyTypes
+        RETURN nodeLabels, propertyName, propertyTypes
+        """
+        types, label_sets = {}, set()
+        with neo4j_conn.session() as session:
+            for record in session.run(query):
+                label_sets.add(frozenset(record["nodeLabels"]))
+                property_types = record["propertyTypes"] or []
+                if len(property_types) != 1 or property_types[0] not in NEO4J_TYPES:
+                    continue
+                for label in record["nodeLabels"]:
+                    types[(label, record["propertyName"])] = NEO4J_TYPES[
+                        property_types[0]
+                    ]
+        return types, label_sets
+
+    def refresh(self):
+        types, label_sets = {}, set()
+        if settings.PROPERTY_TYPES_FROM_DATABASE:
+            try:
+                types, label_sets = self._load_from_database()
+            except Exception:
+                logger.exception("No se pudieron cargar los tipos de las propiedades")
+                if self._types is not None:
+                    # Se siguen usando los anteriores hasta la próxima recarga
+                    with self._lock:
+                        self._loaded_at = time.monotonic()
+                    return
+        # La configuración tiene prioridad sobre lo que reporta la base
+        types.update(_configured_types())
+        with self._lock:
+            self._types = types
+            self._label_sets = label_sets
+            self._loaded_at = time.monotonic()
+
+    def _refresh_in_background(self):
+        try:
+            self.refresh()
+        finally:
+            self._refresh_lock.release()
+
+    def start_refresh(self):
+        """Inicia una recarga en segundo plano, si no hay una en curso."""
+        if not self._refresh_lock.acquire(blocking=False):
+            return False
+        threading.Thread(
+            target=self._refresh_in_background,
+            name="property-types-refresh",
+            daemon=True,
+        ).start()
+        return True
+
+    def is_loaded(self):
+        return self._types is not None
+
+    def types(self):
+        types = self._types
+        if types is None:
+            if not settings.PROPERTY_TYPES_FROM_DATABASE:
+                # Sin consultar la base, la carga es inmediata
+                self.refresh()
+                return self._types
+            # Primera carga: nadie la espera; mientras tanto solo se usan los
+            # tipos configurados
+            self.start_refresh()
+            return _configured_types()
+        if time.monotonic() - self._loaded_at > settings.PROPERTY_TYPES_TTL:
+            # Vencidos: se retornan igual y, si nadie los está recargando, se
+            # recargan en otro hilo (stale-while-revalidate)
+            self.start_refresh()
+        return types
+
+    def related_labels(self, labels):
+        """
+        Los labels dados y los que comparten algún nodo con ellos según la última
+        carga (por ejemplo, Influencer para Usuario), sin esperar a que termine
+        una recarga.
+        """
+        labels = set(labels)
+        related = set(labels)
+        for label_set in self._label_sets:
+            if not label_set.isdisjoint(labels):
+                related |= label_set
+        return related
+
+    def property_type(self, labels, prop):
+        """Tipo de la propiedad en el primer label que la tenga registrada."""
+        types = self.types()
+        for label in labels:
+            type_name = types.get((label, prop))
+            if type_name is not None:
+                return type_name
+        return name_type(prop)
+
+
+registry = TypeRegistry()
+
+
+def _labels(label):
+    if label is None:
+        return ()
+    return (label,) if isinstance(label, str) else tuple(label)
+
+
+def property_type(label, prop):
+    """Tipo registrado (o por nombre) de la propiedad, o None si no se conoce."""
+    return registry.property_type(_labels(label), prop)
+
+
+def converter(label, prop):
+    """Función de conversión para la propiedad; label puede ser uno o varios."""
+    return CONVERTERS[registry.property_type(_labels(label), prop)]
+
+
+def coerce(label, prop, value):
+    return converter(label, prop)(value)
+
+
+def coerce_many(label, prop, values):
+    convert = converter(label, prop)
+    return [convert(value) for value in values]
+
+
+def coerce_properties(label, properties):
+    """
+    Convierte los valores de las propiedades con tipo conocido; las demás se
+    guardan tal cual se recibieron.
+    """
+    coerced = {}
+    for key, value in properties.items():
+        type_name = property_type(label, key)
+        coerced[key] = value if type_name is None else CONVERTERS[type_name](value)
+    return coerced
+
+
+def is_date_property(label, prop):
+    return registry.property_type(_labels(label), prop) == DATE
+
+
+def coerce_ids(label, node_ids):
+    """
+    Convierte los valores de la propiedad 'id'. Si 'id' no tiene tipo conocido se
+    mantiene la regla anterior: enteros si todos lo son, si no, los valores tal cual.
+    """
+    type_name = registry.property_type(_labels(label), "id")
+    if type_name is not None:
+        return coerce_many(label, "id", node_ids)
+    if all(
+        type(nid) is int or (type(nid) is str and _INT_RE.fullmatch(nid))
+        for nid in node_ids
+    ):
+        return [int(nid) for nid in node_ids]
+    return list(node_ids)
+
+
+# Conversión a texto ISO 8601 de los tipos temporales, por tipo exacto
+_ISO_FORMATS = {
+    neo4j.time.Date: neo4j.time.Date.iso_format,
+    neo4j.time.DateTime: neo4j.time.DateTime.iso_format,
+    neo4j.time.Time: neo4j.time.Time.iso_format,
+    neo4j.time.Duration: neo4j.time.Duration.iso_format,
+    datetime.date: datetime.date.isoformat,
+    datetime.datetime: datetime.datetime.isoformat,
+    datetime.time: datetime.time.isoformat,
+}
+
+
+def to_json_value(value):
+    to_iso = _ISO_FORMATS.get(type(value))
+    return to_iso(value) if to_iso is not None else value
+
+
+def serialize_properties(props):
+    for key, value in props.items():
+        to_iso = _ISO_FORMATS.get(type(value))
+        if to_iso is not None:
+            props[key] = to_iso(value)
+    return props
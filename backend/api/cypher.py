@@ -0,0 +1,475 @@
+"""
+Construcción de consultas Cypher compartida por las vistas síncronas (views.py)
+y asíncronas (async_views.py).
+
+Cada función recibe los datos ya validados por el serializer y retorna la
+consulta (y sus parámetros) que se debe ejecutar, de modo que ambas rutas de
+ejecución generen exactamente el mismo Cypher.
+
+Las funciones de transacción que ejecutan varias consultas se escriben como
+generadores que producen (consulta, parámetros) y reciben la lista de registros
+de cada una (ver run_steps). No tocan el driver, por lo que views.py las ejecuta
+con run_steps y async_views.py con su equivalente asíncrono.
+"""
+
+import functools
+
+from django.conf import settings
+
+from . import coercion, renderers
+
+# Convertir valores de tipo fecha (datetime o neo4j.time) a string (ISO 8601)
+serialize_properties = coercion.serialize_properties
+
+# Claves de control de cada objeto en los endpoints masivos de relaciones
+RELATIONSHIP_KEYS = ["label1", "label2", "rel_type", "node1_id", "node2_id"]
+
+
+def run_steps(tx, steps_fn, *args):
+    """
+    Ejecuta en tx la función de transacción steps_fn(*args): cada (consulta,
+    parámetros) que produce se ejecuta y el generador recibe la lista de
+    registros. Retorna lo que retorne el generador.
+    """
+    steps = steps_fn(*args)
+    try:
+        query, params = next(steps)
+        while True:
+            query, params = steps.send(list(tx.run(query, params)))
+    except StopIteration as done:
+        return done.value
+
+
+def fetch_all(query, params):
+    # Función de transacción genérica: retorna todos los registros
+    return (yield query, params)
+
+
+def parse_node_ids(node_ids, label=None):
+    # Convertir los node_ids al tipo de la propiedad "id" del label (ver coercion.py)
+    return coercion.coerce_ids(label, node_ids)
+
+
+def create_node_single_label_query(label):
+    return f"CREATE (n:{label}) RETURN id(n) AS node_id, labels(n) AS labels"
+
+
+def create_node_multiple_labels_query(labels_str):
+    return f"CREATE (n:{labels_str}) RETURN id(n) AS node_id, labels(n) AS labels"
+
+
+def create_node_with_properties_query(label, properties):
+    # Construir la cadena de propiedades para Cypher
+    properties_string_list = []
+    for key in properties.keys():
+        if coercion.is_date_property(label, key):
+            properties_string_list.append(f"n.{key} = date(${key})")
+        else:
+            properties_string_list.append(f"n.{key} = ${key}")
+
+    properties_string = ", ".join(properties_string_list)
+
+    # Usamos elementId(n) en lugar de id(n) para evitar advertencias de deprecación
+    return f"""
+    CREATE (n:{label})
+    SET {properties_string}
+    RETURN elementId(n) AS node_id, labels(n) AS labels, properties(n) AS properties
+    """
+
+
+def create_nodes_batch_query(labels_str, date_keys):
+    """
+    Crea un nodo por fila de $rows ({"idx", "props"}). Las propiedades fecha_*
+    presentes en el lote se convierten con date(), igual que en
+    create_node_with_properties_query; en las filas que no las tienen, date(null)
+    es null y la propiedad no se crea.
+    """
+    date_sets = "".join(
+        f"\n    SET n.{key} = date(row.props.{key})" for key in date_keys
+    )
+    return f"""
+    UNWIND $rows AS row
+    CREATE (n:{labels_str})
+    SET n = row.props{date_sets}
+    RETURN row.idx AS idx, elementId(n) AS node_id
+    """
+
+
+def search_shape(labels, filters, limit, order_by=None, after=None):
+    """
+    "Forma" de una búsqueda: lo único que cambia el texto de la consulta. Los
+    valores de los filtros, el límite y el cursor viajan como parámetros, de modo
+    que todas las búsquedas con la misma forma reutilizan el mismo texto y, por lo
+    tanto, el mismo plan en la caché de Neo4j.
+    """
+    filter_shape = tuple(
+        (key, item["operator"].upper(), isinstance(item["value"], list))
+        for key, item in sorted((filters or {}).items())
+    )
+    return (
+        tuple(labels or ()),
+        filter_shape,
+        order_by,
+        after is not None,
+        limit is not None,
+    )
+
+
+def filter_param(key):
+    # Los parámetros de los filtros llevan prefijo para no pisar los reservados
+    # (cursor_value, cursor_id, page_limit) si una propiedad se llama igual
+    return f"filter_{key}"
+
+
+@functools.lru_cache(maxsize=settings.SEARCH_QUERY_CACHE_SIZE)
+def search_nodes_template(labels, filter_shape, order_by, has_cursor, has_limit):
+    """
+    Construye (una sola vez por forma) la consulta de search_nodes. Con order_by,
+    los resultados se ordenan por (n.<order_by>, n.id) para la paginación por
+    keyset; los nodos sin esa propiedad o sin 'id' no participan de la paginación.
+    """
+    query = "MATCH (n"
+    if labels:
+        query += ":" + ":".join(labels)
+    query += ")"
+
+    where_clauses = []
+    for key, operator, is_list in filter_shape:
+        param = filter_param(key)
+        if operator == "IN":
+            where_clauses.append(f"ANY(x IN n.{key} WHERE x IN ${param})")
+        elif operator == "CONTAINS":
+            if is_list:
+                where_clauses.append(
+                    f"ANY(y IN n.{key} WHERE ANY(x IN ${param} WHERE y CONTAINS x))"
+                )
+            else:
+                where_clauses.append(f"ANY(y IN n.{key} WHERE y CONTAINS ${param})")
+        else:
+            where_clauses.append(f"n.{key} {operator} ${param}")
+
+    if order_by:
+        where_clauses.append(f"n.{order_by} IS NOT NULL AND n.id IS NOT NULL")
+        if has_cursor:
+            if order_by == "id":
+                where_clauses.append("n.id > $cursor_id")
+            else:
+                where_clauses.append(
+                    f"(n.{order_by} > $cursor_value OR "
+                    f"(n.{order_by} = $cursor_value AND n.id > $cursor_id))"
+                )
+
+    if where_clauses:
+        query += " WHERE " + " AND ".join(where_clauses)
+    query += " RETURN elementId(n) AS node_id, labels(n) AS labels, properties(n) AS properties"
+    if order_by:
+        query += " ORDER BY n.id" if order_by == "id" else f" ORDER BY n.{order_by}, n.id"
+    if has_limit:
+        query += " LIMIT $page_limit"
+    return query
+
+
+def search_nodes_params(filters, limit, order_by=None, after=None, labels=()):
+    params = {}
+    for key, filter_item in (filters or {}).items():
+        operator = filter_item["operator"].upper()
+        value = filter_item["value"]
+        param = filter_param(key)
+        # Tipo de la propiedad en los labels buscados (ver coercion.py)
+        type_name = coercion.property_type(labels, key)
+
+        if operator == "IN":
+            # Si el valor no es una lista, lo convertimos a lista
+            if not isinstance(value, list):
+                value = [value]
+            if type_name is None:
+                params[param] = [str(v).strip() for v in value]
+            else:
+                params[param] = coercion.coerce_many(labels, key, value)
+        elif operator == "CONTAINS":
+            if isinstance(value, list):
+                params[param] = [str(v).strip() for v in value]
+            else:
+                params[param] = str(value).strip()
+        else:
+            params[param] = coercion.CONVERTERS[type_name](value)
+
+    if order_by and after is not None:
+        if order_by != "id":
+            params["cursor_value"] = after["value"]
+        params["cursor_id"] = after["id"]
+    if limit is not None:
+        params["page_limit"] = limit
+    return params
+
+
+def search_nodes_query(labels, filters, limit, order_by=None, after=None):
+    """
+    Retorna (consulta, parámetros) de search_nodes; 'after' es el cursor
+    decodificado de la página anterior.
+    """
+    query = search_nodes_template(*search_shape(labels, filters, limit, order_by, after))
+    return query, search_nodes_params(filters, limit, order_by, after, labels)
+
+
+def search_query_cache_stats():
+    info = search_nodes_template.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "maxsize": info.maxsize,
+        "hitRate": info.hits / lookups if lookups else 0.0,
+    }
+
+
+def node_from_record(record):
+    # Las propiedades se retornan tal como llegan del driver: las fechas las
+    # convierte el renderer (ver renderers.py)
+    node_id, labels, properties = record.values()
+    return {"id": node_id, "labels": labels, "properties": properties}
+
+
+def node_to_ndjson(record):
+    # Una línea NDJSON por nodo, para las respuestas en streaming
+    return renderers.dumps(node_from_record(record)) + b"\n"
+
+
+def aggregated_data_query(label, prop):
+    return f"""
+    MATCH (n:{label})
+    RETURN COUNT(n) AS count,
+           AVG(n.{prop}) AS avg,
+           MAX(n.{prop}) AS max,
+           MIN(n.{prop}) AS min,
+           SUM(n.{prop}) AS sum
+    """
+
+
+def multi_aggregation_query(label, properties, group_by=None, percentiles=()):
+    """
+    Calcula COUNT y AVG/MAX/MIN/SUM (y percentileCont) de varias propiedades en
+    un solo recorrido de los nodos del label, opcionalmente agrupados por la
+    propiedad group_by. Los alias de cada propiedad son p<i>_<estadística> para
+    no depender del nombre de la propiedad.
+    """
+    group_expr = f"n.{group_by}" if group_by else "null"
+    columns = [f"{group_expr} AS grp", "count(n) AS count"]
+    params = {}
+    for i, prop in enumerate(properties):
+        for fn in ["avg", "max", "min", "sum"]:
+            columns.append(f"{fn}(n.{prop}) AS p{i}_{fn}")
+        for j in range(len(percentiles)):
+            columns.append(f"percentileCont(n.{prop}, $pct{j}) AS p{i}_pct{j}")
+    for j, pct in enumerate(percentiles):
+        params[f"pct{j}"] = pct
+
+    query = f"""
+    MATCH (n:{label})
+    RETURN {", ".join(columns)}
+    ORDER BY grp
+    """
+    return query, params
+
+
+def histogram_query(label, prop, group_by=None):
+    # Cantidad de nodos por rango [k * bucket_size, (k + 1) * bucket_size)
+    group_expr = f"n.{group_by}" if group_by else "null"
+    return f"""
+    MATCH (n:{label})
+    WHERE n.{prop} IS NOT NULL
+    WITH {group_expr} AS grp, toInteger(floor(n.{prop} / $bucket_size)) AS bucket
+    RETURN grp, bucket, count(*) AS count
+    ORDER BY grp, bucket
+    """
+
+
+def percentile_name(pct):
+    # 0.5 -> "p50", 0.999 -> "p99.9"
+    return f"p{round(pct * 100, 6):g}"
+
+
+def aggregation_groups(records, properties, percentiles=(), histogram=None):
+    """
+    Arma la respuesta de multi_aggregation_query (y, si se pidió, de
+    histogram_query) como una lista de grupos.
+    """
+    groups = []
+    by_group = {}
+    for record in records:
+        group = {"group": coercion.to_json_value(record["grp"]), "count": record["count"]}
+        group["properties"] = {}
+        for i, prop in enumerate(properties):
+            stats = {fn: record[f"p{i}_{fn}"] for fn in ["avg", "max", "min", "sum"]}
+            for j, pct in enumerate(percentiles):
+                stats[percentile_name(pct)] = record[f"p{i}_pct{j}"]
+            group["properties"][prop] = stats
+        groups.append(group)
+        by_group[repr(group["group"])] = group
+
+    if histogram is not None:
+        records, bucket_size = histogram["records"], histogram["bucket_size"]
+        for group in groups:
+            group["histogram"] = []
+        for record in records:
+            group = by_group.get(repr(coercion.to_json_value(record["grp"])))
+            if group is not None:
+                group["histogram"].append(
+                    {"from": record["bucket"] * bucket_size, "count": record["count"]}
+                )
+    return groups
+
+
+def multi_aggregation(data):
+    """
+    Función de transacción: las estadísticas y el histograma se leen en la
+    misma transacción para que describan el mismo estado del grafo.
+    """
+    records = yield multi_aggregation_query(
+        data["label"],
+        data["properties"],
+        data.get("group_by"),
+        data.get("percentiles", []),
+    )
+
+    histogram = data.get("histogram")
+    if histogram:
+        query = histogram_query(
+            data["label"], histogram["property"], data.get("group_by")
+        )
+        histogram = {
+            "records": (yield query, {"bucket_size": histogram["bucket_size"]}),
+            "bucket_size": histogram["bucket_size"],
+        }
+
+    return aggregation_groups(
+        records, data["properties"], data.get("percentiles", []), histogram
+    )
+
+
+def update_multiple_nodes_query(label, node_ids, new_properties):
+    query = f"""
+    MATCH (n:{label})
+    WHERE n.id IN $node_ids
+    SET n += $props
+    RETURN count(n) AS updatedCount
+    """
+    params = {
+        "node_ids": parse_node_ids(node_ids, label),
+        "props": coercion.coerce_properties(label, new_properties),
+    }
+    return query, params
+
+
+def update_nodes_batch_query(label):
+    # Cada fila de $rows trae idx, node_id y las propiedades (props) de ese nodo
+    return f"""
+    UNWIND $rows AS row
+    MATCH (n:{label} {{id: row.node_id}})
+    SET n += row.props
+    RETURN row.idx AS idx, count(n) AS count
+    """
+
+
+def remove_multiple_nodes_properties_query(label, node_ids, props_to_remove):
+    # Construir la cláusula REMOVE a partir de la lista de propiedades
+    remove_clause = ", ".join(f"n.{prop}" for prop in props_to_remove)
+
+    query = f"""
+    MATCH (n:{label})
+    WHERE n.id IN $node_ids
+    REMOVE {remove_clause}
+    RETURN count(n) AS updatedCount
+    """
+    return query, {"node_ids": parse_node_ids(node_ids, label)}
+
+
+def create_relationship_query(data):
+    # Convertir los node ids al tipo de la propiedad "id" de cada label
+    node1_id = parse_node_ids([data["node1_id"]], data["label1"])[0]
+    node2_id = parse_node_ids([data["node2_id"]], data["label2"])[0]
+
+    label1 = data["label1"]
+    label2 = data["label2"]
+    rel_type = data["rel_type"]
+
+    # Utilizamos f-string para inyectar los labels y el tipo de relación.
+    query = f"""
+    MATCH (n1:{label1} {{ id: $node1_id }}), (n2:{label2} {{ id: $node2_id }})
+    CREATE (n1)-[r:{rel_type} $props]->(n2)
+    RETURN elementId(r) AS rel_id, properties(r) AS rel_properties
+    """
+    params = {"node1_id": node1_id, "node2_id": node2_id, "props": data["properties"]}
+    return query, params
+
+
+def update_relationships_batch_query(label1, label2, rel_type):
+    # Una sola consulta por firma (label1, label2, rel_type); cada fila de $rows
+    # trae idx, node1_id, node2_id y props. Solo retorna los idx que coincidieron.
+    # Sin usar APOC, para evitar problemas de procedimiento
+    return f"""
+    UNWIND $rows AS row
+    MATCH (a:{label1} {{id: row.node1_id}}), (b:{label2} {{id: row.node2_id}})
+    MERGE (a)-[r:{rel_type}]->(b)
+    SET r += row.props
+    RETURN row.idx AS idx, count(r) AS count
+    """
+
+
+def remove_relationships_properties_batch_query(label1, label2, rel_type):
+    # Cada fila trae en row.props las propiedades a eliminar con valor null
+    return f"""
+    UNWIND $rows AS row
+    MATCH (a:{label1} {{id: row.node1_id}}), (b:{label2} {{id: row.node2_id}})
+    MATCH (a)-[r:{rel_type}]->(b)
+    SET r += row.props
+    RETURN row.idx AS idx, count(r) AS count
+    """
+
+
+def delete_nodes_with_checks_query(label, in_transactions=False):
+    """
+    Elimina en una sola consulta los nodos de $node_ids que no tengan relaciones y
+    retorna el estado de cada id: 'deleted', 'not_found' o 'has_relationships'.
+
+    EXISTS { (n)--() } se detiene en la primera relación encontrada, en lugar de
+    contar todas las relaciones del nodo (costoso para nodos con muchos seguidores).
+    Con in_transactions=True el trabajo se divide en lotes de $batch_size ids con
+    CALL {} IN TRANSACTIONS; debe ejecutarse en una transacción implícita.
+    """
+    body = f"""
+    OPTIONAL MATCH (n:{label} {{ id: nid }})
+    WITH nid, n,
+         CASE
+           WHEN n IS NULL THEN 'not_found'
+           WHEN EXISTS {{ (n)--() }} THEN 'has_relationships'
+           ELSE 'deleted'
+         END AS status
+    FOREACH (_ IN CASE WHEN status = 'deleted' THEN [1] ELSE [] END | DELETE n)
+    """
+    if in_transactions:
+        return f"""
+        UNWIND $node_ids AS nid
+        CALL {{
+          WITH nid
+          {body}
+          RETURN status
+        }} IN TRANSACTIONS OF $batch_size ROWS
+        RETURN nid, status
+        """
+    return f"""
+    UNWIND $node_ids AS nid
+    {body}
+    RETURN nid, status
+    """
+
+
+def delete_relationships_batch_query(label1, label2, rel_type):
+    return f"""
+    UNWIND $rows AS row
+    MATCH (a:{label1} {{id: row.node1_id}}), (b:{label2} {{id: row.node2_id}})
+    MATCH (a)-[r:{rel_type}]->(b)
+    DELETE r
+    RETURN row.idx AS idx, count(r) AS count
+    """
@@ -0,0 +1,238 @@
+"""
+Feed de inicio: publicaciones (POSTED, por fecha_posteo) y reels (CREATED, por
+fecha_creacion) de los usuarios que sigue un usuario y de sus amigos, del más
+reciente al más antiguo.
+
+Un solo ORDER BY sobre todo lo publicado por todos los autores ordena miles de
+elementos cuando el usuario sigue a influencers, para retornar solo una página.
+En lugar de eso, FEED_ITEMS_QUERY toma de cada autor a lo sumo limit + 1
+elementos anteriores al cursor (cada autor es una secuencia ya ordenada), y
+merge_streams las combina con un merge de k vías (heapq.merge) hasta completar
+la página. Las propiedades solo se leen para los elementos que quedan en ella.
+
+El orden es (fecha, tipo, id) descendente: las fechas no tienen hora, por lo que
+el tipo y el id desempatan los elementos del mismo día, y el cursor guarda esos
+tres valores del último elemento de la página.
+
+La primera página de los usuarios que más consultan su feed se guarda en una
+caché LRU en memoria (FeedCache) de FEED_CACHE_SIZE usuarios. Cuando uno de sus
+autores publica (se crea o elimina una relación POSTED o CREATED desde la API) o
+el usuario sigue, deja de seguir o cambia de amigos, su entrada se descarta.
+Como la caché es por proceso, las entradas además expiran a los FEED_CACHE_TTL
+segundos, para que los cambios hechos en otros workers se vean igual.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from . import coercion, pagination
+
+POST = "post"
+REEL = "reel"
+
+# Relaciones que publican un elemento, y las que cambian los autores del feed
+PUBLISH_TYPES = {"POSTED": POST, "CREATED": REEL}
+FOLLOW_TYPES = ["FOLLOWS", "FRIENDS_WITH"]
+
+FEED_AUTHORS_QUERY = """
+MATCH (u:Usuario {id: $user_id})
+OPTIONAL MATCH (u)-[:FOLLOWS]->(f:Usuario)
+WITH u, collect(DISTINCT f.id) AS followed
+OPTIONAL MATCH (u)-[:FRIENDS_WITH]-(a:Usuario)
+RETURN followed + collect(DISTINCT a.id) AS authors
+"""
+
+# Condición de keyset para la rama de un tipo: (fecha, tipo, id) < cursor
+_BEFORE = """
+      WHERE fecha IS NOT NULL AND (
+        $before IS NULL OR fecha < $before
+        OR (fecha = $before AND ('{kind}' < $kind
+            OR ('{kind}' = $kind AND n.id < $item_id)))
+      )"""
+
+FEED_ITEMS_QUERY = f"""
+UNWIND $authors AS author_id
+MATCH (a:Usuario {{id: author_id}})
+CALL {{
+  WITH a
+  MATCH (a)-[r:POSTED]->(n)
+  WITH n, r.fecha_posteo AS fecha{_BEFORE.format(kind=POST)}
+  RETURN n, fecha, '{POST}' AS kind
+  ORDER BY fecha DESC, n.id DESC
+  LIMIT $per_author
+  UNION ALL
+  WITH a
+  MATCH (a)-[r:CREATED]->(n)
+  WITH n, r.fecha_creacion AS fecha{_BEFORE.format(kind=REEL)}
+  RETURN n, fecha, '{REEL}' AS kind
+  ORDER BY fecha DESC, n.id DESC
+  LIMIT $per_author
+}}
+RETURN author_id, kind, n.id AS id, fecha, elementId(n) AS element_id
+"""
+
+FEED_PROPERTIES_QUERY = """
+UNWIND $element_ids AS element_id
+MATCH (n) WHERE elementId(n) = element_id
+RETURN element_id, properties(n) AS properties
+"""
+
+
+def items_params(authors, cursor, limit):
+    cursor = cursor or {}
+    return {
+        "authors": authors,
+        "per_author": limit + 1,
+        "before": cursor.get("fecha"),
+        "kind": cursor.get("kind"),
+        "item_id": cursor.get("id"),
+    }
+
+
+def _sort_key(item):
+    return (item["fecha"], item["type"], item["id"])
+
+
+def merge_streams(records, limit):
+    """
+    Agrupa los registros de FEED_ITEMS_QUERY por autor y los combina con un
+    merge de k vías. Retorna a lo sumo limit + 1 elementos (el último solo
+    indica que hay una página siguiente).
+    """
+    streams = {}
+    for author_id, kind, item_id, fecha, element_id in records:
+        streams.setdefault(author_id, []).append(
+            {
+                "type": kind,
+                "id": item_id,
+                "author": author_id,
+                "fecha": fecha,
+                "element_id": element_id,
+            }
+        )
+    # Las dos ramas (posts y reels) de un autor llegan concatenadas
+    for stream in streams.values():
+        stream.sort(key=_sort_key, reverse=True)
+    merged = heapq.merge(*streams.values(), key=_sort_key, reverse=True)
+    return list(itertools.islice(merged, limit + 1))
+
+
+def attach_properties(items, records):
+    properties = dict(records)
+    for item in items:
+        item["properties"] = properties.get(item.pop("element_id"))
+    return items
+
+
+def page(items, limit):
+    """Arma la respuesta con los primeros 'limit' elementos y su cursor."""
+    visible = items[:limit]
+    next_cursor = None
+    if len(items) > limit:
+        last = visible[-1]
+        next_cursor = pagination.encode_feed_cursor(
+            last["fecha"], last["type"], last["id"]
+        )
+    return {"items": visible, "next_cursor": next_cursor}
+
+
+def load(user_id, cursor, limit):
+    """
+    Función de transacción (ver cypher.run_steps): retorna (elementos, autores)
+    con a lo sumo limit + 1 elementos, o None si el usuario no existe.
+    """
+    records = yield FEED_AUTHORS_QUERY, {"user_id": user_id}
+    if not records:
+        return None
+    authors = list(dict.fromkeys(records[0]["authors"]))
+    records = yield FEED_ITEMS_QUERY, items_params(authors, cursor, limit)
+    items = merge_streams(records, limit)
+    element_ids = [item["element_id"] for item in items]
+    records = yield FEED_PROPERTIES_QUERY, {"element_ids": element_ids}
+    return attach_properties(items, records), authors
+
+
+class FeedCache:
+    """
+    LRU de las primeras páginas del feed: {user_id: (elementos, autores)}, con
+    un índice inverso {autor: usuarios en caché que lo tienen como autor}.
+    """
+
+    def __init__(self):
+        # {user_id: (momento en que se guardó, elementos, autores)}
+        self._entries = OrderedDict()
+        self._readers = {}  # {autor: set de user_id}
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > settings.FEED_CACHE_TTL:
+                self._discard(user_id)
+                return None
+            self._entries.move_to_end(user_id)
+            return entry[1]
+
+    def set(self, user_id, items, authors):
+        with self._lock:
+            self._discard(user_id)
+            self._entries[user_id] = (time.monotonic(), items, authors)
+            for author in authors:
+                self._readers.setdefault(author, set()).add(user_id)
+            while len(self._entries) > settings.FEED_CACHE_SIZE:
+                self._discard(next(iter(self._entries)))
+
+    def _discard(self, user_id):
+        entry = self._entries.pop(user_id, None)
+        if entry is None:
+            return
+        for author in entry[2]:
+            readers = self._readers.get(author)
+            if readers is not None:
+                readers.discard(user_id)
+                if not readers:
+                    del self._readers[author]
+
+    def invalidate_users(self, user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._discard(user_id)
+
+    def invalidate_authors(self, author_ids):
+        with self._lock:
+            for author in author_ids:
+                for user_id in list(self._readers.get(author, ())):
+                    self._discard(user_id)
+
+    def relationships_changed(self, rels):
+        """
+        Descarta las entradas afectadas por relaciones creadas, modificadas o
+        eliminadas desde la API (objetos con label1, node1_id, node2_id y
+        rel_type, como los de los endpoints de relaciones).
+        """
+        authors, users = [], []
+        for rel in rels:
+            rel_type = rel.get("rel_type")
+            if rel.get("label1") != "Usuario":
+                continue
+            if rel_type in PUBLISH_TYPES:
+                authors.append(rel.get("node1_id"))
+            elif rel_type in FOLLOW_TYPES:
+                users.append(rel.get("node1_id"))
+                if rel_type == "FRIENDS_WITH":
+                    users.append(rel.get("node2_id"))
+        if not self._entries or not (authors or users):
+            return
+        # Los ids pueden llegar como texto; en la caché están con su tipo real
+        self.invalidate_authors(coercion.coerce_ids("Usuario", authors))
+        self.invalidate_users(coercion.coerce_ids("Usuario", users))
+
+
+cache = FeedCache()
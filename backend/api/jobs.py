@@ -0,0 +1,351 @@
+"""
+Trabajos masivos en segundo plano.
+
+POST /api/jobs/ valida el cuerpo con el mismo serializer del endpoint masivo
+correspondiente, crea un BulkJob y retorna su id de inmediato; el trabajo se
+ejecuta en un pool local de hilos (BULK_JOB_WORKERS por proceso), en lotes de
+batch_size filas, igual que los endpoints con cuerpo NDJSON. Después de cada
+lote se guardan en la base de datos de Django (sqlite) las filas procesadas, los
+errores y la marca de cancelación, de modo que cualquier worker del servidor
+puede responder la consulta de progreso o pedir la cancelación, sin un broker
+externo.
+
+Los trabajos viven en el proceso que los recibió (BulkJob.worker): si ese
+proceso termina, los que tenía pendientes o en curso se marcan como 'failed' al
+iniciar el siguiente worker de gunicorn en la misma máquina (ver
+fail_orphaned) y hay que volver a enviarlos.
+"""
+
+import functools
+import logging
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from . import bulk, caching, cypher
+from .catalog import RELATIONSHIP_TYPE, catalog
+from .models import BulkJob
+from .neo4j_connection import neo4j_conn
+from .serializers import (
+    MultipleNodesDeleteWithChecksSerializer,
+    RelationshipBulkDeleteSerializer,
+    RelationshipBulkRemoveSerializer,
+    RelationshipBulkUpdateSerializer,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Plan:
+    """
+    Cómo ejecutar una operación: las filas, la función de transacción (ver
+    cypher.run_steps) que aplica un lote {idx: fila} y retorna {idx: elementos
+    afectados}, y la que arma los errores de las filas que no coincidieron.
+    """
+
+    def __init__(
+        self,
+        rows,
+        run_batch,
+        not_found,
+        count_key,
+        message,
+        mode,
+        on_done=None,
+        batch_size=None,
+    ):
+        self.rows = rows
+        self.run_batch = run_batch
+        self.not_found = not_found
+        self.count_key = count_key
+        self.message = message
+        self.mode = mode
+        self.on_done = on_done
+        self.batch_size = batch_size  # el batch_size del payload, si lo tiene
+
+
+def relationships_plan(props_fn, query_fn, count_key, with_type=False, merge=False):
+    def build(data):
+        # Con MERGE los rel_type escritos pueden ser nuevos
+        written_types = set() if merge else None
+
+        def on_done(report):
+            if written_types:
+                catalog.register(RELATIONSHIP_TYPE, written_types)
+
+        return Plan(
+            data["relationships"],
+            functools.partial(
+                bulk.relationships_batch,
+                props_fn=props_fn,
+                query_fn=query_fn,
+                written_types=written_types,
+            ),
+            functools.partial(bulk.not_found_errors, with_type=with_type),
+            count_key,
+            "Proceso completado.",
+            data.get("mode", bulk.BEST_EFFORT),
+            on_done,
+        )
+
+    return build
+
+
+def delete_nodes_plan(data):
+    label = data["label"]
+    query = cypher.delete_nodes_with_checks_query(label)
+    statuses = {}  # {idx: estado} de los ids que no se eliminaron
+
+    def run_batch(batch):
+        status_by_id = dict((yield query, {"node_ids": list(batch.values())}))
+        matched = {}
+        for idx, nid in batch.items():
+            status = status_by_id.get(nid, "not_found")
+            if status == "deleted":
+                matched[idx] = 1
+            else:
+                statuses[idx] = status
+        return matched
+
+    def not_found(batch, indices):
+        return [
+            bulk.node_status_error(batch[idx], statuses.pop(idx)) for idx in indices
+        ]
+
+    def on_done(report):
+        if report.count:
+            caching.invalidate_labels([label])
+
+    return Plan(
+        cypher.parse_node_ids(data["node_ids"], label),
+        run_batch,
+        not_found,
+        "deletedCount",
+        "Proceso de eliminación completado.",
+        bulk.BEST_EFFORT,
+        on_done,
+        data.get("batch_size"),
+    )
+
+
+# Operación (ver BulkJob.OPERATION_CHOICES) -> (serializer del cuerpo, constructor
+# del Plan)
+OPERATIONS = {
+    "update-bulk-relationships": (
+        RelationshipBulkUpdateSerializer,
+        relationships_plan(
+            bulk.update_props,
+            cypher.update_relationships_batch_query,
+            "updatedCount",
+            merge=True,
+        ),
+    ),
+    "remove-bulk-relationship": (
+        RelationshipBulkRemoveSerializer,
+        relationships_plan(
+            bulk.remove_props,
+            cypher.remove_relationships_properties_batch_query,
+            "updatedCount",
+        ),
+    ),
+    "delete-bulk-relationships": (
+        RelationshipBulkDeleteSerializer,
+        relationships_plan(
+            None, cypher.delete_relationships_batch_query, "deletedCount", True
+        ),
+    ),
+    "delete-multiple-nodes": (
+        MultipleNodesDeleteWithChecksSerializer,
+        delete_nodes_plan,
+    ),
+}
+
+
+# Opciones de los endpoints que un trabajo no admite: sus lotes se aplican uno
+# tras otro, de batch_size filas
+UNSUPPORTED_OPTIONS = {"update-bulk-relationships": ["parallel", "chunk_size"]}
+
+
+def option_errors(operation, data):
+    """{opción: [mensaje]} de las opciones del payload que el trabajo ignoraría."""
+    return {
+        option: ["No se admite en trabajos; los lotes se definen con batch_size."]
+        for option in UNSUPPORTED_OPTIONS.get(operation, [])
+        if data.get(option)
+    }
+
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.BULK_JOB_WORKERS, thread_name_prefix="bulk-job"
+            )
+    return _executor
+
+
+def submit(operation, data, batch_size=None):
+    """
+    Crea el BulkJob y lo encola. 'data' son los datos ya validados; sin
+    batch_size se usa el del payload y luego BULK_JOB_BATCH_SIZE.
+    """
+    plan = OPERATIONS[operation][1](data)
+    job = BulkJob.objects.create(
+        operation=operation, total_rows=len(plan.rows), worker=worker_id()
+    )
+    batch_size = batch_size or plan.batch_size or settings.BULK_JOB_BATCH_SIZE
+    executor().submit(run_job, job.pk, plan, batch_size)
+    return job
+
+
+def _is_alive(pid):
+    try:
+        os.kill(pid, 0)  # solo comprueba que el proceso exista
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def fail_orphaned():
+    """
+    Marca como 'failed' los trabajos pendientes o en curso de procesos de esta
+    máquina que ya no existen, y retorna cuántos. Se llama al iniciar cada worker
+    de gunicorn (ver gunicorn.conf.py).
+    """
+    host = socket.gethostname()
+    orphaned = []
+    jobs = BulkJob.objects.filter(
+        status__in=[BulkJob.PENDING, BulkJob.RUNNING], worker__startswith=f"{host}:"
+    )
+    for pk, worker in jobs.values_list("pk", "worker"):
+        pid = worker.rpartition(":")[2]
+        if pid.isdigit() and not _is_alive(int(pid)):
+            orphaned.append(pk)
+    if orphaned:
+        BulkJob.objects.filter(
+            pk__in=orphaned, status__in=[BulkJob.PENDING, BulkJob.RUNNING]
+        ).update(
+            status=BulkJob.FAILED,
+            result={"error": "El proceso que ejecutaba el trabajo terminó."},
+            finished_at=timezone.now(),
+        )
+    return len(orphaned)
+
+
+def cancel(job):
+    """
+    Pide la cancelación. Un trabajo pendiente se cancela de inmediato; uno en
+    curso se detiene al terminar el lote actual.
+    """
+    jobs = BulkJob.objects.filter(pk=job.pk)
+    jobs.update(cancel_requested=True)
+    jobs.filter(status=BulkJob.PENDING).update(
+        status=BulkJob.CANCELLED, finished_at=timezone.now()
+    )
+    job.refresh_from_db()
+    return job
+
+
+def save_progress(job_id, report):
+    """Guarda el avance de un lote y retorna True si se pidió la cancelación."""
+    jobs = BulkJob.objects.filter(pk=job_id)
+    jobs.update(
+        processed_rows=report.read,
+        affected_count=report.count,
+        error_count=report.failed_count,
+        errors=[
+            f"Fila {idx}: {error}"
+            for idx, error in report.errors[: settings.BULK_JOB_MAX_ERRORS]
+        ],
+    )
+    return jobs.values_list("cancel_requested", flat=True).get()
+
+
+def finish(job_id, status, result, **fields):
+    BulkJob.objects.filter(pk=job_id).update(
+        status=status, result=result, finished_at=timezone.now(), **fields
+    )
+
+
+def run_job(job_id, plan, batch_size):
+    try:
+        execute(job_id, plan, batch_size)
+    except Exception as e:
+        logger.exception("Falló el trabajo masivo %s", job_id)
+        finish(job_id, BulkJob.FAILED, {"error": str(e)})
+    finally:
+        # Cada hilo del pool abre su propia conexión a la base de datos
+        connection.close()
+
+
+def execute(job_id, plan, batch_size):
+    started = BulkJob.objects.filter(pk=job_id, status=BulkJob.PENDING).update(
+        status=BulkJob.RUNNING, started_at=timezone.now()
+    )
+    if not started:
+        return  # se canceló antes de empezar
+
+    rows = ((row, None) for row in plan.rows)
+    batches = bulk.indexed_batches(rows, batch_size, lambda row: None)
+    report = bulk.StreamReport()
+    cancelled = rolled_back = False
+
+    with neo4j_conn.session() as session:
+        if plan.mode == bulk.ALL_OR_NOTHING:
+            with session.begin_transaction() as tx:
+                for batch, errors, read in batches:
+                    matched = (
+                        cypher.run_steps(tx, plan.run_batch, batch) if batch else {}
+                    )
+                    report.add(batch, matched, errors, read, plan.not_found)
+                    if save_progress(job_id, report):
+                        cancelled = True
+                        break
+                if cancelled or report.failed():
+                    tx.rollback()
+                    rolled_back = True
+                else:
+                    tx.commit()
+        else:
+            for batch, errors, read in batches:
+                matched = (
+                    session.execute_write(cypher.run_steps, plan.run_batch, batch)
+                    if batch
+                    else {}
+                )
+                report.add(batch, matched, errors, read, plan.not_found)
+                if save_progress(job_id, report):
+                    cancelled = True
+                    break
+
+    if plan.on_done is not None and not rolled_back:
+        plan.on_done(report)
+
+    status, message = BulkJob.COMPLETED, plan.message
+    if cancelled:
+        status, message = BulkJob.CANCELLED, "Trabajo cancelado."
+    rolled_back_message = None
+    if rolled_back:
+        rolled_back_message = (
+            "Trabajo cancelado: no se aplicó ningún cambio."
+            if cancelled
+            else "No se aplicó ningún cambio: algunas filas no coincidieron."
+        )
+    result, _ = report.response(plan.count_key, message, rolled_back_message)
+    finish(job_id, status, result, affected_count=result[plan.count_key])
@@ -0,0 +1,532 @@
+"""
+Carga local del grafo desde los archivos de docs/ que genera generateCSV.py, en
+CSV o en Parquet (--format parquet).
+
+Reemplaza a 'docs/Script - Proyecto 1 - DB2.txt', que cargaba los datos con LOAD
+CSV desde Google Drive y un CREATE o MATCH por fila: necesitaba red, buscaba los
+nodos de cada relación sin que las restricciones estuvieran garantizadas y, si
+fallaba a mitad, había que empezar de nuevo.
+
+load() crea primero las restricciones e índices (schema.bootstrap), después
+carga todos los nodos y recién entonces las relaciones, cuyos MATCH por 'id' ya
+usan los índices. Cada archivo se lee por lotes de batch_size filas que se
+envían como parámetro de un UNWIND, un lote por transacción. Los valores se
+convierten en Python según GRAPH_FILES (enteros, fechas, listas), en lugar de
+toInteger()/date()/split() fila por fila en Cypher.
+
+Después de cada lote se guarda en un checkpoint (JSON) cuántas filas de cada
+archivo quedaron confirmadas; si la carga se interrumpe, la siguiente ejecución
+salta esas filas. Nodos y relaciones se escriben con MERGE, por lo que repetir
+un lote (por ejemplo, si el proceso terminó entre el commit y el checkpoint) no
+duplica nada.
+
+Los archivos Parquet (requieren pyarrow) se leen por record batches: las listas
+y fechas ya llegan con su tipo, por lo que los conversores las dejan tal cual, y
+al retomar desde el checkpoint se saltan grupos de filas enteros según los
+metadatos del archivo, sin leerlos.
+"""
+
+import ast
+import csv
+import glob
+import itertools
+import json
+import os
+import time
+
+from . import schema
+from .coercion import BOOLEAN, CONVERTERS, DATE, FLOAT, INTEGER, STRING
+from .neo4j_connection import neo4j_conn
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - dependencia opcional
+    pq = None
+
+LIST = "List"
+
+CSV = ".csv"
+PARQUET = ".parquet"
+
+
+def to_list(value):
+    # Listas separadas por ';' o escritas como lista de Python ("['a', 'b']")
+    if type(value) is not str:
+        return value
+    if value.startswith("["):
+        return [str(item) for item in ast.literal_eval(value)]
+    return value.split(";") if value else []
+
+
+LOAD_CONVERTERS = {**CONVERTERS, LIST: to_list}
+
+
+def _props(properties, columns=None):
+    """
+    {propiedad: tipo} -> [(propiedad, columna, conversor)]. Cada propiedad se
+    lee de la columna del mismo nombre, salvo las indicadas en 'columns'.
+    """
+    columns = columns or {}
+    return [
+        (prop, columns.get(prop, prop), LOAD_CONVERTERS[type_name])
+        for prop, type_name in properties.items()
+    ]
+
+
+class NodeSource:
+    """Nodos de un archivo, identificados por la columna 'id'."""
+
+    def __init__(self, labels, properties):
+        self.labels = labels
+        self.properties = _props(properties)
+
+    def matches(self, record):
+        return True
+
+    def row(self, record):
+        return {
+            "id": LOAD_CONVERTERS[INTEGER](record["id"]),
+            "props": {prop: fn(record[col]) for prop, col, fn in self.properties},
+        }
+
+    def query(self):
+        first, *extra = self.labels
+        set_labels = f", n:{':'.join(extra)}" if extra else ""
+        return f"""
+        UNWIND $rows AS row
+        MERGE (n:{first} {{id: row.id}})
+        SET n += row.props{set_labels}
+        RETURN count(n) AS count
+        """
+
+
+class RelationshipSource:
+    """
+    Relaciones de un archivo entre (label, columna del id) de inicio y de fin.
+    Con 'when' = (columna, valor) solo se toman las filas con ese valor (por
+    ejemplo, tipo_contenido = "Post" para los likes a publicaciones).
+    """
+
+    def __init__(self, rel_type, start, end, properties, columns=None, when=None):
+        self.rel_type = rel_type
+        self.start = start
+        self.end = end
+        self.properties = _props(properties, columns)
+        self.when = when
+
+    def matches(self, record):
+        return self.when is None or record[self.when[0]] == self.when[1]
+
+    def row(self, record):
+        to_id = LOAD_CONVERTERS[INTEGER]
+        return {
+            "start": to_id(record[self.start[1]]),
+            "end": to_id(record[self.end[1]]),
+            "props": {prop: fn(record[col]) for prop, col, fn in self.properties},
+        }
+
+    def query(self):
+        # MERGE con las propiedades en el patrón, igual que el script anterior:
+        # dos filas con el mismo par de nodos y distintas propiedades son dos
+        # relaciones
+        props = ", ".join(f"`{p}`: row.props.`{p}`" for p, _, _ in self.properties)
+        return f"""
+        UNWIND $rows AS row
+        MATCH (a:{self.start[0]} {{id: row.start}})
+        MATCH (b:{self.end[0]} {{id: row.end}})
+        MERGE (a)-[r:{self.rel_type} {{{props}}}]->(b)
+        RETURN count(r) AS count
+        """
+
+
+_USER = {"nombre": STRING, "email": STRING, "fecha_registro": DATE, "intereses": LIST}
+_FOLLOWS = {"desde": DATE, "interaccion_frecuencia": STRING, "razón": STRING}
+_LIKE = {"fecha_like": DATE, "tipo": STRING, "desde_movil": BOOLEAN}
+_COMMENT = {"fecha_comentario": DATE, "tipo": LIST, "editado": BOOLEAN}
+_BELONGS = {"fecha_creacion": DATE, "privado": BOOLEAN, "categoria": STRING}
+_PUBLISH = {"visibilidad": STRING, "ubicacion": STRING}
+
+# Labels del contenido según la columna tipo_contenido
+_CONTENT = {"Post": "Publicacion", "Comment": "Comentario", "Reel": "Reel"}
+
+# (archivo, fuentes) en el orden de carga: todos los nodos antes que las
+# relaciones. Los labels y propiedades son los del script de LOAD CSV.
+NODE_FILES = [
+    ("users.csv", [NodeSource(["Usuario"], _USER)]),
+    (
+        "influencers_no.csv",
+        [NodeSource(["Usuario", "Influencers"], _USER)],
+    ),
+    (
+        "influencers_verified.csv",
+        [NodeSource(["Usuario", "Influencers", "Verified"], _USER)],
+    ),
+    (
+        "posts.csv",
+        [
+            NodeSource(
+                ["Publicacion"],
+                {
+                    "contenido": STRING,
+                    "fecha_publicacion": DATE,
+                    "likes": INTEGER,
+                    "privado": BOOLEAN,
+                },
+            )
+        ],
+    ),
+    (
+        "comments.csv",
+        [
+            NodeSource(
+                ["Comentario"],
+                {
+                    "contenido": STRING,
+                    "fecha_comentario": DATE,
+                    "likes": INTEGER,
+                    "reacciones": LIST,
+                },
+            )
+        ],
+    ),
+    (
+        "reels.csv",
+        [
+            NodeSource(
+                ["Reel"],
+                {
+                    "duracion": FLOAT,
+                    "fecha_publicacion": DATE,
+                    "likes": INTEGER,
+                    "hashtags": LIST,
+                },
+            )
+        ],
+    ),
+    (
+        "groups.csv",
+        [
+            NodeSource(
+                ["Grupo"],
+                {
+                    "nombre": STRING,
+                    "descripcion": STRING,
+                    "privado": BOOLEAN,
+                    "miembros": INTEGER,
+                },
+            )
+        ],
+    ),
+]
+
+_USUARIO = ("Usuario", "usuario_id")
+
+RELATIONSHIP_FILES = [
+    (
+        "friends.csv",
+        [
+            RelationshipSource(
+                "FRIENDS_WITH",
+                ("Usuario", "usuario1_id"),
+                ("Usuario", "usuario2_id"),
+                {"desde": DATE, "nivel_confianza": INTEGER, "tipo_amistad": STRING},
+            )
+        ],
+    ),
+    (
+        "follows.csv",
+        [
+            RelationshipSource(
+                "FOLLOWS", _USUARIO, ("Usuario", "seguido_id"), _FOLLOWS
+            )
+        ],
+    ),
+    (
+        "follows_influencers.csv",
+        [
+            RelationshipSource(
+                "FOLLOWS", _USUARIO, ("Usuario", "seguido_id"), _FOLLOWS
+            )
+        ],
+    ),
+    (
+        "likes.csv",
+        [
+            RelationshipSource(
+                "LIKES",
+                _USUARIO,
+                (label, "contenido_id"),
+                _LIKE,
+                when=("tipo_contenido", kind),
+            )
+            for kind, label in _CONTENT.items()
+        ],
+    ),
+    (
+        "commented_on.csv",
+        [
+            RelationshipSource(
+                "COMMENTED_ON",
+                _USUARIO,
+                (_CONTENT[kind], "contenido_id"),
+                _COMMENT,
+                when=("tipo_contenido", kind),
+            )
+            for kind in ["Post", "Reel"]
+        ],
+    ),
+    (
+        "belongs_to.csv",
+        [
+            RelationshipSource(
+                "BELONGS_TO",
+                ("Publicacion", "contenido_id"),
+                _USUARIO,
+                _BELONGS,
+                when=("tipo_contenido", "Post"),
+            ),
+            # En los comentarios la fecha se guarda como fecha_comentario
+            RelationshipSource(
+                "BELONGS_TO",
+                ("Comentario", "contenido_id"),
+                _USUARIO,
+                {"fecha_comentario": DATE, "privado": BOOLEAN, "categoria": STRING},
+                columns={"fecha_comentario": "fecha_creacion"},
+                when=("tipo_contenido", "Comment"),
+            ),
+        ],
+    ),
+    (
+        "member_of.csv",
+        [
+            RelationshipSource(
+                "MEMBER_OF",
+                _USUARIO,
+                ("Grupo", "grupo_id"),
+                {"desde": DATE, "rol": STRING, "activo": BOOLEAN},
+            )
+        ],
+    ),
+    (
+        "created.csv",
+        [
+            RelationshipSource(
+                "CREATED",
+                _USUARIO,
+                ("Reel", "reel_id"),
+                {"fecha_creacion": DATE, **_PUBLISH},
+            )
+        ],
+    ),
+    (
+        "watched.csv",
+        [
+            RelationshipSource(
+                "WATCHED",
+                _USUARIO,
+                ("Reel", "reel_id"),
+                {"fecha_vista": DATE, "duracion_vista": INTEGER, "completo": BOOLEAN},
+            )
+        ],
+    ),
+    (
+        "mentions.csv",
+        [
+            RelationshipSource(
+                "MENTIONS",
+                _USUARIO,
+                ("Usuario", "mencionado_id"),
+                {"fecha_mencion": DATE, "tipo_mencion": STRING, "notificado": BOOLEAN},
+            )
+        ],
+    ),
+    (
+        "posted.csv",
+        [
+            RelationshipSource(
+                "POSTED",
+                _USUARIO,
+                ("Publicacion", "post_id"),
+                {"fecha_posteo": DATE, **_PUBLISH},
+            )
+        ],
+    ),
+]
+
+GRAPH_FILES = NODE_FILES + RELATIONSHIP_FILES
+
+
+class Checkpoint:
+    """
+    Filas confirmadas por archivo, en un JSON {"rows": {archivo: filas},
+    "done": [archivos terminados]} que se reescribe después de cada lote.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.rows, self.done = {}, set()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.rows, self.done = data["rows"], set(data["done"])
+
+    def save(self, filename, rows, done=False):
+        self.rows[filename] = rows
+        if done:
+            self.done.add(filename)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"rows": self.rows, "done": sorted(self.done)}, f)
+        # Reemplazo atómico: una interrupción nunca deja el JSON a medias
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def default_checkpoint(data_dir):
+    return os.path.join(data_dir, ".load_checkpoint.json")
+
+
+def source_paths(data_dir, filename):
+    """
+    Archivos de los que se lee 'filename': el archivo mismo o, si generateCSV.py
+    lo dejó en shards (--keep-shards), las partes de su carpeta en orden. Si no
+    está en CSV, se busca igual en Parquet (users.parquet, users/part-*.parquet).
+    """
+    name = os.path.splitext(filename)[0]
+    for extension in [CSV, PARQUET]:
+        path = os.path.join(data_dir, name + extension)
+        if os.path.exists(path):
+            return [path]
+        parts = sorted(glob.glob(os.path.join(data_dir, name, f"part-*{extension}")))
+        if parts:
+            return parts
+    return []
+
+
+def _parquet_rows(path, skip):
+    """
+    Registros de un archivo Parquet desde la fila 'skip' (a lo sumo la cantidad
+    de filas del archivo). Los grupos de filas anteriores no se leen.
+    """
+    parquet = pq.ParquetFile(path)
+    first = 0
+    while first < parquet.num_row_groups:
+        rows = parquet.metadata.row_group(first).num_rows
+        if skip < rows:
+            break
+        skip -= rows
+        first += 1
+    if first == parquet.num_row_groups:
+        return
+    row_groups = range(first, parquet.num_row_groups)
+    for batch in parquet.iter_batches(row_groups=row_groups):
+        records = batch.to_pylist()
+        if skip:
+            records, skip = records[skip:], max(skip - len(records), 0)
+        yield from records
+
+
+def read_rows(paths, skip=0):
+    """Registros ({columna: valor}) de los archivos, desde la fila 'skip'."""
+    for path in paths:
+        if path.endswith(PARQUET):
+            if pq is None:
+                raise RuntimeError(f"{path}: para leer Parquet hace falta pyarrow")
+            skipped = min(skip, pq.ParquetFile(path).metadata.num_rows)
+            yield from _parquet_rows(path, skipped)
+            skip -= skipped
+            continue
+        with open(path, newline="", encoding="utf-8") as f:
+            for record in csv.DictReader(f):
+                if skip:
+                    skip -= 1
+                    continue
+                yield record
+
+
+def write_batch(tx, queries):
+    """Función de transacción: ejecuta [(consulta, filas)] y suma los conteos."""
+    total = 0
+    for query, rows in queries:
+        if rows:
+            total += tx.run(query, rows=rows).single()["count"]
+    return total
+
+
+def load_file(session, sources, paths, batch_size, skip=0, on_batch=None):
+    """
+    Carga un archivo (o sus shards, en orden) desde la fila 'skip'. Después de
+    cada lote llama on_batch(filas confirmadas). Retorna (filas leídas,
+    elementos escritos, filas sin fuente).
+    """
+    queries = [source.query() for source in sources]
+    rows = read_rows(paths, skip)
+    read = written = ignored = 0
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            break
+        params = [[] for _ in sources]
+        for record in batch:
+            for i, source in enumerate(sources):
+                if source.matches(record):
+                    params[i].append(source.row(record))
+                    break
+            else:
+                ignored += 1
+        written += session.execute_write(write_batch, list(zip(queries, params)))
+        read += len(batch)
+        if on_batch is not None:
+            on_batch(skip + read)
+    return read, written, ignored
+
+
+def load(data_dir, batch_size, checkpoint_path=None, report=print):
+    """
+    Crea las restricciones y carga todos los archivos de GRAPH_FILES que existan
+    en data_dir, retomando desde el checkpoint si lo hay. Al terminar sin
+    errores el checkpoint se elimina.
+    """
+    checkpoint = Checkpoint(checkpoint_path or default_checkpoint(data_dir))
+    schema.bootstrap(report=report)
+
+    with neo4j_conn.session() as session:
+        for filename, sources in GRAPH_FILES:
+            if filename in checkpoint.done:
+                report(f"{filename}: ya cargado, se omite")
+                continue
+            paths = source_paths(data_dir, filename)
+            if not paths:
+                report(f"{filename}: no existe, se omite")
+                continue
+
+            skip = checkpoint.rows.get(filename, 0)
+            if skip:
+                report(f"{filename}: se retoma desde la fila {skip}")
+            start = time.perf_counter()
+            read, written, ignored = load_file(
+                session,
+                sources,
+                paths,
+                batch_size,
+                skip,
+                lambda rows: checkpoint.save(filename, rows),
+            )
+            elapsed = time.perf_counter() - start
+            checkpoint.save(filename, skip + read, done=True)
+
+            line = (
+                f"{filename}: {read} filas, {written} escritos en {elapsed:.1f} s "
+                f"({read / elapsed if elapsed else 0:,.0f} filas/s)"
+            )
+            missing = read - written - ignored
+            if missing:
+                line += f", {missing} sin nodos"
+            if ignored:
+                line += f", {ignored} con tipo desconocido"
+            report(line)
+
+    checkpoint.clear()
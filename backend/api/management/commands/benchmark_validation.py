@@ -0,0 +1,72 @@
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework import serializers
+
+from api.serializers import RelationshipBulkUpdateSerializer
+
+
+class ListFieldRelationshipsSerializer(serializers.Serializer):
+    # Validación anterior de RelationshipBulkUpdateSerializer, como referencia
+    relationships = serializers.ListField(child=serializers.DictField(), required=True)
+
+
+def sample_payload(rows):
+    return {
+        "relationships": [
+            {
+                "label1": "Usuario",
+                "node1_id": i,
+                "label2": "Publicacion",
+                "node2_id": i % 1000,
+                "rel_type": "LIKES",
+                "fecha_like": "2024-01-01",
+                "reaccion": "me_gusta",
+            }
+            for i in range(rows)
+        ]
+    }
+
+
+def best_time(serializer_class, payload, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        serializer = serializer_class(data=payload)
+        serializer.is_valid(raise_exception=True)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el tiempo de validación de un payload de update-bulk-relationships "
+        "con ListField(child=DictField()) y con la validación por esquema (BulkRowsField)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=50000,
+            help="Cantidad de relaciones del payload (por defecto 50000).",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Repeticiones por serializer; se reporta la mejor (por defecto 3).",
+        )
+
+    def handle(self, *args, **options):
+        payload = sample_payload(options["rows"])
+        legacy = best_time(ListFieldRelationshipsSerializer, payload, options["repeat"])
+        fast = best_time(RelationshipBulkUpdateSerializer, payload, options["repeat"])
+
+        self.stdout.write(f"Filas: {options['rows']}")
+        self.stdout.write(f"  ListField(child=DictField()): {legacy * 1000:9.1f} ms")
+        self.stdout.write(f"  BulkRowsField (esquema):      {fast * 1000:9.1f} ms")
+        self.stdout.write(
+            self.style.SUCCESS(f"  {legacy / fast:.1f}x más rápido")
+        )
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from api import schema
+
+
+class Command(BaseCommand):
+    help = (
+        "Crea (si no existen) las restricciones de unicidad sobre 'id' y los índices "
+        "de rango sobre las propiedades fecha_* en Neo4j, y reporta el progreso de "
+        "población de los índices."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--no-wait",
+            action="store_true",
+            help="No esperar a que los índices terminen de poblarse.",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=int,
+            default=300,
+            help="Segundos máximos de espera por los índices (por defecto 300).",
+        )
+
+    def handle(self, *args, **options):
+        created = schema.bootstrap(report=self.stdout.write)
+        if options["no_wait"] or not created:
+            return
+
+        self.stdout.write("Progreso de población de índices:")
+        if schema.wait_for_indexes(
+            created, timeout=options["timeout"], report=self.stdout.write
+        ):
+            self.stdout.write(self.style.SUCCESS("Todos los índices están ONLINE."))
+        else:
+            self.stdout.write(
+                self.style.WARNING(
+                    "Algunos índices siguen poblándose; Neo4j los terminará en segundo plano."
+                )
+            )
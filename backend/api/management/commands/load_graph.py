@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api import loader
+
+
+class Command(BaseCommand):
+    help = (
+        "Carga en Neo4j los CSV o Parquet generados por generateCSV.py: crea las "
+        "restricciones, carga los nodos y luego las relaciones por lotes (UNWIND), "
+        "y reporta las filas por segundo de cada archivo. Si se interrumpe, la "
+        "siguiente ejecución retoma desde el checkpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dir",
+            default=str(settings.BASE_DIR.parent / "docs"),
+            help="Carpeta con los archivos (por defecto, docs/ del repositorio).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Filas por lote y por transacción (por defecto 5000).",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            help="Archivo del checkpoint (por defecto, --dir/.load_checkpoint.json).",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignorar el checkpoint y cargar todos los archivos desde el inicio.",
+        )
+
+    def handle(self, *args, **options):
+        checkpoint = loader.Checkpoint(
+            options["checkpoint"] or loader.default_checkpoint(options["dir"])
+        )
+        if options["restart"]:
+            checkpoint.clear()
+        loader.load(
+            options["dir"],
+            options["batch_size"],
+            checkpoint.path,
+            report=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS("Carga completada."))
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:29
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BulkJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('operation', models.CharField(choices=[('update-bulk-relationships', 'update-bulk-relationships'), ('remove-bulk-relationship', 'remove-bulk-relationship'), ('delete-bulk-relationships', 'delete-bulk-relationships'), ('delete-multiple-nodes', 'delete-multiple-nodes')], max_length=50)),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('running', 'En ejecución'), ('completed', 'Completado'), ('failed', 'Fallido'), ('cancelled', 'Cancelado')], default='pending', max_length=20)),
+                ('total_rows', models.PositiveIntegerField(default=0)),
+                ('processed_rows', models.PositiveIntegerField(default=0)),
+                ('affected_count', models.PositiveIntegerField(default=0)),
+                ('error_count', models.PositiveIntegerField(default=0)),
+                ('errors', models.JSONField(default=list)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('cancel_requested', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
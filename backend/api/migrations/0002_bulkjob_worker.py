@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bulkjob',
+            name='worker',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+    ]
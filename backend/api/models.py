@@ -1,3 +1,67 @@
+import uuid
+
 from django.db import models
+from django.utils import timezone
+
+
+class BulkJob(models.Model):
+    """
+    Estado de un trabajo masivo que se ejecuta fuera de la petición HTTP (ver
+    jobs.py). El trabajador actualiza el progreso después de cada lote, y
+    cualquier proceso puede consultarlo o pedir la cancelación, porque el
+    estado vive en la base de datos de Django y no en memoria.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    STATUS_CHOICES = [
+        (PENDING, "Pendiente"),
+        (RUNNING, "En ejecución"),
+        (COMPLETED, "Completado"),
+        (FAILED, "Fallido"),
+        (CANCELLED, "Cancelado"),
+    ]
+    FINISHED = [COMPLETED, FAILED, CANCELLED]
+
+    # Endpoints masivos que se pueden ejecutar como trabajo
+    OPERATION_CHOICES = [
+        ("update-bulk-relationships", "update-bulk-relationships"),
+        ("remove-bulk-relationship", "remove-bulk-relationship"),
+        ("delete-bulk-relationships", "delete-bulk-relationships"),
+        ("delete-multiple-nodes", "delete-multiple-nodes"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    operation = models.CharField(max_length=50, choices=OPERATION_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    total_rows = models.PositiveIntegerField(default=0)
+    processed_rows = models.PositiveIntegerField(default=0)
+    affected_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    # Primeros errores, para consultarlos mientras el trabajo avanza
+    errors = models.JSONField(default=list)
+    # Respuesta final, con el mismo formato que los endpoints NDJSON
+    result = models.JSONField(null=True, blank=True)
+    cancel_requested = models.BooleanField(default=False)
+    # "host:pid" del proceso cuyo pool ejecuta el trabajo (ver jobs.fail_orphaned)
+    worker = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.operation} {self.id} ({self.status})"
 
-# Create your models here.
+    def throughput(self):
+        """Filas procesadas por segundo desde que empezó el trabajo."""
+        if self.started_at is None:
+            return 0.0
+        end = self.finished_at or timezone.now()
+        elapsed = (end - self.started_at).total_seconds()
+        return self.processed_rows / elapsed if elapsed > 0 else 0.0
@@ -0,0 +1,47 @@
+"""
+Lectura de cuerpos NDJSON (un objeto JSON por línea) en los endpoints masivos.
+
+Las líneas se leen del request a medida que se iteran, sin cargar todo el cuerpo
+como una sola estructura de Python. Una línea mal formada no detiene la lectura:
+se reporta como error de esa fila.
+"""
+
+import json
+
+from django.http import HttpRequest
+
+CONTENT_TYPE = "application/x-ndjson"
+
+
+def is_ndjson(request):
+    return request.content_type == CONTENT_TYPE
+
+
+def iter_objects(lines):
+    """
+    Recorre las líneas (bytes o str) y retorna (objeto, None) o (None, error)
+    por cada línea no vacía.
+    """
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            obj = json.loads(line)
+        except ValueError as e:
+            yield None, f"JSON inválido: {e}"
+            continue
+        if not isinstance(obj, dict):
+            yield None, "Se esperaba un objeto JSON."
+            continue
+        yield obj, None
+
+
+def request_objects(request):
+    """
+    iter_objects de las líneas del cuerpo. El HttpRequest de Django (vistas
+    async) se lee como un archivo; el Request de DRF lo expone en request.stream,
+    que es None si el cuerpo está vacío.
+    """
+    lines = request if isinstance(request, HttpRequest) else request.stream
+    return iter_objects(lines or [])
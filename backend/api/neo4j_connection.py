@@ -1,19 +1,144 @@
-from neo4j import GraphDatabase
+import asyncio
+import atexit
+import os
+import threading
+
+from neo4j import AsyncGraphDatabase, GraphDatabase
 from django.conf import settings
 
 
+def driver_config():
+    # Parámetros del pool configurables desde settings.py
+    return {
+        "max_connection_pool_size": settings.NEO4J_MAX_CONNECTION_POOL_SIZE,
+        "connection_acquisition_timeout": settings.NEO4J_CONNECTION_ACQUISITION_TIMEOUT,
+        "max_connection_lifetime": settings.NEO4J_MAX_CONNECTION_LIFETIME,
+        "keep_alive": settings.NEO4J_KEEP_ALIVE,
+    }
+
+
 class Neo4jConnection:
+    """
+    Envoltura del driver de Neo4j compartido por todas las vistas.
+
+    El driver (y su pool de conexiones) se crea de forma perezosa la primera vez
+    que se pide una sesión, y se vuelve a crear si el proceso actual no es el que
+    lo creó. Así, con servidores pre-fork (gunicorn), cada worker abre sus propios
+    sockets después del fork en lugar de heredar los del proceso maestro.
+    """
+
     def __init__(self):
-        self._driver = GraphDatabase.driver(
-            settings.NEO4J_URI, auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD)
-        )
+        self._driver = None
+        self._pid = None
+        self._lock = threading.Lock()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        # En el hijo solo existe el hilo que hizo el fork, por lo que nadie más
+        # puede estar usando el lock: se reemplaza por si quedó tomado en el
+        # padre. El driver heredado no se cierra aquí para no tocar sockets que
+        # el padre sigue usando.
+        self._driver = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def driver(self):
+        pid = os.getpid()
+        driver = self._driver
+        if driver is not None and self._pid == pid:
+            return driver
+        with self._lock:
+            # El pid se vuelve a comparar por si register_at_fork no existe
+            if self._driver is None or self._pid != pid:
+                self._driver = GraphDatabase.driver(
+                    settings.NEO4J_URI,
+                    auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD),
+                    **driver_config(),
+                )
+                self._pid = pid
+            return self._driver
+
+    def session(self, **kwargs):
+        kwargs.setdefault("fetch_size", settings.NEO4J_FETCH_SIZE)
+        return self.driver.session(**kwargs)
 
     def close(self):
-        self._driver.close()
+        # Solo el proceso que creó el driver debe cerrarlo
+        if self._driver is not None and self._pid == os.getpid():
+            self._driver.close()
+        self._driver = None
+        self._pid = None
 
     def run_query(self, query, parameters=None):
-        with self._driver.session() as session:
-            return session.run(query, parameters)
+        with self.session() as session:
+            return list(session.run(query, parameters))
+
+
+class AsyncNeo4jConnection:
+    """
+    Equivalente asíncrono de Neo4jConnection para las vistas de async_views.py.
+
+    El driver asíncrono queda ligado al event loop en el que se crea, por lo que
+    hay uno por loop, creado de forma perezosa dentro de él: bajo ASGI
+    (uvicorn/daphne) es uno por proceso; bajo WSGI Django crea un loop por
+    petición y conviene usar las vistas síncronas. Cada driver se cierra dentro
+    de su propio loop cuando este termina (ver _close_with_loop), para no dejar
+    abiertos el pool y los sockets de un loop que ya no existe.
+    """
+
+    def __init__(self):
+        self._drivers = {}  # {loop: (driver, generador que lo cierra)}
+
+    @property
+    def driver(self):
+        loop = asyncio.get_running_loop()
+        entry = self._drivers.get(loop)
+        if entry is None:
+            driver = AsyncGraphDatabase.driver(
+                settings.NEO4J_URI,
+                auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD),
+                **driver_config(),
+            )
+            closer = self._close_with_loop(loop, driver)
+            entry = self._drivers[loop] = (driver, closer)
+            # Se avanza hasta el yield para que el loop lo registre (si close()
+            # lo cerró antes, anext retorna None)
+            asyncio.ensure_future(anext(closer, None))
+        return entry[0]
+
+    async def _close_with_loop(self, loop, driver):
+        # Generador asíncrono que queda suspendido mientras el loop corre: al
+        # terminar (asyncio.run, async_to_sync, apagado del servidor) el loop lo
+        # cierra con shutdown_asyncgens() y el driver se cierra en ese loop
+        try:
+            yield
+        finally:
+            # Solo si la entrada sigue siendo la de este driver: close() pudo
+            # haberla quitado y el loop ya tener uno nuevo
+            if self._drivers.get(loop, (None,))[0] is driver:
+                del self._drivers[loop]
+            await driver.close()
+
+    def session(self, **kwargs):
+        kwargs.setdefault("fetch_size", settings.NEO4J_FETCH_SIZE)
+        return self.driver.session(**kwargs)
+
+    async def close(self):
+        entry = self._drivers.pop(asyncio.get_running_loop(), None)
+        if entry is not None:
+            driver, closer = entry
+            # Termina el generador de _close_with_loop en lugar de dejarlo
+            # suspendido hasta el fin del loop; si todavía no había arrancado no
+            # cierra nada, por eso también se cierra el driver (close() es
+            # idempotente)
+            await closer.aclose()
+            await driver.close()
 
 
 neo4j_conn = Neo4jConnection()
+async_neo4j_conn = AsyncNeo4jConnection()
+
+# Cerrar el pool al terminar el proceso (por ejemplo, al apagar un worker)
+atexit.register(neo4j_conn.close)
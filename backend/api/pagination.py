@@ -0,0 +1,96 @@
+"""
+Cursores opacos para la paginación por keyset de search_nodes y del feed.
+
+El cursor codifica (en base64 url-safe) la propiedad de orden, su valor y el 'id'
+del último nodo de la página. La siguiente página continúa justo después de ese
+nodo con WHERE (n.<orden>, n.id) > (valor, id), sin volver a recorrer los
+resultados anteriores como haría un SKIP. El cursor del feed guarda en cambio
+la fecha, el tipo y el 'id' del último elemento (ver feed.py).
+"""
+
+import base64
+import datetime
+import json
+
+from . import coercion
+from .catalog import PROPERTY_KEY, InvalidIdentifier, catalog, is_identifier
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _encode(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii")
+
+
+def encode_cursor(order_by, value, node_id):
+    return _encode({"o": order_by, "v": value, "id": node_id})
+
+
+def decode_cursor(cursor):
+    """Retorna {"order_by", "value", "id"} o lanza InvalidCursor."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        order_by, value, node_id = payload["o"], payload["v"], payload["id"]
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor("Cursor inválido.")
+
+    # El cliente puede armar el cursor a mano y la propiedad se interpola en el
+    # Cypher (n.<orden>): se valida igual que un order_by explícito
+    if not is_identifier(order_by):
+        raise InvalidCursor("Cursor inválido.")
+    try:
+        order_by = catalog.resolve(PROPERTY_KEY, order_by, must_exist=True)
+    except InvalidIdentifier as e:
+        raise InvalidCursor(f"Cursor inválido: {e}")
+
+    # Las fechas viajan como texto ISO 8601 y se comparan como date en Neo4j
+    if coercion.is_date_property(None, order_by) and isinstance(value, str):
+        try:
+            value = datetime.date.fromisoformat(value)
+        except ValueError:
+            raise InvalidCursor("Cursor inválido.")
+    return {"order_by": order_by, "value": value, "id": node_id}
+
+
+def encode_feed_cursor(fecha, kind, item_id):
+    return _encode({"f": coercion.to_json_value(fecha), "k": kind, "id": item_id})
+
+
+def decode_feed_cursor(cursor):
+    """Retorna {"fecha", "kind", "id"} o lanza InvalidCursor."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        fecha = datetime.date.fromisoformat(payload["f"])
+        return {"fecha": fecha, "kind": payload["k"], "id": payload["id"]}
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor("Cursor inválido.")
+
+
+def next_cursor(nodes, order_by, limit):
+    """
+    Cursor de la página siguiente, o None si esta es la última (menos nodos que
+    el límite). 'nodes' son los diccionarios de la respuesta (ver node_from_record).
+    """
+    if not nodes or limit is None or len(nodes) < limit:
+        return None
+    last = nodes[-1]["properties"]
+    value = coercion.to_json_value(last.get(order_by))
+    return encode_cursor(order_by, value, last.get("id"))
+
+
+DEFAULT_LIMIT = 100
+
+
+def search_options(data):
+    """
+    Retorna (order_by, after, limit) para search_nodes a partir de los datos
+    validados. Sin 'limit' se usan 100 nodos, salvo en streaming (sin límite).
+    """
+    after = data.get("cursor")
+    order_by = data.get("order_by") or (after["order_by"] if after else None)
+    limit = data.get("limit")
+    if limit is None and not data.get("stream"):
+        limit = DEFAULT_LIMIT
+    return order_by, after, limit
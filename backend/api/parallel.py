@@ -0,0 +1,133 @@
+"""
+Ejecución en paralelo de los trabajos masivos de relaciones muy grandes.
+
+Con parallel=true, en lugar de una sola transacción con todas las filas, las
+filas se reparten en lotes de a lo sumo chunk_size filas y cada lote se aplica
+en su propia transacción, con varios lotes a la vez en un pool acotado de
+hilos (cada uno con su propia sesión del driver compartido).
+
+Todas las filas de un mismo nodo de inicio (label1, node1_id) van en el mismo
+lote, de modo que dos lotes concurrentes nunca bloquean el mismo nodo de
+inicio; en los nodos densos, que acumulan muchas relaciones, es donde más se
+notan los conflictos. Un lote que choca con otro en un nodo de destino puede
+terminar en un deadlock: Neo4j aborta una de las transacciones y el lote se
+reintenta con una espera exponencial. Si se agotan los reintentos, las filas
+del lote se reportan como errores y el resto del trabajo sigue.
+"""
+
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from neo4j.exceptions import DriverError, Neo4jError
+
+from . import bulk, cypher
+from .neo4j_connection import neo4j_conn
+
+
+def partition_by_start_node(groups, chunk_size=None):
+    """
+    Reparte {firma: [filas]} (ver bulk.group_relationships) en lotes con el
+    mismo formato. Las filas de un mismo nodo de inicio nunca se separan, aunque
+    tengan distinto rel_type, por lo que un lote puede superar chunk_size si un
+    solo nodo tiene más filas. chunk_size es BULK_PARALLEL_CHUNK_SIZE por defecto.
+    """
+    chunk_size = chunk_size or settings.BULK_PARALLEL_CHUNK_SIZE
+    by_start = {}
+    for signature, rows in groups.items():
+        for row in rows:
+            start = by_start.setdefault((signature[0], row["node1_id"]), {})
+            start.setdefault(signature, []).append(row)
+
+    chunks, chunk, size = [], {}, 0
+    for start_groups in by_start.values():
+        start_size = bulk.count_rows(start_groups)
+        if size and size + start_size > chunk_size:
+            chunks.append(chunk)
+            chunk, size = {}, 0
+        for signature, rows in start_groups.items():
+            chunk.setdefault(signature, []).extend(rows)
+        size += start_size
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+# Errores que hacen fallar un lote sin detener los demás
+CHUNK_ERRORS = (Neo4jError, DriverError)
+
+
+def is_retryable(error):
+    # DeadlockDetected y el resto de los errores transitorios de Neo4j, o una
+    # conexión perdida
+    return isinstance(error, CHUNK_ERRORS) and error.is_retryable()
+
+
+def backoff_delay(attempt):
+    """Segundos de espera antes del reintento número attempt (desde 1)."""
+    delay = settings.BULK_RETRY_BACKOFF * 2 ** (attempt - 1)
+    return delay + random.uniform(0, delay)  # jitter para no reintentar a la vez
+
+
+def retry_delay(error, attempt):
+    """
+    Segundos de espera antes del reintento número attempt de un lote que falló
+    con error, o None si no se reintenta.
+    """
+    if not is_retryable(error) or attempt > settings.BULK_DEADLOCK_RETRIES:
+        return None
+    return backoff_delay(attempt)
+
+
+def chunk_failure(chunk, error):
+    # {idx: mensaje} de todas las filas de un lote que no se pudo aplicar
+    message = f"No se pudo aplicar el lote: {error}"
+    return {row["idx"]: message for rows in chunk.values() for row in rows}
+
+
+def merge_results(results):
+    # Agrega los (matched, fallidas) de cada lote
+    matched, failed = {}, {}
+    for chunk_matched, chunk_failed in results:
+        matched.update(chunk_matched)
+        failed.update(chunk_failed)
+    return matched, failed
+
+
+def run_chunk(chunk, query_fn):
+    """
+    Aplica un lote en su propia sesión y transacción. Retorna (matched,
+    fallidas): {idx: relaciones afectadas} y {idx: mensaje}.
+
+    Se usa una transacción explícita en lugar de execute_write para que los
+    reintentos sigan BULK_DEADLOCK_RETRIES y BULK_RETRY_BACKOFF; execute_write
+    reintentaría por su cuenta hasta max_transaction_retry_time (30 s).
+    """
+    attempt = 0
+    while True:
+        try:
+            with neo4j_conn.session() as session:
+                with session.begin_transaction() as tx:
+                    matched = cypher.run_steps(tx, bulk.run_groups, chunk, query_fn)
+                    tx.commit()
+            return matched, {}
+        except CHUNK_ERRORS as e:
+            attempt += 1
+            delay = retry_delay(e, attempt)
+            if delay is None:
+                return {}, chunk_failure(chunk, e)
+            time.sleep(delay)
+
+
+def run_parallel(groups, query_fn, chunk_size=None, workers=None):
+    """
+    Aplica todos los lotes con a lo sumo 'workers' a la vez y agrega los
+    resultados. Retorna (matched, fallidas) como run_chunk.
+    """
+    chunks = partition_by_start_node(groups, chunk_size)
+    workers = min(workers or settings.BULK_PARALLEL_WORKERS, len(chunks) or 1)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return merge_results(
+            pool.map(lambda chunk: run_chunk(chunk, query_fn), chunks)
+        )
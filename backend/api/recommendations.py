@@ -0,0 +1,235 @@
+"""
+Índice de candidatos para "personas que quizás conozcas".
+
+Expandir en cada petición los amigos de los amigos de un usuario recorre miles
+de relaciones cuando alguno de sus amigos es un usuario muy conectado. En lugar
+de eso, el índice lee una sola vez todas las relaciones FRIENDS_WITH, FOLLOWS y
+MEMBER_OF y los intereses de los usuarios, y precalcula para cada usuario sus
+mejores RECOMMENDATION_INDEX_SIZE candidatos. La petición solo busca la lista
+del usuario y toma los primeros 'limit'.
+
+Un candidato suma un punto por cada amigo en común (FRIENDS_WITH en cualquier
+dirección), por cada grupo que comparten (MEMBER_OF) y por cada usuario seguido
+que lo sigue a su vez (FOLLOWS); los empates se ordenan por la cantidad de
+intereses en común. Los intermediarios con más de RECOMMENDATION_MAX_DEGREE
+relaciones (influencers, grupos enormes) no se expanden: aportan poca señal y
+son los que harían crecer el cálculo de forma cuadrática. Nunca se recomienda
+al propio usuario, a sus amigos ni a quienes ya sigue.
+
+El índice vive en memoria de cada proceso y nunca se construye dentro de una
+petición: en el proceso maestro de gunicorn antes de crear los workers, que lo
+heredan (ver gunicorn.conf.py), o en un hilo aparte al iniciar cada worker
+(RECOMMENDATION_INDEX_WARMUP) o con la primera petición. Mientras no está listo,
+recommend() lanza IndexNotReady y las vistas responden 503. Pasados
+RECOMMENDATION_INDEX_TTL segundos se reconstruye de la misma forma, mientras se
+siguen respondiendo las peticiones con el anterior.
+"""
+
+import heapq
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.utils import timezone
+
+from .neo4j_connection import neo4j_conn
+
+logger = logging.getLogger(__name__)
+
+
+class IndexNotReady(Exception):
+    pass
+
+
+NOT_READY_MESSAGE = (
+    "El índice de recomendaciones se está construyendo; intente de nuevo en "
+    "unos segundos."
+)
+RETRY_AFTER = 5  # segundos, para el encabezado Retry-After de la respuesta 503
+
+USERS_QUERY = """
+MATCH (u:Usuario)
+RETURN u.id AS id, u.nombre AS nombre, u.intereses AS intereses
+"""
+
+FRIENDS_QUERY = """
+MATCH (a:Usuario)-[:FRIENDS_WITH]->(b:Usuario)
+RETURN a.id AS a, b.id AS b
+"""
+
+FOLLOWS_QUERY = """
+MATCH (a:Usuario)-[:FOLLOWS]->(b:Usuario)
+RETURN a.id AS a, b.id AS b
+"""
+
+MEMBERS_QUERY = """
+MATCH (u:Usuario)-[:MEMBER_OF]->(g:Grupo)
+RETURN g.id AS grupo, collect(u.id) AS miembros
+"""
+
+
+def _expand(user_ids, neighbors, max_degree, exclude):
+    """
+    Cuenta cuántas veces aparece cada usuario entre los vecinos de user_ids,
+    sin expandir los intermediarios con más de max_degree vecinos.
+    """
+    counts = Counter()
+    for user_id in user_ids:
+        reached = neighbors.get(user_id, ())
+        if len(reached) > max_degree:
+            continue
+        counts.update(reached)
+    for user_id in exclude:
+        counts.pop(user_id, None)
+    return counts
+
+
+def build_entries(users, friends, following, members, size, max_degree):
+    """
+    Retorna {id: [(puntaje, intereses en común, candidato, amigos, grupos,
+    seguidos)]} con los 'size' mejores candidatos de cada usuario.
+    """
+    user_groups = defaultdict(list)
+    for group_id, group_members in members.items():
+        for user_id in group_members:
+            user_groups[user_id].append(group_id)
+
+    entries = {}
+    for user_id, (_, interests) in users.items():
+        exclude = friends.get(user_id, set()) | following.get(user_id, set())
+        exclude.add(user_id)
+
+        mutual = _expand(friends.get(user_id, ()), friends, max_degree, exclude)
+        shared = _expand(user_groups.get(user_id, ()), members, max_degree, exclude)
+        via = _expand(following.get(user_id, ()), following, max_degree, exclude)
+
+        scored = []
+        for candidate in mutual.keys() | shared.keys() | via.keys():
+            common = len(interests & users[candidate][1]) if candidate in users else 0
+            scored.append(
+                (
+                    mutual[candidate] + shared[candidate] + via[candidate],
+                    common,
+                    candidate,
+                    mutual[candidate],
+                    shared[candidate],
+                    via[candidate],
+                )
+            )
+        entries[user_id] = heapq.nlargest(size, scored)
+    return entries
+
+
+class CandidateIndex:
+    def __init__(self):
+        self._users = None  # {id: (nombre, set de intereses)}
+        self._entries = None  # ver build_entries
+        self._built_at = None
+        self._built_on = None  # fecha de construcción, para la respuesta
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def _load(self):
+        users, members = {}, {}
+        friends, following = defaultdict(set), defaultdict(set)
+        with neo4j_conn.session() as session:
+            for user_id, nombre, intereses in session.run(USERS_QUERY).values():
+                users[user_id] = (nombre, set(intereses or ()))
+            for a, b in session.run(FRIENDS_QUERY).values():
+                # La amistad es mutua aunque la relación tenga dirección
+                friends[a].add(b)
+                friends[b].add(a)
+            for a, b in session.run(FOLLOWS_QUERY).values():
+                following[a].add(b)
+            for group_id, group_members in session.run(MEMBERS_QUERY).values():
+                members[group_id] = group_members
+        return users, friends, following, members
+
+    def refresh(self):
+        users, friends, following, members = self._load()
+        entries = build_entries(
+            users,
+            friends,
+            following,
+            members,
+            settings.RECOMMENDATION_INDEX_SIZE,
+            settings.RECOMMENDATION_MAX_DEGREE,
+        )
+        with self._lock:
+            self._users, self._entries = users, entries
+            self._built_at = time.monotonic()
+            self._built_on = timezone.now()
+
+    def _refresh_in_background(self):
+        try:
+            self.refresh()
+        except Exception:
+            logger.exception("No se pudo construir el índice de recomendaciones")
+            with self._lock:
+                # Con un índice anterior se reintenta recién en el próximo TTL;
+                # sin ninguno, con la próxima petición
+                if self._entries is not None:
+                    self._built_at = time.monotonic()
+        finally:
+            self._refreshing = False
+
+    def start_refresh(self):
+        """Inicia una construcción en segundo plano, si no hay una en curso."""
+        with self._lock:
+            if self._refreshing:
+                return False
+            self._refreshing = True
+        threading.Thread(
+            target=self._refresh_in_background,
+            name="recommendation-index",
+            daemon=True,
+        ).start()
+        return True
+
+    def is_built(self):
+        with self._lock:
+            return self._entries is not None
+
+    def _ensure_fresh(self):
+        with self._lock:
+            built_at = self._built_at
+        if (
+            built_at is None
+            or time.monotonic() - built_at > settings.RECOMMENDATION_INDEX_TTL
+        ):
+            self.start_refresh()
+
+    def recommend(self, user_id, limit):
+        """
+        Retorna (lista de recomendaciones, fecha de construcción del índice), o
+        (None, fecha) si el usuario no estaba en el índice. Solo lee la memoria:
+        si el índice todavía no se construyó lanza IndexNotReady.
+        """
+        self._ensure_fresh()
+        with self._lock:
+            users, entries, built_on = self._users, self._entries, self._built_on
+        if entries is None:
+            raise IndexNotReady
+        if user_id not in users:
+            return None, built_on
+        interests = users[user_id][1]
+        recommendations = []
+        for score, _, candidate, friends, groups, follows in entries[user_id][:limit]:
+            nombre, candidate_interests = users.get(candidate, (None, set()))
+            recommendations.append(
+                {
+                    "id": candidate,
+                    "nombre": nombre,
+                    "score": score,
+                    "mutualFriends": friends,
+                    "sharedGroups": groups,
+                    "mutualFollows": follows,
+                    "sharedInterests": sorted(interests & candidate_interests),
+                }
+            )
+        return recommendations, built_on
+
+
+index = CandidateIndex()
@@ -0,0 +1,104 @@
+"""
+Codificación JSON de las respuestas.
+
+Con orjson instalado (pip install orjson) las respuestas se codifican en C, y
+las fechas de Python (date, datetime, time) se escriben en ISO 8601 sin pasar
+por Python; las de Neo4j (neo4j.time) se convierten en la función default, que
+orjson solo llama para los valores que no sabe codificar. Así las vistas pueden
+retornar las propiedades de los nodos tal como llegan del driver, sin recorrer
+cada valor para convertir las fechas. Sin orjson se usa el json de la librería
+estándar con un encoder que hace la misma conversión.
+"""
+
+import decimal
+import json
+
+import neo4j.time
+from django.http import HttpResponse
+from django.utils.functional import Promise
+from rest_framework import renderers
+from rest_framework.utils import encoders
+
+from . import coercion
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+    orjson = None
+
+
+def default(obj):
+    # Solo se llama con los valores que orjson no codifica por sí mismo
+    value = coercion.to_json_value(obj)
+    if value is not obj:
+        return value
+    if isinstance(obj, Promise):
+        return str(obj)
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    raise TypeError(f"Objeto de tipo {type(obj).__name__} no serializable a JSON")
+
+
+def _durations_to_iso(value):
+    if isinstance(value, neo4j.time.Duration):
+        return value.iso_format()
+    if isinstance(value, dict):
+        return {key: _durations_to_iso(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_durations_to_iso(item) for item in value]
+    return value
+
+
+class JSONEncoder(encoders.JSONEncoder):
+    """Encoder de DRF que además convierte las fechas de neo4j.time."""
+
+    def iterencode(self, o, _one_shot=False):
+        # Duration es una tupla: json la escribiría como lista sin llamar a default
+        return super().iterencode(_durations_to_iso(o), _one_shot)
+
+    def default(self, obj):
+        value = coercion.to_json_value(obj)
+        if value is not obj:
+            return value
+        return super().default(obj)
+
+
+def dumps(data, indent=None):
+    """Retorna los bytes UTF-8 del JSON de data."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=default, option=option)
+    return json.dumps(
+        data, cls=JSONEncoder, ensure_ascii=False, indent=indent
+    ).encode("utf-8")
+
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    """
+    JSONRenderer de DRF que codifica con orjson cuando está instalado. Se
+    registra en REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] (ver settings.py).
+    """
+
+    encoder_class = JSONEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        return dumps(data, indent=indent)
+
+
+class JsonResponse(HttpResponse):
+    """
+    Misma interfaz que django.http.JsonResponse, pero codificada con dumps();
+    la usan las vistas de async_views.py, que no pasan por los renderers de DRF.
+    """
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(content=dumps(data), **kwargs)
@@ -0,0 +1,119 @@
+"""
+Restricciones e índices de Neo4j que necesitan los endpoints.
+
+Todas las vistas buscan nodos con MATCH (n:Label {id: $id}); sin una restricción
+de unicidad sobre 'id' cada búsqueda recorre todos los nodos del label. Las
+sentencias usan IF NOT EXISTS, por lo que bootstrap() se puede ejecutar cuantas
+veces se quiera.
+"""
+
+import time
+
+from .neo4j_connection import neo4j_conn
+
+# Labels cuyos nodos se identifican por la propiedad 'id'. El script de carga usa
+# 'Publicacion' y 'Verified' mientras que el README usa 'Post'; se incluyen ambos.
+ID_LABELS = [
+    "Usuario",
+    "Influencers",
+    "Verified",
+    "Post",
+    "Publicacion",
+    "Comentario",
+    "Reel",
+    "Grupo",
+]
+
+# Propiedades de fecha por label que se filtran en search_nodes
+DATE_PROPERTIES = {
+    "Usuario": ["fecha_registro"],
+    "Post": ["fecha_publicacion"],
+    "Publicacion": ["fecha_publicacion"],
+    "Comentario": ["fecha_comentario"],
+    "Reel": ["fecha_publicacion"],
+}
+
+
+def constraint_name(label):
+    return f"{label.lower()}_id_unique"
+
+
+def index_name(label, prop):
+    return f"{label.lower()}_{prop}_range"
+
+
+def schema_statements():
+    """Retorna la lista de (nombre, sentencia Cypher) a ejecutar."""
+    statements = []
+    for label in ID_LABELS:
+        name = constraint_name(label)
+        statements.append(
+            (
+                name,
+                f"CREATE CONSTRAINT {name} IF NOT EXISTS "
+                f"FOR (n:{label}) REQUIRE n.id IS UNIQUE",
+            )
+        )
+    for label, props in DATE_PROPERTIES.items():
+        for prop in props:
+            name = index_name(label, prop)
+            statements.append(
+                (
+                    name,
+                    f"CREATE RANGE INDEX {name} IF NOT EXISTS "
+                    f"FOR (n:{label}) ON (n.{prop})",
+                )
+            )
+    return statements
+
+
+def bootstrap(report=print):
+    """
+    Crea las restricciones e índices. Una sentencia que falla (por ejemplo, por
+    ids duplicados) se reporta y no detiene las demás. Retorna los nombres de
+    los índices que quedaron creados.
+    """
+    created = []
+    with neo4j_conn.session() as session:
+        for name, statement in schema_statements():
+            try:
+                session.run(statement).consume()
+            except Exception as e:
+                report(f"[error] {name}: {e}")
+                continue
+            created.append(name)
+            report(f"[ok] {name}")
+    return created
+
+
+def index_progress(names):
+    """Retorna [(nombre, estado, porcentaje de población)] de los índices indicados."""
+    query = """
+    SHOW INDEXES YIELD name, state, populationPercent
+    WHERE name IN $names
+    RETURN name, state, populationPercent
+    """
+    with neo4j_conn.session() as session:
+        return [
+            (record["name"], record["state"], record["populationPercent"])
+            for record in session.run(query, names=names)
+        ]
+
+
+def wait_for_indexes(names, timeout=300, interval=2, report=print):
+    """
+    Espera a que los índices (incluidos los que respaldan las restricciones)
+    estén ONLINE, reportando el porcentaje de población. Retorna True si todos
+    quedaron ONLINE antes del timeout.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        progress = index_progress(names)
+        pending = [p for p in progress if p[1] != "ONLINE"]
+        for name, state, percent in progress:
+            report(f"  {name}: {state} ({percent:.1f}%)")
+        if not pending:
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(interval)
@@ -1,23 +1,110 @@
 from rest_framework import serializers
 
+from .bulk import BEST_EFFORT, MODES
+from .catalog import (
+    LABEL,
+    PROPERTY_KEY,
+    RELATIONSHIP_TYPE,
+    InvalidIdentifier,
+    catalog,
+)
+from .models import BulkJob
+from .pagination import InvalidCursor, decode_cursor, decode_feed_cursor
+from .validation import (
+    BulkRowsField,
+    RELATIONSHIP_MERGE_SCHEMA,
+    RELATIONSHIP_REMOVE_SCHEMA,
+    RELATIONSHIP_SCHEMA,
+)
+
+
+class IdentifierField(serializers.CharField):
+    """
+    Label, tipo de relación o propiedad que se interpola en el texto Cypher. Se
+    valida contra el catálogo de esquema y se reemplaza por su nombre canónico.
+    Con must_exist=False (endpoints de creación) basta con que la sintaxis sea
+    válida.
+    """
+
+    kind = None
+
+    def __init__(self, must_exist=True, **kwargs):
+        self.must_exist = must_exist
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        value = super().to_internal_value(data)
+        try:
+            return catalog.resolve(self.kind, value, self.must_exist)
+        except InvalidIdentifier as e:
+            raise serializers.ValidationError(str(e))
+
+
+class LabelField(IdentifierField):
+    kind = LABEL
+
+
+class RelationshipTypeField(IdentifierField):
+    kind = RELATIONSHIP_TYPE
+
+
+class PropertyKeyField(IdentifierField):
+    kind = PROPERTY_KEY
+
+
+def validate_property_keys(properties, must_exist=False):
+    # Para diccionarios cuyas claves se interpolan en el Cypher (n.<clave> = ...)
+    errors = []
+    for key in properties:
+        try:
+            catalog.resolve(PROPERTY_KEY, key, must_exist)
+        except InvalidIdentifier as e:
+            errors.append(str(e))
+    if errors:
+        raise serializers.ValidationError(errors)
+    return properties
+
 
 class NodeCreateSingleSerializer(serializers.Serializer):
-    label = serializers.CharField(required=False)
+    label = LabelField(must_exist=False, required=False)
 
 
 class NodeCreateMultipleLabelsSerializer(serializers.Serializer):
     labels = serializers.ListField(
-        child=serializers.CharField(), required=False  # Para múltiples etiquetas
+        child=LabelField(must_exist=False), required=False  # Para múltiples etiquetas
     )
 
 
 class NodeSerializer(serializers.Serializer):
-    label = serializers.CharField(required=False)
+    label = LabelField(must_exist=False, required=False)
     labels = serializers.ListField(
-        child=serializers.CharField(), required=False  # Para múltiples etiquetas
+        child=LabelField(must_exist=False), required=False  # Para múltiples etiquetas
     )
     properties = serializers.DictField(child=serializers.JSONField())
 
+    def validate_properties(self, value):
+        return validate_property_keys(value)
+
+
+class NodeBulkCreateSerializer(serializers.Serializer):
+    label = LabelField(must_exist=False, required=False)
+    labels = serializers.ListField(
+        child=LabelField(must_exist=False), required=False  # Labels comunes
+    )
+    # Propiedades de cada nodo. Con un cuerpo NDJSON se envía un nodo por línea
+    # (y label/labels/chunk_size como parámetros de la URL).
+    nodes = serializers.ListField(child=serializers.JSONField(), required=False)
+    chunk_size = serializers.IntegerField(required=False, min_value=1)
+
+    def validate(self, data):
+        labels = list(data.get("labels", []))
+        if data.get("label") and data["label"] not in labels:
+            labels.insert(0, data["label"])
+        if not labels:
+            raise serializers.ValidationError("Debe indicar 'label' o 'labels'.")
+        data["labels"] = labels
+        return data
+
 
 class FilterItemSerializer(serializers.Serializer):
     operator = serializers.ChoiceField(
@@ -27,15 +114,73 @@ class FilterItemSerializer(serializers.Serializer):
 
 
 class NodeSearchSerializer(serializers.Serializer):
-    labels = serializers.ListField(child=serializers.CharField(), required=False)
+    labels = serializers.ListField(child=LabelField(), required=False)
     # Ahora, cada filtro es un objeto con operator y value.
     filters = serializers.DictField(child=FilterItemSerializer(), required=False)
-    limit = serializers.IntegerField(required=False, default=100)
+    # Sin valor: 100 en respuestas normales, sin límite en streaming
+    limit = serializers.IntegerField(required=False, min_value=1)
+    # Paginación por keyset: propiedad de orden y cursor retornado por la página anterior
+    order_by = PropertyKeyField(required=False)
+    cursor = serializers.CharField(required=False)
+    # Retornar los nodos como NDJSON a medida que se leen de Neo4j
+    stream = serializers.BooleanField(required=False, default=False)
+
+    def validate_filters(self, value):
+        return validate_property_keys(value, must_exist=True)
+
+    def validate_cursor(self, value):
+        # decode_cursor ya valida la propiedad contra el catálogo
+        try:
+            return decode_cursor(value)
+        except InvalidCursor as e:
+            raise serializers.ValidationError(str(e))
+
+    def validate(self, data):
+        cursor = data.get("cursor")
+        if cursor and data.get("order_by", cursor["order_by"]) != cursor["order_by"]:
+            raise serializers.ValidationError(
+                {"cursor": "El cursor no corresponde al order_by indicado."}
+            )
+        return data
 
 
 class AggregatedDataSerializer(serializers.Serializer):
-    label = serializers.CharField(required=True)  # Ej: "Persona"
-    property = serializers.CharField(required=True)  # Ej: "edad"
+    label = LabelField(required=True)  # Ej: "Persona"
+    property = PropertyKeyField(required=True)  # Ej: "edad"
+
+
+class HistogramSerializer(serializers.Serializer):
+    property = PropertyKeyField(required=True)  # Ej: "likes"
+    bucket_size = serializers.FloatField(required=True)  # Ej: 500
+
+    def validate_bucket_size(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("Debe ser mayor que 0.")
+        return value
+
+
+class MultiAggregatedDataSerializer(AggregatedDataSerializer):
+    # Acepta 'property' (como AggregatedDataSerializer) o una lista en 'properties'
+    property = PropertyKeyField(required=False)
+    properties = serializers.ListField(
+        child=PropertyKeyField(), required=False
+    )  # Ej: ["likes", "duracion"]
+    group_by = PropertyKeyField(required=False)  # Ej: "categoria"
+    percentiles = serializers.ListField(
+        child=serializers.FloatField(min_value=0, max_value=1), required=False
+    )  # Ej: [0.5, 0.95]
+    histogram = HistogramSerializer(required=False)
+
+    def validate(self, data):
+        properties = list(data.get("properties", []))
+        if data.get("property") and data["property"] not in properties:
+            properties.insert(0, data["property"])
+        if not properties:
+            raise serializers.ValidationError(
+                "Debe indicar 'property' o al menos una propiedad en 'properties'."
+            )
+        data["properties"] = properties
+        return data
 
 
 class MultipleNodesUpdateSerializer(serializers.Serializer):
@@ -44,7 +189,7 @@ class MultipleNodesUpdateSerializer(serializers.Serializer):
         required=True,
         help_text="Lista de valores de la propiedad 'id' de los nodos.",
     )
-    label = serializers.CharField(
+    label = LabelField(
         required=True, help_text="Label de los nodos, por ejemplo, 'Usuario'."
     )
     properties = serializers.DictField(
@@ -58,59 +203,177 @@ class MultipleNodesPropertiesRemoveSerializer(serializers.Serializer):
         required=True,
         help_text="Lista de valores de la propiedad 'id' de los nodos a actualizar.",
     )
-    label = serializers.CharField(
+    label = LabelField(
         required=True, help_text="Label de los nodos (por ejemplo, 'Persona')."
     )
     properties = serializers.ListField(
-        child=serializers.CharField(),
+        child=PropertyKeyField(must_exist=False),
         required=True,
         help_text="Lista de nombres de propiedades a eliminar.",
     )
 
 
 class RelationshipCreationSerializer(serializers.Serializer):
-    label1 = serializers.CharField()  # Label del primer nodo (ej: "Persona")
+    label1 = LabelField()  # Label del primer nodo (ej: "Persona")
     node1_id = serializers.CharField()  # Valor de la propiedad "id" del primer nodo
-    label2 = serializers.CharField()  # Label del segundo nodo (ej: "Empresa")
+    label2 = LabelField()  # Label del segundo nodo (ej: "Empresa")
     node2_id = serializers.CharField()  # Valor de la propiedad "id" del segundo nodo
-    rel_type = serializers.CharField()  # Tipo de la relación (ej: "TRABAJA_EN")
+    rel_type = RelationshipTypeField(
+        must_exist=False
+    )  # Tipo de la relación (ej: "TRABAJA_EN")
     properties = (
         serializers.DictField()
     )  # Propiedades de la relación (al menos 3 claves)
 
 
 class RelationshipBulkUpdateSerializer(serializers.Serializer):
-    relationships = serializers.ListField(
-        child=serializers.DictField(),
+    relationships = BulkRowsField(
+        RELATIONSHIP_MERGE_SCHEMA,
         required=True,
         help_text="Lista de objetos que definen cada relación. Cada objeto debe incluir: "
         "label1, node1_id, label2, node2_id, rel_type y las propiedades a establecer (a nivel plano).",
     )
+    parallel = serializers.BooleanField(
+        default=False,
+        help_text="true para aplicar las relaciones en lotes paralelos, cada uno en "
+        "su propia transacción, en lugar de una sola transacción.",
+    )
+    chunk_size = serializers.IntegerField(
+        required=False,
+        min_value=1,
+        help_text="Filas por lote con parallel=true (BULK_PARALLEL_CHUNK_SIZE por defecto).",
+    )
 
 
 class RelationshipBulkRemoveSerializer(serializers.Serializer):
-    relationships = serializers.ListField(
-        child=serializers.DictField(),
+    relationships = BulkRowsField(
+        RELATIONSHIP_REMOVE_SCHEMA,
         required=True,
         help_text="Lista de objetos que definen cada relación. Cada objeto debe incluir: "
         "label1, node1_id, label2, node2_id, rel_type, y una lista 'properties' de nombres de propiedades a eliminar.",
     )
+    mode = serializers.ChoiceField(
+        choices=MODES,
+        default=BEST_EFFORT,
+        help_text="best_effort aplica las relaciones que coinciden; all_or_nothing "
+        "revierte todo si alguna no coincide.",
+    )
 
 
 class MultipleNodesDeleteWithChecksSerializer(serializers.Serializer):
-    label = serializers.CharField(
-        required=True, help_text="Label de los nodos (ej: 'Persona')"
-    )
+    label = LabelField(required=True, help_text="Label de los nodos (ej: 'Persona')")
     node_ids = serializers.ListField(
         child=serializers.CharField(),
         required=True,
         help_text="Lista de valores de la propiedad 'id' de los nodos a eliminar",
     )
+    batch_size = serializers.IntegerField(
+        required=False,
+        min_value=1,
+        help_text="Si se indica, elimina en lotes de este tamaño (CALL {} IN TRANSACTIONS).",
+    )
 
 
 class RelationshipBulkDeleteSerializer(serializers.Serializer):
-    relationships = serializers.ListField(
-        child=serializers.DictField(),
+    relationships = BulkRowsField(
+        RELATIONSHIP_SCHEMA,
         required=True,
         help_text="Lista de relaciones a eliminar. Cada objeto debe incluir: label1, node1_id, label2, node2_id, rel_type.",
     )
+    mode = serializers.ChoiceField(
+        choices=MODES,
+        default=BEST_EFFORT,
+        help_text="best_effort aplica las relaciones que coinciden; all_or_nothing "
+        "revierte todo si alguna no coincide.",
+    )
+
+
+class BulkStreamOptionsSerializer(serializers.Serializer):
+    """
+    Parámetros (en la URL) de los endpoints masivos cuando el cuerpo es NDJSON,
+    con una relación o un nodo por línea.
+    """
+
+    mode = serializers.ChoiceField(
+        choices=MODES,
+        default=BEST_EFFORT,
+        help_text="best_effort confirma cada lote; all_or_nothing usa una sola "
+        "transacción y la revierte si alguna fila falla.",
+    )
+    batch_size = serializers.IntegerField(
+        required=False, min_value=1, help_text="Filas por lote UNWIND."
+    )
+
+
+class NodesUpdateStreamSerializer(BulkStreamOptionsSerializer):
+    label = LabelField(
+        required=True, help_text="Label de los nodos, por ejemplo, 'Usuario'."
+    )
+
+
+class UserRecommendationSerializer(serializers.Serializer):
+    user_id = serializers.IntegerField(
+        help_text="Valor de la propiedad 'id' del Usuario."
+    )
+    limit = serializers.IntegerField(
+        default=10,
+        min_value=1,
+        help_text="Cantidad de recomendaciones (a lo sumo RECOMMENDATION_INDEX_SIZE).",
+    )
+
+
+class HomeFeedSerializer(serializers.Serializer):
+    user_id = serializers.IntegerField(
+        help_text="Valor de la propiedad 'id' del Usuario."
+    )
+    limit = serializers.IntegerField(default=20, min_value=1, max_value=100)
+    cursor = serializers.CharField(
+        required=False,
+        help_text="Valor de 'next_cursor' de la página anterior.",
+    )
+
+    def validate_cursor(self, value):
+        try:
+            return decode_feed_cursor(value)
+        except InvalidCursor as e:
+            raise serializers.ValidationError(str(e))
+
+
+class BulkJobSubmitSerializer(serializers.Serializer):
+    operation = serializers.ChoiceField(
+        choices=BulkJob.OPERATION_CHOICES,
+        help_text="Endpoint masivo a ejecutar, por ejemplo 'update-bulk-relationships'.",
+    )
+    payload = serializers.DictField(
+        help_text="Mismo cuerpo JSON que recibe el endpoint indicado en 'operation'."
+    )
+    batch_size = serializers.IntegerField(
+        required=False,
+        min_value=1,
+        help_text="Filas por lote (BULK_JOB_BATCH_SIZE por defecto).",
+    )
+
+
+class BulkJobSerializer(serializers.ModelSerializer):
+    throughput = serializers.FloatField(
+        read_only=True, help_text="Filas procesadas por segundo."
+    )
+
+    class Meta:
+        model = BulkJob
+        fields = [
+            "id",
+            "operation",
+            "status",
+            "total_rows",
+            "processed_rows",
+            "affected_count",
+            "error_count",
+            "errors",
+            "throughput",
+            "cancel_requested",
+            "result",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
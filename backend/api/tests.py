@@ -1,3 +1,1661 @@
-from django.test import TestCase
+import asyncio
+import contextlib
+import datetime
+import decimal
+import filecmp
+import importlib
+import importlib.util
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import neo4j.time
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework import serializers
+
+from . import (
+    apps,
+    async_views,
+    bulk,
+    caching,
+    coercion,
+    cypher,
+    feed,
+    jobs,
+    loader,
+    ndjson,
+    pagination,
+    parallel,
+    recommendations,
+    renderers,
+    schema,
+    validation,
+)
+from .catalog import (
+    LABEL,
+    PROPERTY_KEY,
+    RELATIONSHIP_TYPE,
+    InvalidIdentifier,
+    catalog,
+)
+from .models import BulkJob
+from .neo4j_connection import AsyncNeo4jConnection, Neo4jConnection
+from .serializers import NodeSearchSerializer
+
+
+def _import_generator():
+    # generateCSV.py está en la raíz del repositorio, fuera del proyecto Django
+    path = settings.BASE_DIR.parent / "generateCSV.py"
+    spec = importlib.util.spec_from_file_location("generateCSV", path)
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except ImportError:  # numpy, pandas o faker no instalados
+        return None
+    # Los procesos del pool importan run_shard por el nombre del módulo
+    sys.modules[spec.name] = module
+    return module
+
+
+generateCSV = _import_generator()
+
+
+class OfflineSchemaMixin:
+    """
+    Carga en el catálogo global los nombres dados y deja el registro de tipos
+    sin los de la base, sin consultarla.
+    """
+
+    labels = ["Usuario", "Post"]
+    relationship_types = ["FOLLOWS"]
+    property_keys = ["id", "nombre", "edad", "fecha_registro", "page_limit"]
+
+    def setUp(self):
+        super().setUp()
+        state = (catalog._names, catalog._folded, catalog._loaded_at)
+        self.addCleanup(self._restore_catalog, state)
+        names = {
+            LABEL: self.labels,
+            RELATIONSHIP_TYPE: self.relationship_types,
+            PROPERTY_KEY: self.property_keys,
+        }
+        with mock.patch("api.catalog.neo4j_conn"), mock.patch(
+            "api.catalog._load", return_value=names
+        ):
+            catalog.refresh()
+        for patcher in [
+            mock.patch.object(catalog, "refresh", return_value=True),
+            mock.patch.object(
+                coercion.registry, "_load_from_database", return_value=({}, set())
+            ),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        coercion.registry.refresh()
+
+    def _restore_catalog(self, state):
+        catalog._names, catalog._folded, catalog._loaded_at = state
+
+
+class FakeGraph:
+    """
+    Sesiones y transacciones en memoria de los dos drivers: respond(consulta,
+    parámetros) retorna los registros (tuplas) de cada consulta.
+    """
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.queries = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def run(self, query, params=None):
+        self.queries.append((query, params or {}))
+        return list(self.respond(query, params or {}))
+
+    def patch(self, test):
+        for conn, session in [
+            ("api.neo4j_connection.neo4j_conn", lambda **kwargs: FakeSession(self)),
+            (
+                "api.neo4j_connection.async_neo4j_conn",
+                lambda **kwargs: AsyncFakeSession(self),
+            ),
+        ]:
+            patcher = mock.patch(f"{conn}.session", session)
+            patcher.start()
+            test.addCleanup(patcher.stop)
+
+
+class FakeSession:
+    # Hace también de transacción explícita
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query, params=None):
+        return self.graph.run(query, params)
+
+    def execute_write(self, fn, *args):
+        return fn(self, *args)
+
+    execute_read = execute_write
+
+    def begin_transaction(self):
+        return self
+
+    def commit(self):
+        self.graph.commits += 1
+
+    def rollback(self):
+        self.graph.rollbacks += 1
+
+
+class AsyncFakeResult:
+    def __init__(self, records):
+        self._records = iter(records)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._records)
+        except StopIteration:
+            raise StopAsyncIteration from None
+
+
+class AsyncFakeSession(FakeSession):
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def run(self, query, params=None):
+        return AsyncFakeResult(self.graph.run(query, params))
+
+    async def execute_write(self, fn, *args):
+        return await fn(self, *args)
+
+    execute_read = execute_write
+
+    async def begin_transaction(self):
+        return self
+
+    async def commit(self):
+        self.graph.commits += 1
+
+    async def rollback(self):
+        self.graph.rollbacks += 1
+
+
+def matched_rows(query, params):
+    # Coinciden todas las filas de un UNWIND salvo las del nodo 999
+    return [
+        (row["idx"], 1)
+        for row in params.get("rows", [])
+        if 999 not in (row.get("node1_id"), row.get("node_id"))
+    ]
+
+
+class Neo4jConnectionTests(SimpleTestCase):
+    def _slow_driver(self, *args, **kwargs):
+        # Ensancha la ventana en la que otros hilos llegan sin driver creado
+        time.sleep(0.01)
+        return mock.Mock()
+
+    def test_concurrent_first_use_creates_one_driver(self):
+        conn = Neo4jConnection()
+        barrier = threading.Barrier(8)
+        drivers = []
+
+        def use():
+            barrier.wait()
+            drivers.append(conn.driver)
+
+        with mock.patch(
+            "api.neo4j_connection.GraphDatabase.driver", side_effect=self._slow_driver
+        ) as factory:
+            threads = [threading.Thread(target=use) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(factory.call_count, 1)
+        self.assertEqual(len({id(driver) for driver in drivers}), 1)
+
+    def test_new_process_gets_its_own_driver(self):
+        conn = Neo4jConnection()
+        lock = conn._lock
+        with mock.patch(
+            "api.neo4j_connection.GraphDatabase.driver", side_effect=self._slow_driver
+        ) as factory:
+            parent = conn.driver
+            with mock.patch("api.neo4j_connection.os.getpid", return_value=-1):
+                child = conn.driver
+                self.assertIs(conn.driver, child)
+
+        self.assertEqual(factory.call_count, 2)
+        self.assertIsNot(parent, child)
+        # Sin fork de por medio el lock es siempre el mismo
+        self.assertIs(conn._lock, lock)
+
+    def test_after_fork_discards_inherited_driver(self):
+        conn = Neo4jConnection()
+        with mock.patch(
+            "api.neo4j_connection.GraphDatabase.driver", side_effect=self._slow_driver
+        ):
+            parent = conn.driver
+            conn._after_fork()
+            self.assertIsNot(conn.driver, parent)
+        parent.close.assert_not_called()
+
+
+class AsyncNeo4jConnectionTests(SimpleTestCase):
+    def setUp(self):
+        self.drivers = []
+
+        def create(*args, **kwargs):
+            driver = mock.Mock(close=mock.AsyncMock())
+            self.drivers.append(driver)
+            return driver
+
+        patcher = mock.patch(
+            "api.neo4j_connection.AsyncGraphDatabase.driver", side_effect=create
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_one_driver_per_loop_closed_with_the_loop(self):
+        conn = AsyncNeo4jConnection()
+
+        async def use():
+            first = conn.driver
+            await asyncio.sleep(0)
+            self.assertIs(conn.driver, first)
+
+        asyncio.run(use())
+        async_to_sync(use)()
+
+        self.assertEqual(len(self.drivers), 2)
+        for driver in self.drivers:
+            driver.close.assert_awaited()
+        self.assertEqual(conn._drivers, {})
+
+    def test_explicit_close(self):
+        conn = AsyncNeo4jConnection()
+
+        async def use():
+            conn.driver
+            await conn.close()
+            self.assertEqual(conn._drivers, {})
+
+        asyncio.run(use())
+        self.drivers[0].close.assert_awaited()
+
+    def test_close_does_not_drop_a_newer_driver(self):
+        conn = AsyncNeo4jConnection()
+
+        async def use():
+            conn.driver
+            await asyncio.sleep(0)
+            closer = conn._drivers[asyncio.get_running_loop()][1]
+            await conn.close()
+            self.assertIsNone(closer.ag_frame)  # el generador ya terminó
+            self.assertIs(conn.driver, self.drivers[1])
+            await asyncio.sleep(0)
+
+        asyncio.run(use())
+        self.drivers[0].close.assert_awaited()
+        self.drivers[1].close.assert_awaited_once()
+        self.assertEqual(conn._drivers, {})
+
+
+class AsyncValidationTests(SimpleTestCase):
+    def test_validation_runs_off_the_event_loop(self):
+        threads = []
+
+        class Serializer:
+            def is_valid(self):
+                threads.append(threading.get_ident())
+                return True
+
+        async def validate():
+            threads.append(threading.get_ident())
+            with mock.patch("api.async_views.coercion.registry.types"):
+                return await async_views._is_valid(Serializer())
+
+        self.assertTrue(asyncio.run(validate()))
+        self.assertNotEqual(threads[0], threads[1])
+
+
+def relationship(node1_id, node2_id=2, **props):
+    return {
+        "label1": "Usuario",
+        "node1_id": node1_id,
+        "label2": "Post",
+        "node2_id": node2_id,
+        "rel_type": "FOLLOWS",
+        **props,
+    }
+
+
+class NdjsonTests(SimpleTestCase):
+    def test_iter_objects_reports_each_bad_line_and_skips_blank_ones(self):
+        lines = [b'{"a": 1}\n', b"\n", b"[1]\n", b"{mal\n", '{"b": 2}']
+        rows = list(ndjson.iter_objects(lines))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[0], ({"a": 1}, None))
+        self.assertEqual(rows[1], (None, "Se esperaba un objeto JSON."))
+        self.assertIsNone(rows[2][0])
+        self.assertTrue(rows[2][1].startswith("JSON inválido"))
+        self.assertEqual(rows[3], ({"b": 2}, None))
+
+
+class StreamReportTests(SimpleTestCase):
+    def not_found(self, batch, indices):
+        return [f"no está {batch[idx]}" for idx in indices]
+
+    def test_counts_applied_rows_and_keeps_only_failed_ones(self):
+        report = bulk.StreamReport()
+        report.add({0: "a", 1: "b"}, {0: 2}, [(2, "fila mala")], 3, self.not_found)
+        report.add({3: "d"}, {3: 1}, [], 4, self.not_found)
+
+        data, status = report.response("updatedCount", "ok")
+        self.assertEqual(status, 200)
+        self.assertEqual(data["updatedCount"], 3)
+        self.assertEqual(data["processedCount"], 4)
+        self.assertEqual(data["failedCount"], 2)
+        self.assertEqual(data["unmatchedIndices"], [1, 2])
+        self.assertEqual(data["errors"], ["Fila 1: no está b", "Fila 2: fila mala"])
+        self.assertFalse(data["errorsTruncated"])
+
+    @override_settings(BULK_STREAM_MAX_ERRORS=2)
+    def test_stores_at_most_max_errors_but_keeps_counting(self):
+        report = bulk.StreamReport()
+        for start in range(0, 10, 2):
+            batch = {start: "x", start + 1: "y"}
+            report.add(batch, {}, [], start + 2, self.not_found)
+
+        self.assertTrue(report.failed())
+        self.assertEqual(len(report.errors), 2)
+        data, status = report.response("deletedCount", "ok", "revertida")
+        self.assertEqual(status, 409)
+        self.assertEqual(data["message"], "revertida")
+        self.assertEqual(data["deletedCount"], 0)
+        self.assertEqual(data["failedCount"], 10)
+        self.assertEqual(data["unmatchedIndices"], [0, 1])
+        self.assertTrue(data["errorsTruncated"])
+
+
+class BulkRelationshipsTests(OfflineSchemaMixin, SimpleTestCase):
+    def run_groups(self, groups, mode=bulk.BEST_EFFORT):
+        graph = FakeGraph(matched_rows)
+        matched = cypher.run_steps(
+            FakeSession(graph),
+            bulk.run_groups,
+            groups,
+            cypher.update_relationships_batch_query,
+            mode,
+        )
+        return matched, graph.queries
+
+    def test_group_relationships_keeps_the_position_of_each_row(self):
+        rels = [relationship(1, peso=3), relationship(2), relationship(3)]
+        rels[1]["rel_type"] = "LIKES"
+        groups = bulk.group_relationships(rels, bulk.update_props)
+        self.assertEqual(
+            groups,
+            {
+                ("Usuario", "Post", "FOLLOWS"): [
+                    {"idx": 0, "node1_id": 1, "node2_id": 2, "props": {"peso": 3}},
+                    {"idx": 2, "node1_id": 3, "node2_id": 2, "props": {}},
+                ],
+                ("Usuario", "Post", "LIKES"): [
+                    {"idx": 1, "node1_id": 2, "node2_id": 2, "props": {}},
+                ],
+            },
+        )
+        groups = bulk.group_relationships(rels)
+        self.assertNotIn("props", groups[("Usuario", "Post", "LIKES")][0])
+
+    def test_run_groups_runs_one_unwind_per_signature(self):
+        rels = [relationship(1), relationship(999), relationship(3)]
+        rels[2]["rel_type"] = "LIKES"
+        matched, queries = self.run_groups(bulk.group_relationships(rels))
+        self.assertEqual(matched, {0: 1, 2: 1})
+        self.assertEqual(len(queries), 2)
+        self.assertIn("MERGE (a)-[r:LIKES]->(b)", queries[1][0])
+        self.assertEqual([row["idx"] for row in queries[0][1]["rows"]], [0, 1])
+
+    def test_all_or_nothing_raises_with_the_rows_that_matched(self):
+        rels = [relationship(1), relationship(999), relationship(3)]
+        groups = bulk.group_relationships(rels)
+        with self.assertRaises(bulk.PartialMatchError) as raised:
+            self.run_groups(groups, bulk.ALL_OR_NOTHING)
+        self.assertEqual(raised.exception.matched, {0: 1, 2: 1})
+
+        matched, _ = self.run_groups(
+            bulk.group_relationships([rels[0], rels[2]]), bulk.ALL_OR_NOTHING
+        )
+        self.assertEqual(matched, {0: 1, 1: 1})
+
+    def test_best_effort_keeps_the_rows_that_matched(self):
+        rels = [relationship(999), relationship(1), relationship(999, 3)]
+        matched, _ = self.run_groups(bulk.group_relationships(rels))
+        data, status = bulk.relationships_response(
+            rels, matched, "deletedCount", "ok", with_type=True
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual(data["deletedCount"], 1)
+        self.assertEqual(data["matchedIndices"], [1])
+        self.assertEqual(data["unmatchedIndices"], [0, 2])
+        self.assertEqual(len(data["errors"]), 2)
+        self.assertIn("relación FOLLOWS entre Usuario con id 999", data["errors"][0])
+
+    def test_all_or_nothing_endpoints_roll_back_partial_matches(self):
+        graph = FakeGraph(matched_rows)
+        graph.patch(self)
+        rels = [relationship(1), relationship(999)]
+        body = json.dumps({"relationships": rels, "mode": bulk.ALL_OR_NOTHING})
+        for name in ["delete_bulk_relationships", "async_delete_bulk_relationships"]:
+            with mock.patch.object(feed.cache, "relationships_changed") as changed:
+                response = self.client.delete(
+                    reverse(name), body, content_type="application/json"
+                )
+            self.assertEqual(response.status_code, 409)
+            data = response.json()
+            self.assertEqual(data["message"], bulk.RELATIONSHIPS_ROLLED_BACK)
+            self.assertEqual(data["deletedCount"], 0)
+            self.assertEqual(data["matchedIndices"], [0])
+            self.assertEqual(data["unmatchedIndices"], [1])
+            changed.assert_not_called()
+
+    def test_relationships_response_reports_unmatched_and_failed_rows(self):
+        rels = [relationship(1), relationship(999), relationship(3)]
+        data, status = bulk.relationships_response(
+            rels, {0: 2}, "updatedCount", "ok", failed={2: "sin conexión"}
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual(data["updatedCount"], 2)
+        self.assertEqual(data["matchedIndices"], [0])
+        self.assertEqual(data["unmatchedIndices"], [1, 2])
+        self.assertEqual(
+            data["errors"],
+            [
+                "No se encontró la relación entre Usuario con id 999 y Post con id 2.",
+                "Relación en la posición 2: sin conexión",
+            ],
+        )
+
+        data, status = bulk.relationships_response(
+            rels[:1], {0: 1}, "deletedCount", "ok", with_type=True, rolled_back=True
+        )
+        self.assertEqual(status, 409)
+        self.assertEqual(data["deletedCount"], 0)
+        self.assertEqual(data["message"], bulk.RELATIONSHIPS_ROLLED_BACK)
+        self.assertNotIn("errors", data)
+
+
+class NodeDeletionTests(SimpleTestCase):
+    def test_query_checks_relationships_before_deleting(self):
+        query = cypher.delete_nodes_with_checks_query("Usuario")
+        self.assertIn("UNWIND $node_ids AS nid", query)
+        self.assertIn("OPTIONAL MATCH (n:Usuario { id: nid })", query)
+        self.assertIn("WHEN EXISTS { (n)--() } THEN 'has_relationships'", query)
+        self.assertIn("DELETE n", query)
+        self.assertNotIn("IN TRANSACTIONS", query)
+
+    def test_query_in_transactions_splits_the_ids_in_batches(self):
+        query = cypher.delete_nodes_with_checks_query("Usuario", in_transactions=True)
+        self.assertIn("IN TRANSACTIONS OF $batch_size ROWS", query)
+        # El estado de cada id sale de la subconsulta
+        self.assertLess(query.index("CALL {"), query.index("DELETE n"))
+        self.assertTrue(query.rstrip().endswith("RETURN nid, status"))
+
+    def test_response_reports_each_status(self):
+        data = bulk.node_deletion_response(
+            [(1, "deleted"), (2, "has_relationships"), (3, "not_found"), (4, "deleted")]
+        )
+        self.assertEqual(data["deletedCount"], 2)
+        self.assertEqual(data["deleted"], [1, 4])
+        self.assertEqual(data["hasRelationships"], [2])
+        self.assertEqual(data["notFound"], [3])
+        self.assertEqual(
+            data["errors"],
+            [
+                "Nodo con id 2 no puede ser eliminado porque tiene relaciones.",
+                "Nodo con id 3 no encontrado.",
+            ],
+        )
+        self.assertNotIn("errors", bulk.node_deletion_response([(1, "deleted")]))
+
+
+class NodeCreationTests(OfflineSchemaMixin, SimpleTestCase):
+    def node(self, **props):
+        return {"nombre": "Ana", "edad": 30, "a": 1, "b": 2, "c": 3, **props}
+
+    def created(self, query, params):
+        return [(row["idx"], f"4:x:{row['idx']}") for row in params["rows"]]
+
+    def test_node_chunks_keep_the_input_positions(self):
+        rows = [(self.node(), None), ({"nombre": "Beto"}, None)]
+        rows += [(None, "JSON inválido")]
+        rows += [(self.node(id=i), None) for i in range(3)]
+        chunks = list(bulk.node_chunks(rows, 2))
+
+        self.assertEqual(
+            [[row["idx"] for row in chunk] for chunk, _, _ in chunks], [[0, 3], [4, 5]]
+        )
+        self.assertEqual([read for _, _, read in chunks], [4, 6])
+        self.assertEqual(
+            chunks[0][1],
+            [(1, "Debes proporcionar al menos 5 propiedades."), (2, "JSON inválido")],
+        )
+        self.assertEqual(chunks[0][0][1]["props"], self.node(id=0))
+
+    def test_only_date_properties_present_in_the_chunk_use_date(self):
+        chunk = [
+            {"idx": 0, "props": self.node(registrado="2024-01-01")},
+            {"idx": 1, "props": self.node(fecha_alta="2024-01-02")},
+        ]
+        types = {
+            ("Usuario", "registrado"): coercion.DATE,
+            ("Usuario", "baja"): coercion.DATE,
+        }
+        with mock.patch.object(coercion.registry, "_types", types):
+            self.assertEqual(
+                bulk.chunk_date_keys(["Usuario"], chunk), ["fecha_alta", "registrado"]
+            )
+            # Sin tipo registrado, fecha_* es fecha por el nombre
+            self.assertEqual(bulk.chunk_date_keys(["Post"], chunk), ["fecha_alta"])
+            steps = bulk.create_nodes_chunk("Usuario", chunk)
+            query, params = next(steps)
+        self.assertIn("SET n.registrado = date(row.props.registrado)", query)
+        self.assertNotIn("baja", query)
+        self.assertIs(params["rows"], chunk)
+        with self.assertRaises(StopIteration) as done:
+            steps.send([(0, "4:x:0"), (1, "4:x:1")])
+        self.assertEqual(done.exception.value, {0: "4:x:0", 1: "4:x:1"})
+
+    def test_node_ids_follow_the_input_order(self):
+        graph = FakeGraph(self.created)
+        graph.patch(self)
+        nodes = [self.node(), {"nombre": "Beto"}, self.node(), self.node()]
+        body = json.dumps({"labels": ["Usuario"], "chunk_size": 2, "nodes": nodes})
+        for name in ["create_nodes_bulk", "async_create_nodes_bulk"]:
+            graph.queries.clear()
+            response = self.client.post(
+                reverse(name), body, content_type="application/json"
+            )
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            self.assertEqual(data["createdCount"], 3)
+            self.assertEqual(data["nodeIds"], ["4:x:0", None, "4:x:2", "4:x:3"])
+            self.assertEqual(
+                data["errors"],
+                ["Nodo en la posición 1: Debes proporcionar al menos 5 propiedades."],
+            )
+            self.assertEqual(len(graph.queries), 2)
+
+
+class NdjsonEndpointTests(OfflineSchemaMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.graph = FakeGraph(matched_rows)
+        self.graph.patch(self)
+
+    def body(self, *rows):
+        lines = [row if isinstance(row, str) else json.dumps(row) for row in rows]
+        return "\n".join(lines) + "\n"
+
+    def send(self, method, name, query, body):
+        return getattr(self.client, method)(
+            f"{reverse(name)}?{query}", body, content_type=ndjson.CONTENT_TYPE
+        )
+
+    def test_best_effort_applies_each_batch_and_reports_failed_rows(self):
+        body = self.body(
+            relationship(1), relationship(999), "[1]", relationship(3)
+        )
+        for name in ["update_bulk_relationships", "async_update_bulk_relationships"]:
+            self.graph.queries.clear()
+            response = self.send("put", name, "batch_size=1", body)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            self.assertEqual(data["updatedCount"], 2)
+            self.assertEqual(data["processedCount"], 4)
+            self.assertEqual(data["failedCount"], 2)
+            self.assertEqual(data["unmatchedIndices"], [1, 2])
+            self.assertEqual(len(self.graph.queries), 3)  # un UNWIND por fila válida
+
+    def test_all_or_nothing_rolls_back_when_a_row_fails(self):
+        body = self.body(relationship(1), relationship(999))
+        for name in ["delete_bulk_relationships", "async_delete_bulk_relationships"]:
+            response = self.send("delete", name, "mode=all_or_nothing", body)
+            self.assertEqual(response.status_code, 409)
+            self.assertEqual(response.json()["deletedCount"], 0)
+        self.assertEqual((self.graph.commits, self.graph.rollbacks), (0, 2))
+
+    def test_merge_registers_the_new_relationship_types(self):
+        rel = relationship(1)
+        rel["rel_type"] = "LIKES"
+        for name in ["update_bulk_relationships", "async_update_bulk_relationships"]:
+            for body, content_type in [
+                (self.body(rel), ndjson.CONTENT_TYPE),
+                (json.dumps({"relationships": [rel]}), "application/json"),
+            ]:
+                catalog._names[RELATIONSHIP_TYPE].pop("LIKES", None)
+                response = self.client.put(
+                    reverse(name), body, content_type=content_type
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertIn("LIKES", catalog._names[RELATIONSHIP_TYPE])
+
+    def test_node_updates_read_the_label_from_the_url(self):
+        body = self.body(
+            {"node_id": 1, "properties": {"edad": 30}},
+            {"node_id": 999, "properties": {"edad": 31}},
+        )
+        for name in [
+            "update_multiple_nodes_properties",
+            "async_update_multiple_nodes_properties",
+        ]:
+            response = self.send("put", name, "label=Usuario", body)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            self.assertEqual(data["updatedCount"], 1)
+            self.assertEqual(
+                data["errors"], ["Fila 1: Nodo con id 999 no encontrado."]
+            )
+
+
+class BulkJobTests(OfflineSchemaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.graph = FakeGraph(self.respond)
+        self.graph.patch(self)
+        self.on_query = None
+
+    def respond(self, query, params):
+        if self.on_query is not None:
+            self.on_query()
+        return matched_rows(query, params)
+
+    def job(self, rels, mode=bulk.BEST_EFFORT, operation="delete-bulk-relationships"):
+        plan = jobs.OPERATIONS[operation][1]({"relationships": rels, "mode": mode})
+        job = BulkJob.objects.create(operation=operation, total_rows=len(rels))
+        return job, plan
+
+    def test_execute_saves_progress_after_each_batch(self):
+        job, plan = self.job([relationship(1), relationship(999), relationship(3)])
+        progress = []
+        save_progress = jobs.save_progress
+
+        def record(job_id, report):
+            progress.append(report.read)
+            return save_progress(job_id, report)
+
+        with mock.patch.object(jobs, "save_progress", side_effect=record):
+            jobs.execute(job.pk, plan, 2)
+
+        job.refresh_from_db()
+        self.assertEqual(progress, [2, 3])
+        self.assertEqual(job.status, BulkJob.COMPLETED)
+        self.assertEqual(
+            (job.processed_rows, job.affected_count, job.error_count), (3, 2, 1)
+        )
+        self.assertEqual(job.result["unmatchedIndices"], [1])
+
+    def test_update_jobs_register_the_merged_relationship_types(self):
+        rel = relationship(1)
+        rel["rel_type"] = "LIKES"
+        job, plan = self.job([rel], operation="update-bulk-relationships")
+        jobs.execute(job.pk, plan, 10)
+        self.assertIn("LIKES", catalog._names[RELATIONSHIP_TYPE])
+
+    def test_cancel_stops_after_the_current_batch(self):
+        job, plan = self.job([relationship(1), relationship(2), relationship(3)])
+        self.on_query = lambda: jobs.cancel(job)
+        jobs.execute(job.pk, plan, 1)
+
+        job.refresh_from_db()
+        self.assertEqual(len(self.graph.queries), 1)
+        self.assertEqual(job.status, BulkJob.CANCELLED)
+        self.assertEqual((job.processed_rows, job.affected_count), (1, 1))
+
+    def test_cancel_rolls_back_all_or_nothing_jobs(self):
+        job, plan = self.job(
+            [relationship(1), relationship(2)], mode=bulk.ALL_OR_NOTHING
+        )
+        self.on_query = lambda: jobs.cancel(job)
+        jobs.execute(job.pk, plan, 1)
+
+        job.refresh_from_db()
+        self.assertEqual((self.graph.commits, self.graph.rollbacks), (0, 1))
+        self.assertEqual(job.status, BulkJob.CANCELLED)
+        self.assertEqual(job.affected_count, 0)
+        self.assertEqual(
+            job.result["message"], "Trabajo cancelado: no se aplicó ningún cambio."
+        )
+
+    def test_pending_jobs_are_cancelled_before_they_start(self):
+        job, plan = self.job([relationship(1)])
+        self.assertEqual(jobs.cancel(job).status, BulkJob.CANCELLED)
+        jobs.execute(job.pk, plan, 1)
+        self.assertEqual(self.graph.queries, [])
+
+    def test_submit_uses_the_payload_batch_size_and_rejects_parallel(self):
+        with mock.patch.object(jobs, "executor") as executor:
+            response = self.client.post(
+                reverse("submit_bulk_job"),
+                {
+                    "operation": "delete-multiple-nodes",
+                    "payload": {"label": "Usuario", "node_ids": ["1"], "batch_size": 7},
+                },
+                content_type="application/json",
+            )
+            self.assertEqual(response.status_code, 202)
+            self.assertEqual(executor().submit.call_args.args[3], 7)
+
+            response = self.client.post(
+                reverse("submit_bulk_job"),
+                {
+                    "operation": "update-bulk-relationships",
+                    "payload": {"relationships": [relationship(1)], "parallel": True},
+                },
+                content_type="application/json",
+            )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("parallel", response.json()["payload"])
+
+    def test_fail_orphaned_only_fails_jobs_of_dead_processes(self):
+        host = jobs.socket.gethostname()
+        alive, dead, elsewhere = [
+            BulkJob.objects.create(
+                operation="delete-bulk-relationships",
+                status=BulkJob.RUNNING,
+                worker=worker,
+            )
+            for worker in [jobs.worker_id(), f"{host}:999999", "otro-host:1"]
+        ]
+        is_alive = mock.Mock(side_effect=lambda pid: pid != 999999)
+        with mock.patch.object(jobs, "_is_alive", is_alive):
+            self.assertEqual(jobs.fail_orphaned(), 1)
+
+        statuses = dict(BulkJob.objects.values_list("pk", "status"))
+        self.assertEqual(statuses[dead.pk], BulkJob.FAILED)
+        self.assertEqual(statuses[alive.pk], BulkJob.RUNNING)
+        self.assertEqual(statuses[elsewhere.pk], BulkJob.RUNNING)
+
+
+class SearchCursorTests(OfflineSchemaMixin, SimpleTestCase):
+    def _forge(self, order_by):
+        return pagination._encode({"o": order_by, "v": 1, "id": 1})
+
+    def test_cursor_round_trip(self):
+        cursor = pagination.encode_cursor("fecha_registro", "2024-01-02", 7)
+        decoded = pagination.decode_cursor(cursor)
+        self.assertEqual(decoded["order_by"], "fecha_registro")
+        self.assertEqual(decoded["id"], 7)
+        self.assertEqual(str(decoded["value"]), "2024-01-02")
+
+    def test_forged_cursor_is_rejected(self):
+        forged = self._forge("id IS NOT NULL DETACH DELETE n WITH n")
+        with self.assertRaises(pagination.InvalidCursor):
+            pagination.decode_cursor(forged)
+        serializer = NodeSearchSerializer(data={"cursor": forged})
+        self.assertFalse(serializer.is_valid())
+        self.assertIn("cursor", serializer.errors)
+
+    def test_cursor_with_unknown_property_is_rejected(self):
+        with self.assertRaises(pagination.InvalidCursor):
+            pagination.decode_cursor(self._forge("no_existe"))
+
+    def test_cursor_order_by_drives_the_query(self):
+        serializer = NodeSearchSerializer(data={"cursor": self._forge("edad")})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        order_by, after, limit = pagination.search_options(serializer.validated_data)
+        query, params = cypher.search_nodes_query([], {}, limit, order_by, after)
+        self.assertIn("ORDER BY n.edad, n.id", query)
+        self.assertEqual(params, {"cursor_value": 1, "cursor_id": 1, "page_limit": 100})
+
+
+class SearchParamsTests(OfflineSchemaMixin, SimpleTestCase):
+    def test_filters_do_not_collide_with_reserved_parameters(self):
+        filters = {"page_limit": {"operator": "=", "value": 5}}
+        after = {"order_by": "id", "value": 3, "id": 3}
+        query, params = cypher.search_nodes_query(["Usuario"], filters, 10, "id", after)
+        self.assertIn("n.page_limit = $filter_page_limit", query)
+        self.assertIn("LIMIT $page_limit", query)
+        self.assertEqual(params["page_limit"], 10)
+        self.assertEqual(params["filter_page_limit"], 5)
+        self.assertEqual(params["cursor_id"], 3)
+
+
+class SchemaCatalogTests(OfflineSchemaMixin, SimpleTestCase):
+    def test_reads_resolve_case_insensitive_labels(self):
+        self.assertEqual(catalog.resolve(LABEL, "usuario"), "Usuario")
+
+    def test_creation_keeps_the_name_as_given(self):
+        self.assertEqual(catalog.resolve(LABEL, "usuario", must_exist=False), "usuario")
+        self.assertEqual(catalog.resolve(LABEL, "Usuario", must_exist=False), "Usuario")
+
+    def test_properties_are_case_sensitive(self):
+        with self.assertRaises(InvalidIdentifier):
+            catalog.resolve(PROPERTY_KEY, "Nombre")
+
+    def test_cursor_property_goes_through_the_property_whitelist(self):
+        cursor = pagination._encode({"o": "edad", "v": 1, "id": 1})
+        with mock.patch.object(catalog, "resolve", wraps=catalog.resolve) as resolve:
+            serializer = NodeSearchSerializer(data={"cursor": cursor})
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+        # Una sola validación, en decode_cursor
+        resolve.assert_called_once_with(PROPERTY_KEY, "edad", must_exist=True)
+
+        with mock.patch.object(
+            catalog, "resolve", side_effect=InvalidIdentifier("No existe")
+        ):
+            serializer = NodeSearchSerializer(data={"cursor": cursor})
+            self.assertFalse(serializer.is_valid())
+        self.assertIn("cursor", serializer.errors)
+
+
+class BulkRowsFieldTests(OfflineSchemaMixin, SimpleTestCase):
+    def _row(self, **changes):
+        row = {
+            "label1": "Usuario",
+            "label2": "Usuario",
+            "rel_type": "FOLLOWS",
+            "node1_id": 1,
+            "node2_id": 2,
+        }
+        row.update(changes)
+        return row
+
+    def _errors(self, schema, rows):
+        with self.assertRaises(serializers.ValidationError) as raised:
+            validation.BulkRowsField(schema).to_internal_value(rows)
+        return raised.exception.detail
+
+    def test_valid_rows_get_canonical_names(self):
+        rows = [self._row(label1="usuario"), self._row()]
+        field = validation.BulkRowsField(validation.RELATIONSHIP_SCHEMA)
+        self.assertEqual(field.to_internal_value(rows)[0]["label1"], "Usuario")
+
+    def test_errors_are_reported_per_row_and_key(self):
+        rows = [
+            self._row(),
+            self._row(node2_id=""),
+            self._row(rel_type="FOLLOWS) DELETE (x"),
+            "no es un objeto",
+            self._row(label2="Inexistente"),
+        ]
+        errors = self._errors(validation.RELATIONSHIP_SCHEMA, rows)
+        self.assertEqual(sorted(errors), [1, 2, 3, 4])
+        self.assertEqual(list(errors[1]), ["node2_id"])
+        self.assertEqual(errors[2]["rel_type"], [validation.INVALID_IDENTIFIER])
+        self.assertIn("str", str(errors[3][0]))
+        self.assertEqual(list(errors[4]), ["label2"])
+
+    def test_merge_schema_accepts_new_relationship_types(self):
+        rows = [self._row(rel_type="NUEVO_TIPO")]
+        self.assertIn("rel_type", self._errors(validation.RELATIONSHIP_SCHEMA, rows)[0])
+        field = validation.BulkRowsField(validation.RELATIONSHIP_MERGE_SCHEMA)
+        self.assertEqual(field.to_internal_value(rows)[0]["rel_type"], "NUEVO_TIPO")
+
+    def test_row_schema_checks_container_types(self):
+        schema = validation.RELATIONSHIP_REMOVE_SCHEMA
+        self.assertTrue(schema.is_valid(self._row(properties=["since"])))
+        self.assertFalse(schema.is_valid(self._row(properties="since")))
+        errors = schema.errors(self._row(properties="since"))
+        self.assertEqual(list(errors), ["properties"])
+        self.assertIn("properties", schema.row_error(self._row()))
+        self.assertIsNone(schema.row_error(self._row(properties=[])))
+
+    def test_not_a_list(self):
+        field = validation.BulkRowsField(validation.RELATIONSHIP_SCHEMA)
+        with self.assertRaises(serializers.ValidationError):
+            field.to_internal_value({})
+
+
+class PartitionByStartNodeTests(SimpleTestCase):
+    def _rel(self, node1_id, rel_type="FOLLOWS"):
+        return {
+            "label1": "Usuario",
+            "label2": "Usuario",
+            "rel_type": rel_type,
+            "node1_id": node1_id,
+            "node2_id": 0,
+        }
+
+    def _starts(self, chunk):
+        return {
+            (signature[0], row["node1_id"])
+            for signature, rows in chunk.items()
+            for row in rows
+        }
+
+    def test_rows_of_a_start_node_stay_in_one_chunk(self):
+        rels = [self._rel(i % 5) for i in range(20)]
+        rels += [self._rel(i % 5, "FRIENDS_WITH") for i in range(10)]
+        chunks = parallel.partition_by_start_node(bulk.group_relationships(rels), 7)
+
+        seen = [self._starts(chunk) for chunk in chunks]
+        for i, starts in enumerate(seen):
+            for other in seen[i + 1 :]:
+                self.assertFalse(starts & other)
+        indexes = sorted(
+            row["idx"] for chunk in chunks for rows in chunk.values() for row in rows
+        )
+        self.assertEqual(indexes, list(range(30)))
+        # Cada nodo de inicio tiene 6 filas: no caben dos en un lote de 7
+        self.assertEqual(len(chunks), 5)
+
+    def test_a_dense_start_node_may_exceed_the_chunk_size(self):
+        rels = [self._rel(1) for _ in range(10)] + [self._rel(2)]
+        chunks = parallel.partition_by_start_node(bulk.group_relationships(rels), 4)
+        self.assertEqual([bulk.count_rows(chunk) for chunk in chunks], [10, 1])
+
+    def test_small_start_nodes_share_a_chunk(self):
+        rels = [self._rel(i) for i in range(10)]
+        chunks = parallel.partition_by_start_node(bulk.group_relationships(rels), 4)
+        self.assertEqual([bulk.count_rows(chunk) for chunk in chunks], [4, 4, 2])
+
+
+class FeedTests(SimpleTestCase):
+    def _record(self, author, kind, item_id, day):
+        return (author, kind, item_id, datetime.date(2024, 1, day), f"e{item_id}")
+
+    def test_merge_streams_orders_all_authors_newest_first(self):
+        records = [
+            # Posts y reels de cada autor llegan como dos ramas concatenadas
+            self._record(1, feed.POST, 1, 5),
+            self._record(1, feed.POST, 2, 1),
+            self._record(1, feed.REEL, 3, 3),
+            self._record(2, feed.POST, 4, 4),
+            self._record(2, feed.POST, 5, 3),
+        ]
+        items = feed.merge_streams(records, 3)
+        # Con la misma fecha desempata el tipo, como en FEED_ITEMS_QUERY
+        self.assertEqual([item["id"] for item in items], [1, 4, 3, 5])
+        self.assertEqual(items[2]["type"], feed.REEL)
+
+    def test_page_sets_a_cursor_only_when_there_are_more_items(self):
+        records = [self._record(1, feed.POST, i, i) for i in (1, 2)]
+        items = feed.merge_streams(records, 1)
+        result = feed.page(items, 1)
+        self.assertEqual([item["id"] for item in result["items"]], [2])
+        cursor = pagination.decode_feed_cursor(result["next_cursor"])
+        self.assertEqual(cursor["fecha"], datetime.date(2024, 1, 2))
+        self.assertEqual((cursor["kind"], cursor["id"]), (feed.POST, 2))
+        self.assertIsNone(feed.page(items, 2)["next_cursor"])
+
+    @override_settings(FEED_CACHE_SIZE=2, FEED_CACHE_TTL=60)
+    def test_cache_evicts_least_recently_used_and_invalidates_by_author(self):
+        cache = feed.FeedCache()
+        cache.set(1, ["a"], [10])
+        cache.set(2, ["b"], [20])
+        cache.get(1)
+        cache.set(3, ["c"], [10, 30])
+        self.assertIsNone(cache.get(2))
+        self.assertEqual(cache.get(1), ["a"])
+
+        cache.invalidate_authors([10])
+        self.assertIsNone(cache.get(1))
+        self.assertIsNone(cache.get(3))
+        self.assertEqual(cache._readers, {})
+
+
+class LoaderTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.data_dir = tmp.name
+
+    def _write_csv(self, relative, ids):
+        path = os.path.join(self.data_dir, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("id,nombre\n")
+            f.writelines(f"{i},U{i}\n" for i in ids)
+        return path
+
+    def test_values_are_converted_by_column_type(self):
+        source = loader.NodeSource(["Usuario"], loader._USER)
+        record = {
+            "id": "7",
+            "nombre": "Ana",
+            "email": "ana@example.com",
+            "fecha_registro": "2024-01-02",
+            "intereses": "['cine', 'rock']",
+        }
+        row = source.row(record)
+        self.assertEqual(row["id"], 7)
+        self.assertEqual(row["props"]["fecha_registro"], datetime.date(2024, 1, 2))
+        self.assertEqual(row["props"]["intereses"], ["cine", "rock"])
+        self.assertEqual(loader.to_list("a;b"), ["a", "b"])
+        self.assertEqual(loader.to_list(""), [])
+
+    def test_shards_are_read_in_order_from_the_skipped_row(self):
+        self._write_csv("users/part-00001.csv", [4, 5])
+        self._write_csv("users/part-00000.csv", [1, 2, 3])
+        paths = loader.source_paths(self.data_dir, "users.csv")
+        names = [os.path.basename(path) for path in paths]
+        self.assertEqual(names, ["part-00000.csv", "part-00001.csv"])
+        ids = [record["id"] for record in loader.read_rows(paths, skip=4)]
+        self.assertEqual(ids, ["5"])
+        self.assertEqual(loader.source_paths(self.data_dir, "posts.csv"), [])
+
+    def test_load_file_resumes_from_the_checkpoint(self):
+        paths = [self._write_csv("users.csv", range(1, 8))]
+        checkpoint = loader.Checkpoint(loader.default_checkpoint(self.data_dir))
+        session = mock.Mock()
+        session.execute_write.side_effect = lambda fn, queries: sum(
+            len(rows) for _, rows in queries
+        )
+        sources = [loader.NodeSource(["Usuario"], {"nombre": "String"})]
+
+        read, written, ignored = loader.load_file(
+            session,
+            sources,
+            paths,
+            batch_size=2,
+            skip=3,
+            on_batch=lambda rows: checkpoint.save("users.csv", rows),
+        )
+        self.assertEqual((read, written, ignored), (4, 4, 0))
+        first_batch = session.execute_write.call_args_list[0].args[1][0][1]
+        self.assertEqual(first_batch[0], {"id": 4, "props": {"nombre": "U4"}})
+        resumed = loader.Checkpoint(checkpoint.path)
+        self.assertEqual(resumed.rows, {"users.csv": 7})
+
+
+@skipUnless(loader.pq, "requiere pyarrow")
+class ParquetLoaderTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.data_dir = tmp.name
+
+    def _write_parquet(self, relative, ids, row_group_size):
+        import pyarrow as pa
+
+        path = os.path.join(self.data_dir, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        table = pa.table({"id": ids, "intereses": [["a", "b"]] * len(ids)})
+        loader.pq.write_table(table, path, row_group_size=row_group_size)
+        return path
+
+    def test_csv_is_preferred_and_parquet_is_the_fallback(self):
+        self._write_parquet("users.parquet", [1], 1)
+        paths = loader.source_paths(self.data_dir, "users.csv")
+        self.assertEqual([os.path.basename(path) for path in paths], ["users.parquet"])
+        with open(os.path.join(self.data_dir, "users.csv"), "w") as f:
+            f.write("id\n1\n")
+        paths = loader.source_paths(self.data_dir, "users.csv")
+        self.assertEqual([os.path.basename(path) for path in paths], ["users.csv"])
+
+    def test_skip_spans_row_groups_and_shards(self):
+        paths = [
+            self._write_parquet("users/part-00000.parquet", [1, 2, 3, 4, 5], 2),
+            self._write_parquet("users/part-00001.parquet", [6, 7, 8], 2),
+        ]
+        for skip in range(9):
+            with self.subTest(skip=skip):
+                rows = list(loader.read_rows(paths, skip))
+                self.assertEqual([row["id"] for row in rows], list(range(skip + 1, 9)))
+        self.assertEqual(rows, [])
+        row = next(loader.read_rows(paths, 6))
+        # Las listas ya llegan como listas y el conversor las deja tal cual
+        self.assertEqual(loader.to_list(row["intereses"]), ["a", "b"])
+
+    def test_leading_row_groups_are_not_read(self):
+        path = self._write_parquet("users.parquet", list(range(10)), 3)
+        with mock.patch.object(
+            loader.pq.ParquetFile, "iter_batches", autospec=True
+        ) as iter_batches:
+            iter_batches.return_value = iter([])
+            list(loader.read_rows([path], 7))
+        self.assertEqual(list(iter_batches.call_args.kwargs["row_groups"]), [2, 3])
+
+
+@skipUnless(generateCSV, "requiere numpy, pandas y faker")
+class GeneratorCountsTests(SimpleTestCase):
+    def test_small_scales_keep_the_minimums(self):
+        counts = generateCSV.scaled_counts(0.0001)
+        self.assertEqual(counts["users"], 2)
+        self.assertTrue(all(count >= 1 for count in counts.values()))
+
+    def test_every_group_gets_a_member(self):
+        with mock.patch.dict(generateCSV.RELATIONSHIP_COUNTS, {"member_of": 10}):
+            counts = generateCSV.scaled_counts(1)
+        self.assertEqual(counts["member_of"], counts["groups"])
+        self.assertEqual(
+            counts["influencers"],
+            counts["influencers_no"] + counts["influencers_verified"],
+        )
+
+    def test_tasks_follow_the_counts_and_offset_influencer_ids(self):
+        counts = generateCSV.scaled_counts(0.01)
+        task_list = generateCSV.tasks(counts)
+        self.assertEqual(
+            [(name, rows) for name, rows, _ in task_list][-3:],
+            [
+                ("influencers_no", counts["influencers_no"]),
+                ("influencers_verified", counts["influencers_verified"]),
+                ("follows_influencers", counts["influencers"]),
+            ],
+        )
+        popularity = generateCSV.Popularity(
+            counts, generateCSV.UNIFORM, 1.0, generateCSV.SEED
+        )
+        pools = generateCSV.Pools(generateCSV.SEED, 10, popularity)
+        chunks = {name: chunk_fn for name, _, chunk_fn in task_list}
+        rng = generateCSV.np.random.default_rng(0)
+        rows = generateCSV.np.arange(2)
+
+        def first_ids(name):
+            return list(chunks[name](rng, pools, counts, rows)[name]["id"])
+
+        users = counts["users"]
+        self.assertEqual(first_ids("users"), [1, 2])
+        self.assertEqual(first_ids("influencers_no"), [users + 1, users + 2])
+        verified = users + counts["influencers_no"]
+        self.assertEqual(
+            first_ids("influencers_verified"), [verified + 1, verified + 2]
+        )
+
+
+@skipUnless(generateCSV, "requiere numpy, pandas y faker")
+class GeneratorShardTests(SimpleTestCase):
+    def _generate(self, **kwargs):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        with contextlib.redirect_stdout(io.StringIO()):
+            generateCSV.generate(0.02, tmp.name, chunk_size=50, **kwargs)
+        return tmp.name
+
+    def test_output_does_not_depend_on_the_number_of_workers(self):
+        serial = self._generate(workers=1)
+        parallel = self._generate(workers=3)
+        names = sorted(os.listdir(serial))
+        self.assertEqual(len(names), len(generateCSV.OUTPUT_FILES))
+        match, mismatch, errors = filecmp.cmpfiles(
+            serial, parallel, names, shallow=False
+        )
+        self.assertEqual((mismatch, errors), ([], []))
+
+    def test_shards_concatenate_to_the_full_file(self):
+        merged = self._generate(workers=1)
+        sharded = self._generate(workers=2, keep_shards=True)
+        directory = os.path.join(sharded, "likes")
+        parts = sorted(os.listdir(directory))
+        self.assertGreater(len(parts), 1)
+        lines = []
+        for i, part in enumerate(parts):
+            with open(os.path.join(directory, part), encoding="utf-8") as f:
+                # Cada shard repite el encabezado
+                lines.extend(f.readlines()[1 if i else 0 :])
+        with open(os.path.join(merged, "likes.csv"), encoding="utf-8") as f:
+            self.assertEqual(lines, f.readlines())
+
+
+@skipUnless(generateCSV, "requiere numpy, pandas y faker")
+class GeneratorPopularityTests(SimpleTestCase):
+    def test_alias_table_samples_in_proportion_to_the_weights(self):
+        np = generateCSV.np
+        table = generateCSV.AliasTable(np.array([1.0, 2.0, 7.0]))
+        samples = table.sample(np.random.default_rng(0), 100000)
+        shares = np.bincount(samples, minlength=3) / len(samples)
+        np.testing.assert_allclose(shares, [0.1, 0.2, 0.7], atol=0.01)
+
+    def test_zipf_concentrates_follows_and_uniform_does_not(self):
+        np = generateCSV.np
+        counts = generateCSV.scaled_counts(1)
+        users = counts["users"]
+
+        def top_share(distribution):
+            popularity = generateCSV.Popularity(counts, distribution, 1.0, 42)
+            _, followed = popularity.pairs(
+                np.random.default_rng(1), "active_users", "popular_users", users, 20000
+            )
+            self.assertTrue(((followed >= 1) & (followed <= users)).all())
+            degrees = np.sort(np.bincount(followed))[::-1]
+            return degrees[: users // 100].sum() / len(followed)
+
+        # El 1% más seguido concentra mucho más que su parte con zipf
+        self.assertGreater(top_share(generateCSV.ZIPF), 0.2)
+        self.assertLess(top_share(generateCSV.UNIFORM), 0.05)
+
+
+@override_settings(PROPERTY_TYPES={"Usuario.edad": "Integer", "Post.activo": "Boolean"})
+class CoercionTests(OfflineSchemaMixin, SimpleTestCase):
+    def test_values_are_converted_by_label_and_property(self):
+        self.assertEqual(coercion.coerce("Usuario", "edad", " 30 "), 30)
+        self.assertEqual(coercion.coerce(["Post", "Usuario"], "edad", "7"), 7)
+        self.assertEqual(coercion.coerce("Post", "activo", "TRUE"), True)
+        self.assertEqual(
+            coercion.coerce("Usuario", "fecha_registro", "2024-01-02"),
+            datetime.date(2024, 1, 2),
+        )
+        # Fuera del registro se adivina el número, y las fechas van por nombre
+        self.assertEqual(coercion.coerce("Post", "edad", "1.5"), 1.5)
+        self.assertEqual(
+            coercion.coerce("Grupo", "fecha_creacion", "2024-01-02"),
+            datetime.date(2024, 1, 2),
+        )
+
+    def test_invalid_values_are_kept_as_given(self):
+        self.assertEqual(coercion.coerce("Usuario", "edad", "treinta"), "treinta")
+        self.assertEqual(
+            coercion.coerce("Usuario", "fecha_registro", "2024-02-30"), "2024-02-30"
+        )
+
+    def test_only_typed_properties_are_coerced(self):
+        coerced = coercion.coerce_properties("Usuario", {"edad": "30", "codigo": "007"})
+        self.assertEqual(coerced, {"edad": 30, "codigo": "007"})
+
+    def test_ids_without_a_type_are_integers_only_if_all_are(self):
+        self.assertEqual(coercion.coerce_ids("Usuario", ["1", 2]), [1, 2])
+        self.assertEqual(coercion.coerce_ids("Usuario", ["1", "a"]), ["1", "a"])
+
+    def test_temporal_values_are_serialized_as_iso_text(self):
+        props = {"fecha": datetime.date(2024, 1, 2), "nombre": "Ana"}
+        self.assertEqual(
+            coercion.serialize_properties(props),
+            {"fecha": "2024-01-02", "nombre": "Ana"},
+        )
+
+
+class SchemaBootstrapTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(schema, "neo4j_conn")
+        self.session = patcher.start().session.return_value.__enter__.return_value
+        self.addCleanup(patcher.stop)
+
+    def test_bootstrap_runs_every_statement_and_reports_failures(self):
+        statements = schema.schema_statements()
+        failing = "usuario_id_unique"
+        self.session.run.side_effect = lambda statement: (
+            mock.Mock(consume=mock.Mock(side_effect=RuntimeError("duplicados")))
+            if failing in statement
+            else mock.Mock()
+        )
+        report = mock.Mock()
+
+        created = schema.bootstrap(report=report)
+        ran = [call.args[0] for call in self.session.run.call_args_list]
+        self.assertEqual(ran, [statement for _, statement in statements])
+        self.assertIn(
+            "CREATE CONSTRAINT usuario_id_unique IF NOT EXISTS "
+            "FOR (n:Usuario) REQUIRE n.id IS UNIQUE",
+            ran,
+        )
+        self.assertIn(
+            "CREATE RANGE INDEX post_fecha_publicacion_range IF NOT EXISTS "
+            "FOR (n:Post) ON (n.fecha_publicacion)",
+            ran,
+        )
+        self.assertEqual(created, [name for name, _ in statements if name != failing])
+        report.assert_any_call("[error] usuario_id_unique: duplicados")
+        report.assert_any_call("[ok] post_id_unique")
+
+    def progress(self, *states):
+        return [
+            {"name": name, "state": state, "populationPercent": percent}
+            for name, state, percent in states
+        ]
+
+    def test_wait_for_indexes_polls_until_every_index_is_online(self):
+        self.session.run.side_effect = [
+            self.progress(("a", "ONLINE", 100.0), ("b", "POPULATING", 40.0)),
+            self.progress(("a", "ONLINE", 100.0), ("b", "ONLINE", 100.0)),
+        ]
+        report = mock.Mock()
+        with mock.patch.object(schema.time, "sleep") as sleep:
+            self.assertTrue(schema.wait_for_indexes(["a", "b"], report=report))
+        sleep.assert_called_once_with(2)
+        self.assertEqual(self.session.run.call_args.kwargs, {"names": ["a", "b"]})
+        report.assert_any_call("  b: POPULATING (40.0%)")
+
+    def test_wait_for_indexes_gives_up_after_the_timeout(self):
+        self.session.run.return_value = self.progress(("a", "POPULATING", 10.0))
+        with mock.patch.object(schema.time, "sleep"), mock.patch.object(
+            schema.time, "monotonic", side_effect=[0, 5, 11]
+        ):
+            self.assertFalse(
+                schema.wait_for_indexes(["a"], timeout=10, report=mock.Mock())
+            )
+        self.assertEqual(self.session.run.call_count, 2)
+
+    def ready(self):
+        apps.ApiConfig("api", importlib.import_module("api")).ready()
+
+    def test_ready_bootstraps_only_when_configured(self):
+        with mock.patch.object(schema, "bootstrap") as bootstrap:
+            with override_settings(NEO4J_BOOTSTRAP_SCHEMA=False):
+                self.ready()
+            bootstrap.assert_not_called()
+            with override_settings(NEO4J_BOOTSTRAP_SCHEMA=True):
+                self.ready()
+            bootstrap.assert_called_once_with(report=apps.logger.info)
+
+    @override_settings(NEO4J_BOOTSTRAP_SCHEMA=True)
+    def test_ready_logs_a_failed_bootstrap(self):
+        with mock.patch.object(
+            schema, "bootstrap", side_effect=RuntimeError("sin conexión")
+        ), self.assertLogs("api.apps", "ERROR"):
+            self.ready()
+
+
+class RendererTests(SimpleTestCase):
+    data = {
+        "fecha": neo4j.time.Date(2024, 1, 2),
+        "creado": neo4j.time.DateTime(2024, 1, 2, 3, 4, 5),
+        "duracion": neo4j.time.Duration(days=1, hours=2),
+        "hoy": datetime.date(2024, 1, 3),
+        "monto": decimal.Decimal("1.5"),
+        "texto": gettext_lazy("ñandú"),
+        "conteos": {1: "uno", 2: ["dos"]},
+    }
+    expected = {
+        "fecha": "2024-01-02",
+        "creado": "2024-01-02T03:04:05.000000000",
+        "duracion": "P1DT2H",
+        "hoy": "2024-01-03",
+        "monto": 1.5,
+        "texto": "ñandú",
+        "conteos": {"1": "uno", "2": ["dos"]},
+    }
+
+    def encoders(self):
+        # Con orjson (si está instalado) y con el encoder de la librería estándar
+        if renderers.orjson is not None:
+            yield "orjson"
+        with mock.patch.object(renderers, "orjson", None):
+            yield "json"
+
+    def test_temporal_values_and_non_str_keys_round_trip(self):
+        for encoder in self.encoders():
+            with self.subTest(encoder):
+                self.assertEqual(json.loads(renderers.dumps(self.data)), self.expected)
+                rendered = renderers.ORJSONRenderer().render(self.data)
+                self.assertEqual(json.loads(rendered), self.expected)
+                response = renderers.JsonResponse(self.data)
+                self.assertEqual(json.loads(response.content), self.expected)
+
+    def test_indent_and_unknown_types(self):
+        for encoder in self.encoders():
+            with self.subTest(encoder):
+                self.assertIn(b'\n  "a": 1', renderers.dumps({"a": 1}, indent=2))
+                self.assertIn("ñ".encode(), renderers.dumps({"a": "ñ"}))
+                with self.assertRaises(TypeError):
+                    renderers.dumps({"a": object()})
+
+    def test_default_only_converts_what_orjson_cannot_encode(self):
+        date = neo4j.time.Date(2024, 1, 2)
+        self.assertEqual(renderers.default(date), "2024-01-02")
+        with self.assertRaisesMessage(TypeError, "Objeto de tipo object"):
+            renderers.default(object())
+
+
+@override_settings(PROPERTY_TYPES_FROM_DATABASE=True, PROPERTY_TYPES={})
+class TypeRegistryTests(SimpleTestCase):
+    def setUp(self):
+        self.registry = coercion.TypeRegistry()
+        self.loads = 0
+        self.release = threading.Event()
+
+    def _load(self):
+        self.loads += 1
+        self.release.wait(5)
+        return {("Usuario", "edad"): coercion.INTEGER}, set()
+
+    def _run_threads(self, target, count=8):
+        threads = [threading.Thread(target=target) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def test_first_load_does_not_block_requests(self):
+        results = []
+        with mock.patch.object(self.registry, "_load_from_database", self._load):
+            threads = self._run_threads(lambda: results.append(self.registry.types()))
+            for thread in threads:
+                thread.join(1)
+            # Nadie esperó la primera carga: se usaron los tipos configurados
+            self.assertEqual(len(results), 8)
+            self.assertTrue(all(("Usuario", "edad") not in r for r in results))
+            self.assertTrue(all(r[("Usuario", "fecha_registro")] for r in results))
+            self.release.set()
+            with self.registry._refresh_lock:
+                pass
+        self.assertEqual(self.loads, 1)
+        self.assertEqual(self.registry.types()[("Usuario", "edad")], "Integer")
+
+    @override_settings(PROPERTY_TYPES_FROM_DATABASE=False)
+    def test_first_load_without_the_database_is_immediate(self):
+        with mock.patch.object(self.registry, "start_refresh") as start_refresh:
+            types = self.registry.types()
+        start_refresh.assert_not_called()
+        self.assertTrue(self.registry.is_loaded())
+        self.assertEqual(types[("Usuario", "fecha_registro")], coercion.DATE)
+
+    def test_expired_types_are_served_while_one_thread_refreshes(self):
+        self.release.set()
+        with mock.patch.object(self.registry, "_load_from_database", self._load):
+            self.registry.refresh()
+            stale = self.registry.types()
+            self.release.clear()
+            self.registry._loaded_at -= 10 * 3600
+            results = []
+            threads = self._run_threads(lambda: results.append(self.registry.types()))
+            for thread in threads:
+                thread.join(1)
+            # Nadie esperó la recarga, que sigue bloqueada en _load
+            self.assertTrue(all(result is stale for result in results))
+            self.release.set()
+            with self.registry._refresh_lock:
+                pass
+        self.assertEqual(self.loads, 2)
+        self.assertIsNot(self.registry.types(), stale)
+
+    def test_failed_refresh_keeps_previous_types(self):
+        self.release.set()
+        with mock.patch.object(self.registry, "_load_from_database", self._load):
+            self.registry.refresh()
+            types = self.registry.types()
+        with mock.patch.object(
+            self.registry, "_load_from_database", side_effect=RuntimeError
+        ), self.assertLogs("api.coercion", "ERROR"):
+            self.registry.refresh()
+        self.assertIs(self.registry.types(), types)
+
+
+class AggregateCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def cached(self, label, prop="edad"):
+        return caching.get_aggregate(label, prop)[1]
+
+    def test_invalidation_hides_previous_entries(self):
+        key, cached = caching.get_aggregate("Usuario", "edad")
+        self.assertIsNone(cached)
+        caching.set_aggregate(key, {"avg": 30})
+        self.assertEqual(self.cached("Usuario"), {"avg": 30})
+
+        caching.invalidate_labels(["Usuario"])
+        self.assertIsNone(self.cached("Usuario"))
+
+    def test_an_evicted_generation_does_not_revive_old_entries(self):
+        key, _ = caching.get_aggregate("Usuario", "edad")
+        caching.set_aggregate(key, {"avg": 30})
+        cache.delete(caching._generation_key("Usuario"))
+        self.assertIsNone(self.cached("Usuario"))
+
+    def test_labels_that_share_nodes_are_invalidated_too(self):
+        label_sets = {frozenset(["Usuario", "Influencer", "Verified"])}
+        for label in ["Influencer", "Verified", "Post"]:
+            key, _ = caching.get_aggregate(label, "edad")
+            caching.set_aggregate(key, {"avg": 1})
+
+        with mock.patch.object(coercion.registry, "_label_sets", label_sets):
+            caching.invalidate_labels(["Usuario"])
+        self.assertIsNone(self.cached("Influencer"))
+        self.assertIsNone(self.cached("Verified"))
+        self.assertEqual(self.cached("Post"), {"avg": 1})
+
+    def test_async_helpers_share_the_entries(self):
+        key, _ = async_to_sync(caching.aget_aggregate)("Usuario", "edad")
+        async_to_sync(caching.aset_aggregate)(key, {"avg": 2})
+        self.assertEqual(self.cached("Usuario"), {"avg": 2})
+
+        async_to_sync(caching.ainvalidate_labels)(["Usuario"])
+        self.assertIsNone(self.cached("Usuario"))
+
+
+class RecommendationIndexTests(SimpleTestCase):
+    users = {
+        1: ("Ana", {"cine", "rock"}),
+        2: ("Beto", {"cine"}),
+        3: ("Caro", {"rock"}),
+        4: ("Dani", set()),
+    }
+
+    def setUp(self):
+        self.index = recommendations.CandidateIndex()
+        self.release = threading.Event()
+        self.loads = 0
+
+    def _load(self):
+        self.loads += 1
+        self.release.wait(5)
+        return self.users, {1: {2}, 2: {1, 3}, 3: {2}}, {1: {4}, 4: {3}}, {}
+
+    def _wait_for_build(self):
+        while self.index._refreshing:
+            time.sleep(0.01)
+
+    def test_scores_mutual_friends_and_follows(self):
+        friends = {1: {2}, 2: {1, 3}, 3: {2}}
+        following = {1: {4}, 4: {3}}
+        entries = recommendations.build_entries(
+            self.users, friends, following, {"g": [1, 3]}, 10, 1000
+        )
+        # 3: un amigo en común (2), un grupo (g) y un seguido que lo sigue (4)
+        self.assertEqual(entries[1], [(3, 1, 3, 1, 1, 1)])
+        # Los intermediarios con más de max_degree vecinos no se expanden
+        entries = recommendations.build_entries(
+            self.users, friends, following, {"g": [1, 3]}, 10, 0
+        )
+        self.assertEqual(entries[1], [])
+
+    def test_request_does_not_wait_for_the_first_build(self):
+        with mock.patch.object(self.index, "_load", self._load):
+            with self.assertRaises(recommendations.IndexNotReady):
+                self.index.recommend(1, 5)
+            # Las peticiones siguientes no inician otra construcción
+            with self.assertRaises(recommendations.IndexNotReady):
+                self.index.recommend(1, 5)
+            self.assertFalse(self.index.start_refresh())
+            self.release.set()
+            self._wait_for_build()
+            results, _ = self.index.recommend(1, 5)
+        self.assertEqual(self.loads, 1)
+        self.assertEqual([r["id"] for r in results], [3])
+        self.assertEqual(results[0]["sharedInterests"], ["rock"])
+
+    def test_failed_first_build_is_retried_by_the_next_request(self):
+        with mock.patch.object(
+            self.index, "_load", side_effect=RuntimeError
+        ), self.assertLogs("api.recommendations", "ERROR"):
+            self.index.start_refresh()
+            self._wait_for_build()
+        with mock.patch.object(self.index, "_load", self._load):
+            with self.assertRaises(recommendations.IndexNotReady):
+                self.index.recommend(1, 5)
+            self.release.set()
+            self._wait_for_build()
+        self.assertEqual(self.loads, 1)
+
+
+def _load_gunicorn_config():
+    path = settings.BASE_DIR / "gunicorn.conf.py"
+    spec = importlib.util.spec_from_file_location("gunicorn_conf", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class GunicornHooksTests(SimpleTestCase):
+    def setUp(self):
+        self.config = _load_gunicorn_config()
+        self.server = mock.Mock()
+        self.server.cfg.preload_app = True
+
+    def test_master_builds_the_index_once_and_closes_the_driver(self):
+        with mock.patch.object(recommendations.index, "refresh") as refresh, mock.patch(
+            "api.neo4j_connection.neo4j_conn.close"
+        ) as close, mock.patch.object(coercion.registry, "refresh") as load_types:
+            self.config.when_ready(self.server)
+            refresh.assert_called_once()
+            load_types.assert_called_once()
+            close.assert_called_once()
+
+            self.server.cfg.preload_app = False
+            self.config.when_ready(self.server)
+            refresh.assert_called_once()
+            load_types.assert_called_once()
+
+    @override_settings(RECOMMENDATION_INDEX_WARMUP=True)
+    def test_workers_only_warm_an_index_they_did_not_inherit(self):
+        index = recommendations.index
+        with mock.patch("api.jobs.fail_orphaned"), mock.patch.object(
+            index, "start_refresh"
+        ) as start_refresh, mock.patch.object(
+            coercion.registry, "start_refresh"
+        ) as load_types:
+            with mock.patch.object(
+                index, "is_built", return_value=True
+            ), mock.patch.object(coercion.registry, "is_loaded", return_value=True):
+                self.config.post_worker_init(mock.Mock())
+            start_refresh.assert_not_called()
+            load_types.assert_not_called()
+            with mock.patch.object(
+                index, "is_built", return_value=False
+            ), mock.patch.object(coercion.registry, "is_loaded", return_value=False):
+                self.config.post_worker_init(mock.Mock())
+            start_refresh.assert_called_once()
+            load_types.assert_called_once()
+
+
+class RecommendationViewTests(OfflineSchemaMixin, SimpleTestCase):
+    def test_views_answer_503_until_the_index_is_ready(self):
+        with mock.patch.object(
+            recommendations.index,
+            "recommend",
+            side_effect=recommendations.IndexNotReady,
+        ):
+            for name in ["recommend_users", "async_recommend_users"]:
+                response = self.client.get(reverse(name), {"user_id": 1})
+                self.assertEqual(response.status_code, 503)
+                self.assertEqual(response["Retry-After"], "5")
@@ -1,10 +1,17 @@
 from django.urls import path
+from . import async_views
 from .views import (
     create_node_single_label,
     create_node_multiple_labels,
     create_node_with_properties,
+    create_nodes_bulk,
     search_nodes,
+    query_cache_stats,
+    schema_catalog,
+    recommend_users,
+    home_feed,
     get_aggregated_data,
+    get_multi_aggregated_data,
     update_multiple_nodes_properties,
     remove_multiple_nodes_properties,
     create_relationship,
@@ -12,6 +19,9 @@ from .views import (
     remove_bulk_relationships,
     delete_multiple_nodes_with_checks,
     delete_bulk_relationships,
+    submit_bulk_job,
+    bulk_job_status,
+    cancel_bulk_job,
 )
 
 urlpatterns = [
@@ -33,10 +43,20 @@ urlpatterns = [
         create_node_with_properties,
         name="create_node_with_properties",
     ),
+    path("create-nodes-bulk/", create_nodes_bulk, name="create_nodes_bulk"),
     # Listo
     path("search-nodes/", search_nodes, name="search_nodes"),
+    path("query-cache-stats/", query_cache_stats, name="query_cache_stats"),
+    path("schema-catalog/", schema_catalog, name="schema_catalog"),
+    path("recommend-users/", recommend_users, name="recommend_users"),
+    path("home-feed/", home_feed, name="home_feed"),
     # Listo
     path("get-aggregated-data/", get_aggregated_data, name="get_aggregated_data"),
+    path(
+        "get-multi-aggregated-data/",
+        get_multi_aggregated_data,
+        name="get_multi_aggregated_data",
+    ),
     # Listo
     path(
         "update-multiple-nodes-properties/",
@@ -72,4 +92,85 @@ urlpatterns = [
         delete_bulk_relationships,
         name="delete_bulk_relationships",
     ),
+    path("jobs/", submit_bulk_job, name="submit_bulk_job"),
+    path("jobs/<uuid:job_id>/", bulk_job_status, name="bulk_job_status"),
+    path("jobs/<uuid:job_id>/cancel/", cancel_bulk_job, name="cancel_bulk_job"),
 ]
+
+# Versiones asíncronas (para ASGI) de los mismos endpoints, bajo /api/async/
+async_urlpatterns = [
+    path(
+        "async/create-node-single-label/",
+        async_views.create_node_single_label,
+        name="async_create_node_single_label",
+    ),
+    path(
+        "async/create-node-multiple-labels/",
+        async_views.create_node_multiple_labels,
+        name="async_create_node_multiple_labels",
+    ),
+    path(
+        "async/create-node-with-properties/",
+        async_views.create_node_with_properties,
+        name="async_create_node_with_properties",
+    ),
+    path(
+        "async/create-nodes-bulk/",
+        async_views.create_nodes_bulk,
+        name="async_create_nodes_bulk",
+    ),
+    path("async/search-nodes/", async_views.search_nodes, name="async_search_nodes"),
+    path(
+        "async/recommend-users/",
+        async_views.recommend_users,
+        name="async_recommend_users",
+    ),
+    path("async/home-feed/", async_views.home_feed, name="async_home_feed"),
+    path(
+        "async/get-aggregated-data/",
+        async_views.get_aggregated_data,
+        name="async_get_aggregated_data",
+    ),
+    path(
+        "async/get-multi-aggregated-data/",
+        async_views.get_multi_aggregated_data,
+        name="async_get_multi_aggregated_data",
+    ),
+    path(
+        "async/update-multiple-nodes-properties/",
+        async_views.update_multiple_nodes_properties,
+        name="async_update_multiple_nodes_properties",
+    ),
+    path(
+        "async/remove-multiple-nodes-properties/",
+        async_views.remove_multiple_nodes_properties,
+        name="async_remove_multiple_nodes_properties",
+    ),
+    path(
+        "async/create-relationship/",
+        async_views.create_relationship,
+        name="async_create_relationship",
+    ),
+    path(
+        "async/update-bulk-relationships/",
+        async_views.update_bulk_relationships,
+        name="async_update_bulk_relationships",
+    ),
+    path(
+        "async/remove-bulk-relationship/",
+        async_views.remove_bulk_relationships,
+        name="async_remove_bulk_relationship",
+    ),
+    path(
+        "async/delete-multiple-nodes/",
+        async_views.delete_multiple_nodes_with_checks,
+        name="async_delete_multiple_nodes_with_checks",
+    ),
+    path(
+        "async/delete-bulk-relationships/",
+        async_views.delete_bulk_relationships,
+        name="async_delete_bulk_relationships",
+    ),
+]
+
+urlpatterns += async_urlpatterns
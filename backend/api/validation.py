@@ -0,0 +1,212 @@
+"""
+Validación rápida de las filas de los endpoints masivos.
+
+ListField(child=DictField()) crea un campo y un diccionario de errores por cada
+elemento, y con decenas de miles de relaciones la validación cuesta más que las
+escrituras en Neo4j. RowSchema describe una fila (claves obligatorias, claves que
+son identificadores de Cypher, claves que deben ser listas u objetos) y la revisa
+sin construir mensajes salvo para las filas inválidas; BulkRowsField la aplica a
+toda la lista en una sola pasada y reporta los errores con el mismo formato que
+DRF: {índice: [mensaje]} o {índice: {clave: [mensajes]}}.
+
+Los identificadores de las filas válidas se resuelven además contra el catálogo
+de esquema (catalog.py), una vez por nombre distinto y no por fila.
+"""
+
+from rest_framework import serializers
+
+from . import cypher
+from .catalog import (
+    IDENTIFIER_RE,
+    LABEL,
+    RELATIONSHIP_TYPE,
+    InvalidIdentifier,
+    catalog,
+    is_identifier,
+)
+
+REQUIRED = serializers.Field.default_error_messages["required"]
+NOT_A_LIST = serializers.ListField.default_error_messages["not_a_list"]
+NOT_A_DICT = serializers.DictField.default_error_messages["not_a_dict"]
+INVALID_IDENTIFIER = (
+    "Identificador inválido: solo se permiten letras, números y '_' "
+    "(sin empezar con un número)."
+)
+
+
+def _missing(value):
+    return value is None or value == ""
+
+
+class RowSchema:
+    """
+    Forma de una fila de un payload masivo. is_valid() es el camino rápido, sin
+    construir mensajes; errors() arma los mensajes solo para las filas inválidas.
+    """
+
+    def __init__(
+        self, required=(), identifiers=None, lists=(), dicts=(), new_names=()
+    ):
+        self.required = tuple(required)
+        self.identifiers = dict(identifiers or {})  # {clave: tipo del catálogo}
+        self.lists = tuple(lists)
+        self.dicts = tuple(dicts)
+        # Claves cuyos nombres pueden no existir todavía (por ejemplo, MERGE)
+        self.new_names = frozenset(new_names)
+
+    def is_valid(self, row):
+        match = IDENTIFIER_RE.fullmatch
+        for key in self.required:
+            value = row.get(key)
+            if value is None or value == "":
+                return False
+        for key in self.identifiers:
+            value = row.get(key)
+            if type(value) is not str or match(value) is None:
+                return False
+        for key in self.lists:
+            if type(row.get(key)) is not list:
+                return False
+        for key in self.dicts:
+            if type(row.get(key)) is not dict:
+                return False
+        return True
+
+    def errors(self, row):
+        """Retorna {clave: [mensajes]} con los errores de la fila, o None."""
+        if self.is_valid(row):
+            return None
+        errors = {}
+        for key in self.required:
+            if _missing(row.get(key)):
+                errors[key] = [str(REQUIRED)]
+        for key in self.identifiers:
+            if key not in errors and not is_identifier(row.get(key)):
+                errors[key] = [INVALID_IDENTIFIER]
+        for key, expected, message in [(k, list, NOT_A_LIST) for k in self.lists] + [
+            (k, dict, NOT_A_DICT) for k in self.dicts
+        ]:
+            value = row.get(key)
+            if not isinstance(value, expected):
+                errors[key] = [str(message).format(input_type=type(value).__name__)]
+        return errors
+
+    def resolve(self, row, memo):
+        """
+        Reemplaza en una fila válida los identificadores por su nombre canónico
+        del catálogo. Retorna {clave: [mensajes]} o None. memo guarda las
+        resoluciones ya hechas, ya que suele haber pocos nombres distintos.
+        """
+        errors = None
+        for key, kind in self.identifiers.items():
+            name = row[key]
+            result = memo.get((key, name))
+            if result is None:
+                must_exist = key not in self.new_names
+                try:
+                    result = (catalog.resolve(kind, name, must_exist), None)
+                except InvalidIdentifier as e:
+                    result = (None, str(e))
+                memo[(key, name)] = result
+            canonical, error = result
+            if error:
+                if errors is None:
+                    errors = {}
+                errors[key] = [error]
+            elif canonical != name:
+                row[key] = canonical
+        return errors
+
+    def resolve_rows(self, rows, skip):
+        """
+        Como resolve, para toda una lista: cada nombre distinto se resuelve una
+        sola vez y las filas solo se recorren de nuevo si hay nombres que corregir
+        o rechazar. Las filas cuyo índice está en skip (inválidas) se ignoran.
+        Retorna {idx: {clave: [mensajes]}}.
+        """
+        errors = {}
+        for key, kind in self.identifiers.items():
+            must_exist = key not in self.new_names
+            names = {row[key] for idx, row in enumerate(rows) if idx not in skip}
+            changes = {}  # {nombre: nombre canónico o InvalidIdentifier}
+            for name in names:
+                try:
+                    canonical = catalog.resolve(kind, name, must_exist)
+                except InvalidIdentifier as e:
+                    changes[name] = e
+                    continue
+                if canonical != name:
+                    changes[name] = canonical
+            if not changes:
+                continue
+            for idx, row in enumerate(rows):
+                if idx in skip or row[key] not in changes:
+                    continue
+                change = changes[row[key]]
+                if isinstance(change, InvalidIdentifier):
+                    errors.setdefault(idx, {})[key] = [str(change)]
+                else:
+                    row[key] = change
+        return errors
+
+    def row_error(self, row):
+        """Los mismos errores como un solo texto, para las filas NDJSON."""
+        errors = self.errors(row) or self.resolve(row, {})
+        if errors:
+            return " ".join(f"{key}: {messages[0]}" for key, messages in errors.items())
+        return None
+
+
+RELATIONSHIP_IDENTIFIERS = {
+    "label1": LABEL,
+    "label2": LABEL,
+    "rel_type": RELATIONSHIP_TYPE,
+}
+
+RELATIONSHIP_SCHEMA = RowSchema(
+    required=cypher.RELATIONSHIP_KEYS, identifiers=RELATIONSHIP_IDENTIFIERS
+)
+# update-bulk-relationships usa MERGE, por lo que el tipo de relación puede ser nuevo
+RELATIONSHIP_MERGE_SCHEMA = RowSchema(
+    required=cypher.RELATIONSHIP_KEYS,
+    identifiers=RELATIONSHIP_IDENTIFIERS,
+    new_names=["rel_type"],
+)
+RELATIONSHIP_REMOVE_SCHEMA = RowSchema(
+    required=cypher.RELATIONSHIP_KEYS,
+    identifiers=RELATIONSHIP_IDENTIFIERS,
+    lists=["properties"],
+)
+NODE_UPDATE_SCHEMA = RowSchema(required=["node_id"], dicts=["properties"])
+
+
+class BulkRowsField(serializers.Field):
+    """
+    Equivalente a ListField(child=DictField()) que además valida cada fila con
+    un RowSchema, en una sola pasada y sin crear campos por elemento.
+    """
+
+    default_error_messages = {"not_a_list": NOT_A_LIST}
+
+    def __init__(self, schema, **kwargs):
+        self.schema = schema
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            self.fail("not_a_list", input_type=type(data).__name__)
+
+        errors = {}
+        is_valid = self.schema.is_valid
+        for idx, row in enumerate(data):
+            if type(row) is not dict:
+                errors[idx] = [str(NOT_A_DICT).format(input_type=type(row).__name__)]
+            elif not is_valid(row):
+                errors[idx] = self.schema.errors(row)
+        errors.update(self.schema.resolve_rows(data, errors))
+        if errors:
+            raise serializers.ValidationError(errors)
+        return data
+
+    def to_representation(self, value):
+        return value
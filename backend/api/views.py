@@ -1,12 +1,18 @@
+import functools
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
 from django.shortcuts import render
 from rest_framework.response import Response
 from rest_framework.decorators import api_view
 from .serializers import (
     NodeSerializer,
+    NodeBulkCreateSerializer,
     NodeCreateSingleSerializer,
     NodeCreateMultipleLabelsSerializer,
     NodeSearchSerializer,
     AggregatedDataSerializer,
+    MultiAggregatedDataSerializer,
     MultipleNodesUpdateSerializer,
     MultipleNodesPropertiesRemoveSerializer,
     RelationshipCreationSerializer,
@@ -14,11 +20,115 @@ from .serializers import (
     RelationshipBulkRemoveSerializer,
     MultipleNodesDeleteWithChecksSerializer,
     RelationshipBulkDeleteSerializer,
+    BulkStreamOptionsSerializer,
+    NodesUpdateStreamSerializer,
+    BulkJobSubmitSerializer,
+    BulkJobSerializer,
+    UserRecommendationSerializer,
+    HomeFeedSerializer,
 )
 from .neo4j_connection import neo4j_conn
-import datetime
+from . import (
+    bulk,
+    caching,
+    cypher,
+    feed,
+    jobs,
+    ndjson,
+    pagination,
+    parallel,
+    recommendations,
+    validation,
+)
+from .catalog import LABEL, RELATIONSHIP_TYPE, catalog
+from .models import BulkJob
 from neo4j.exceptions import Neo4jError
-from neo4j.time import Date as Neo4jDate
+
+
+def _run_bulk_relationships(rels, props_fn, query_fn, mode=bulk.BEST_EFFORT):
+    """
+    Ejecuta un UNWIND por firma (label1, label2, rel_type), todos en una sola
+    transacción de escritura. Retorna ({idx: relaciones afectadas}, revertida).
+    """
+    groups = bulk.group_relationships(rels, props_fn)
+    try:
+        with neo4j_conn.session() as session:
+            matched = session.execute_write(
+                cypher.run_steps, bulk.run_groups, groups, query_fn, mode
+            )
+    except bulk.PartialMatchError as e:
+        return e.matched, True
+    feed.cache.relationships_changed(rels)
+    return matched, False
+
+
+def _ingest_ndjson(request, options, row_error, run_batch, not_found):
+    """
+    Lee el cuerpo NDJSON por líneas y ejecuta la función de transacción
+    run_batch({idx: fila}) por cada lote de options["batch_size"] filas
+    válidas. En best_effort cada lote es su propia transacción; en
+    all_or_nothing todos los lotes van en una sola transacción que solo se
+    confirma si ninguna fila falló. Retorna (bulk.StreamReport, revertida).
+    """
+    batches = bulk.stream_batches(request, options, row_error)
+    report = bulk.StreamReport()
+
+    with neo4j_conn.session() as session:
+        if options["mode"] == bulk.ALL_OR_NOTHING:
+            with session.begin_transaction() as tx:
+                for batch, errors, read in batches:
+                    matched = cypher.run_steps(tx, run_batch, batch) if batch else {}
+                    report.add(batch, matched, errors, read, not_found)
+                if report.failed():
+                    tx.rollback()
+                    return report, True
+                tx.commit()
+        else:
+            for batch, errors, read in batches:
+                matched = (
+                    session.execute_write(cypher.run_steps, run_batch, batch)
+                    if batch
+                    else {}
+                )
+                report.add(batch, matched, errors, read, not_found)
+    return report, False
+
+
+def _stream_bulk_relationships(
+    request,
+    props_fn,
+    query_fn,
+    count_key,
+    message,
+    schema,
+    with_type=False,
+):
+    # Versión NDJSON (una relación por línea) de los endpoints masivos de relaciones
+    serializer = BulkStreamOptionsSerializer(data=request.query_params)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=400)
+
+    # Con MERGE (schema.new_names) los rel_type escritos pueden ser nuevos
+    written_types = set() if schema.new_names else None
+    report, rolled_back = _ingest_ndjson(
+        request,
+        serializer.validated_data,
+        schema.row_error,
+        functools.partial(
+            bulk.relationships_batch,
+            props_fn=props_fn,
+            query_fn=query_fn,
+            written_types=written_types,
+        ),
+        functools.partial(bulk.not_found_errors, with_type=with_type),
+    )
+    if written_types and not rolled_back:
+        catalog.register(RELATIONSHIP_TYPE, written_types)
+    response_data, status = report.response(
+        count_key, message, bulk.RELATIONSHIPS_ROLLED_BACK if rolled_back else None
+    )
+    return Response(response_data, status=status)
+
 
 """
 Crear un nodo con un solo label
@@ -37,13 +147,15 @@ def create_node_single_label(request):
     serializer = NodeCreateSingleSerializer(data=request.data)
     if serializer.is_valid():
         label = serializer.validated_data["label"]
-        query = f"CREATE (n:{label}) RETURN id(n) AS node_id, labels(n) AS labels"
+        query = cypher.create_node_single_label_query(label)
 
-        with neo4j_conn._driver.session() as session:
+        with neo4j_conn.session() as session:
             result = session.run(query)
             nodo_creado = result.single()  # Obtiene el nodo creado
 
             if nodo_creado:
+                caching.invalidate_labels([label])
+                catalog.register(LABEL, [label])
                 return Response(
                     {
                         "message": "Nodo creado",
@@ -85,13 +197,15 @@ def create_node_multiple_labels(request):
 
         labels_str = ":".join(labels)  # Formatear para Neo4j (Ej: "Persona:Cliente")
 
-        query = f"CREATE (n:{labels_str}) RETURN id(n) AS node_id, labels(n) AS labels"
+        query = cypher.create_node_multiple_labels_query(labels_str)
 
-        with neo4j_conn._driver.session() as session:
+        with neo4j_conn.session() as session:
             result = session.run(query)
             nodo_creado = result.single()  # Obtener el nodo creado
 
             if nodo_creado:
+                caching.invalidate_labels(labels)
+                catalog.register(LABEL, labels)
                 return Response(
                     {
                         "message": "Nodo con múltiples labels creado",
@@ -139,40 +253,18 @@ def create_node_with_properties(request):
                 {"error": "Debes proporcionar al menos 5 propiedades."}, status=400
             )
 
-        # Construir la cadena de propiedades para Cypher
-        properties_string_list = []
-        for key in properties.keys():
-            # Asumimos que propiedades que comienzan con 'fecha_' o terminan con '_fecha' son de tipo fecha
-            if key.startswith("fecha_") or key.endswith("_fecha"):
-                properties_string_list.append(f"n.{key} = date(${key})")
-            else:
-                properties_string_list.append(f"n.{key} = ${key}")
-
-        properties_string = ", ".join(properties_string_list)
-
-        # Usamos elementId(n) en lugar de id(n) para evitar advertencias de deprecación
-        query = f"""
-        CREATE (n:{label})
-        SET {properties_string}
-        RETURN elementId(n) AS node_id, labels(n) AS labels, properties(n) AS properties
-        """
+        query = cypher.create_node_with_properties_query(label, properties)
 
-        with neo4j_conn._driver.session() as session:
+        with neo4j_conn.session() as session:
             result = session.run(query, properties)
             nodo_creado = result.single()
 
             if nodo_creado:
+                caching.invalidate_labels([label])
+                catalog.register(LABEL, [label])
                 node_id = nodo_creado["node_id"]
                 node_labels = nodo_creado["labels"]
-                node_props = nodo_creado["properties"]
-
-                # Convertir valores de tipo fecha (tanto de datetime como de neo4j.time.Date) a string (ISO 8601)
-                for k, v in node_props.items():
-                    if isinstance(v, (datetime.date, datetime.datetime, Neo4jDate)):
-                        try:
-                            node_props[k] = v.isoformat()
-                        except Exception:
-                            node_props[k] = str(v)
+                node_props = cypher.serialize_properties(nodo_creado["properties"])
                 return Response(
                     {
                         "message": "Nodo con propiedades creado",
@@ -189,6 +281,69 @@ def create_node_with_properties(request):
     return Response(serializer.errors, status=400)
 
 
+@api_view(["POST"])
+def create_nodes_bulk(request):
+    """
+    Crea muchos nodos con los mismos labels, en lotes UNWIND de chunk_size filas
+    (una transacción por lote). Ejemplo de JSON esperado:
+    {
+        "labels": ["Usuario"],
+        "chunk_size": 1000,
+        "nodes": [
+            {"nombre": "Juan Pérez", "email": "juan@gmail.com", "edad": 30,
+             "fecha_registro": "2024-01-01", "activo": true},
+            ...
+        ]
+    }
+    También acepta un cuerpo application/x-ndjson (un nodo por línea) con
+    label/labels/chunk_size como parámetros de la URL. Cada nodo debe tener al
+    menos 5 propiedades; los que no cumplen se reportan en 'errors' y no se crean.
+    """
+    if ndjson.is_ndjson(request):
+        serializer = NodeBulkCreateSerializer(data=request.query_params)
+    else:
+        serializer = NodeBulkCreateSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=400)
+
+    data = serializer.validated_data
+    if ndjson.is_ndjson(request):
+        rows = ndjson.request_objects(request)
+    else:
+        rows = ((node, None) for node in data.get("nodes", []))
+
+    labels = data["labels"]
+    labels_str = ":".join(labels)
+    chunk_size = data.get("chunk_size", settings.BULK_CREATE_CHUNK_SIZE)
+
+    created, errors, total = {}, [], 0
+    with neo4j_conn.session() as session:
+        for chunk, chunk_errors, total in bulk.node_chunks(rows, chunk_size):
+            errors.extend(chunk_errors)
+            if not chunk:
+                continue
+            try:
+                created.update(
+                    session.execute_write(
+                        cypher.run_steps, bulk.create_nodes_chunk, labels_str, chunk
+                    )
+                )
+            except Neo4jError as e:
+                errors.extend((row["idx"], str(e)) for row in chunk)
+
+    if created:
+        caching.invalidate_labels(labels)
+        catalog.register(LABEL, labels)
+    return Response(bulk.node_creation_response(labels, total, created, errors))
+
+
+def _stream_nodes(query, params):
+    # La sesión queda abierta mientras el cliente consume la respuesta
+    with neo4j_conn.session() as session:
+        for record in session.run(query, params):
+            yield cypher.node_to_ndjson(record)
+
+
 @api_view(["POST"])
 def search_nodes(request):
     """
@@ -198,7 +353,11 @@ def search_nodes(request):
       - filters: Diccionario de filtros, donde cada clave es el nombre de la propiedad y el valor es un objeto con:
             - operator: "=", "<", "<=", ">", ">=", "IN", "CONTAINS"
             - value: Valor a comparar (puede ser simple o una lista)
-      - limit: Número máximo de nodos a retornar (por defecto 100)
+      - limit: Número máximo de nodos a retornar (por defecto 100; sin límite en streaming)
+      - order_by: Propiedad por la que se ordena para paginar (ej: "id" o "fecha_registro")
+      - cursor: Valor de 'next_cursor' de la respuesta anterior, para pedir la siguiente página
+      - stream: true para recibir los nodos como NDJSON (una línea por nodo) a medida que
+        se leen de Neo4j, sin armar toda la respuesta en memoria
 
       JSON de ejemplo:
         {
@@ -208,88 +367,127 @@ def search_nodes(request):
                 "fecha_registro": { "operator": ">=", "value": "2022-01-01" }
             },
             "limit": 50
+        }
+
+      Con order_by (o cursor) la respuesta incluye 'next_cursor', que es null en la última página.
     """
     serializer = NodeSearchSerializer(data=request.data)
     if serializer.is_valid():
         labels = serializer.validated_data.get("labels", [])
         filters = serializer.validated_data.get("filters", {})
-        limit = serializer.validated_data.get("limit", 100)
-
-        query = "MATCH (n"
-        if labels:
-            query += ":" + ":".join(labels)
-        query += ")"
-
-        params = {}
-        where_clauses = []
-
-        if filters:
-            for key, filter_item in filters.items():
-                operator = filter_item["operator"].upper()
-                value = filter_item["value"]
-
-                if operator == "IN":
-                    # Si el valor no es una lista, lo convertimos a lista
-                    if not isinstance(value, list):
-                        value = [value]
-                    where_clauses.append(f"ANY(x IN n.{key} WHERE x IN ${key})")
-                    params[key] = [str(v).strip() for v in value]
-                elif operator == "CONTAINS":
-                    if isinstance(value, list):
-                        where_clauses.append(
-                            f"ANY(y IN n.{key} WHERE ANY(x IN ${key} WHERE y CONTAINS x))"
-                        )
-                        params[key] = [str(v).strip() for v in value]
-                    else:
-                        where_clauses.append(
-                            f"ANY(y IN n.{key} WHERE y CONTAINS ${key})"
-                        )
-                        params[key] = str(value).strip()
-                else:
-                    where_clauses.append(f"n.{key} {operator} ${key}")
-                    # Si la propiedad es de fecha (por ejemplo, empieza con "fecha_"), convertir el valor a fecha.
-                    if key.lower().startswith("fecha_"):
-                        try:
-                            params[key] = datetime.date.fromisoformat(value)
-                        except ValueError:
-                            params[key] = value
-                    else:
-                        try:
-                            params[key] = int(value)
-                        except ValueError:
-                            try:
-                                params[key] = float(value)
-                            except ValueError:
-                                params[key] = value
-
-        if where_clauses:
-            query += " WHERE " + " AND ".join(where_clauses)
-        query += " RETURN elementId(n) AS node_id, labels(n) AS labels, properties(n) AS properties"
-        query += f" LIMIT {limit}"
-
-        nodes = []
-        with neo4j_conn._driver.session() as session:
+        order_by, after, limit = pagination.search_options(serializer.validated_data)
+
+        query, params = cypher.search_nodes_query(
+            labels, filters, limit, order_by, after
+        )
+
+        if serializer.validated_data["stream"]:
+            return StreamingHttpResponse(
+                _stream_nodes(query, params), content_type="application/x-ndjson"
+            )
+
+        with neo4j_conn.session() as session:
             result = session.run(query, params)
-            for record in result:
-                props = record["properties"]
-                for k, v in props.items():
-                    if hasattr(v, "isoformat"):
-                        try:
-                            props[k] = v.isoformat()
-                        except Exception:
-                            props[k] = str(v)
-                nodes.append(
-                    {
-                        "id": record["node_id"],
-                        "labels": record["labels"],
-                        "properties": props,
-                    }
-                )
+            nodes = [cypher.node_from_record(record) for record in result]
+
+        response_data = {"message": f"Se encontraron {len(nodes)} nodos", "nodes": nodes}
+        if order_by:
+            response_data["next_cursor"] = pagination.next_cursor(
+                nodes, order_by, limit
+            )
+        return Response(response_data)
+    return Response(serializer.errors, status=400)
+
+
+@api_view(["GET"])
+def query_cache_stats(request):
+    """
+    Métricas de la caché de consultas de search_nodes: cuántas búsquedas
+    reutilizaron una consulta ya construida (hits) y cuántas tuvieron que
+    construirla (misses). Cada consulta reutilizada también reutiliza el plan
+    guardado en la caché de planes de Neo4j.
+    """
+    return Response(cypher.search_query_cache_stats())
+
+
+@api_view(["GET"])
+def schema_catalog(request):
+    """
+    Labels, tipos de relación y propiedades contra los que se validan los
+    identificadores de las peticiones. Con ?refresh=true se recarga antes.
+    """
+    if request.query_params.get("refresh") == "true":
+        catalog.refresh()
+    return Response(catalog.snapshot())
+
 
+@api_view(["GET"])
+def recommend_users(request):
+    """
+    "Personas que quizás conozcas": los usuarios con más amigos, grupos y
+    seguidos en común con ?user_id=N (desempatando por intereses en común),
+    leídos del índice precalculado de recommendations.py. ?limit=N (10 por
+    defecto) indica cuántos retornar.
+    """
+    serializer = UserRecommendationSerializer(data=request.query_params)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=400)
+
+    user_id = serializer.validated_data["user_id"]
+    try:
+        results, built_on = recommendations.index.recommend(
+            user_id, serializer.validated_data["limit"]
+        )
+    except recommendations.IndexNotReady:
         return Response(
-            {"message": f"Se encontraron {len(nodes)} nodos", "nodes": nodes}
+            {"error": recommendations.NOT_READY_MESSAGE},
+            status=503,
+            headers={"Retry-After": str(recommendations.RETRY_AFTER)},
         )
-    return Response(serializer.errors, status=400)
+    if results is None:
+        return Response(
+            {"error": f"Usuario con id {user_id} no encontrado."}, status=404
+        )
+    return Response(
+        {"userId": user_id, "recommendations": results, "indexBuiltAt": built_on}
+    )
+
+
+@api_view(["GET"])
+def home_feed(request):
+    """
+    Feed de inicio de ?user_id=N: publicaciones y reels de los usuarios que
+    sigue y de sus amigos, del más reciente al más antiguo (ver feed.py).
+    ?limit=N (20 por defecto, hasta 100) es el tamaño de la página y ?cursor el
+    'next_cursor' de la página anterior.
+
+    La primera página se sirve desde la caché de feed.py cuando limit no supera
+    FEED_HEAD_SIZE.
+    """
+    serializer = HomeFeedSerializer(data=request.query_params)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=400)
+
+    user_id = serializer.validated_data["user_id"]
+    limit = serializer.validated_data["limit"]
+    cursor = serializer.validated_data.get("cursor")
+    head = cursor is None and limit <= settings.FEED_HEAD_SIZE
+
+    items = feed.cache.get(user_id) if head else None
+    if items is None:
+        size = settings.FEED_HEAD_SIZE if head else limit
+        with neo4j_conn.session() as session:
+            loaded = session.execute_read(
+                cypher.run_steps, feed.load, user_id, cursor, size
+            )
+        if loaded is None:
+            return Response(
+                {"error": f"Usuario con id {user_id} no encontrado."}, status=404
+            )
+        items, authors = loaded
+        if head:
+            feed.cache.set(user_id, items, authors)
+    return Response({"userId": user_id, **feed.page(items, limit)})
 
 
 """
@@ -314,29 +512,28 @@ def get_aggregated_data(request):
         label = serializer.validated_data["label"]
         prop = serializer.validated_data["property"]
 
-        query = f"""
-        MATCH (n:{label})
-        RETURN COUNT(n) AS count, 
-               AVG(n.{prop}) AS avg, 
-               MAX(n.{prop}) AS max, 
-               MIN(n.{prop}) AS min, 
-               SUM(n.{prop}) AS sum
-        """
+        # Los resultados se guardan en caché por (label, property) durante
+        # AGGREGATE_CACHE_TTL segundos, o hasta que se escriban nodos del label.
+        cache_key, cached = caching.get_aggregate(label, prop)
+        if cached is not None:
+            return Response(cached)
+
+        query = cypher.aggregated_data_query(label, prop)
 
-        with neo4j_conn._driver.session() as session:
+        with neo4j_conn.session() as session:
             result = session.run(query)
             record = result.single()
             if record:
-                return Response(
-                    {
-                        "message": f"Datos agregados para nodos con label '{label}' y propiedad '{prop}'",
-                        "count": record["count"],
-                        "avg": record["avg"],
-                        "max": record["max"],
-                        "min": record["min"],
-                        "sum": record["sum"],
-                    }
-                )
+                response_data = {
+                    "message": f"Datos agregados para nodos con label '{label}' y propiedad '{prop}'",
+                    "count": record["count"],
+                    "avg": record["avg"],
+                    "max": record["max"],
+                    "min": record["min"],
+                    "sum": record["sum"],
+                }
+                caching.set_aggregate(cache_key, response_data)
+                return Response(response_data)
             else:
                 return Response(
                     {"error": "No se encontraron datos agregados."}, status=404
@@ -349,6 +546,65 @@ Agregar y actualizar propiedades de uno o varios nodos
 """
 
 
+@api_view(["POST"])
+def get_multi_aggregated_data(request):
+    """
+    Igual que get_aggregated_data, pero calcula varias propiedades en un solo
+    recorrido de los nodos. Se espera recibir un JSON con:
+      - label: Etiqueta de los nodos a consultar (por ejemplo, "Reel").
+      - properties: Lista de propiedades numéricas (por ejemplo, ["likes", "duracion"]).
+      - group_by (opcional): Propiedad por la que se agrupan los resultados
+        (por ejemplo, "categoria").
+      - percentiles (opcional): Lista de valores entre 0 y 1 (por ejemplo, [0.5, 0.95]).
+      - histogram (opcional): {"property": "likes", "bucket_size": 500}.
+    """
+    serializer = MultiAggregatedDataSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=400)
+
+    data = serializer.validated_data
+    label = data["label"]
+    cache_key, cached = caching.get_aggregate(label, caching.spec_key(data))
+    if cached is not None:
+        return Response(cached)
+
+    with neo4j_conn.session() as session:
+        groups = session.execute_read(
+            cypher.run_steps, cypher.multi_aggregation, data
+        )
+
+    response_data = {
+        "message": f"Datos agregados para nodos con label '{label}' y propiedades {data['properties']}",
+        "groups": groups,
+    }
+    caching.set_aggregate(cache_key, response_data)
+    return Response(response_data)
+
+
+def _stream_update_nodes(request):
+    serializer = NodesUpdateStreamSerializer(data=request.query_params)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=400)
+
+    label = serializer.validated_data["label"]
+
+    report, rolled_back = _ingest_ndjson(
+        request,
+        serializer.validated_data,
+        bulk.node_update_row_error,
+        functools.partial(bulk.update_nodes_batch, label),
+        bulk.nodes_not_found_errors,
+    )
+    if report.count and not rolled_back:
+        caching.invalidate_labels([label])
+    response_data, status = report.response(
+        "updatedCount",
+        "Nodos actualizados correctamente",
+        bulk.NODES_ROLLED_BACK if rolled_back else None,
+    )
+    return Response(response_data, status=status)
+
+
 @api_view(["PUT"])
 def update_multiple_nodes_properties(request):
     """
@@ -371,31 +627,30 @@ def update_multiple_nodes_properties(request):
     WHERE n.id IN $node_ids
     SET n += $props
     RETURN count(n) AS updatedCount
+
+    Con un cuerpo application/x-ndjson, el label (y opcionalmente mode y
+    batch_size) van en la URL y cada línea indica un nodo y sus propiedades:
+    {"node_id": "1", "properties": {"edad": 35}}
+    Las líneas se aplican en lotes UNWIND a medida que se leen.
     """
+    if ndjson.is_ndjson(request):
+        return _stream_update_nodes(request)
+
     serializer = MultipleNodesUpdateSerializer(data=request.data)
     if serializer.is_valid():
         node_ids = serializer.validated_data["node_ids"]
         label = serializer.validated_data["label"]
         new_properties = serializer.validated_data["properties"]
 
-        # Convertir todos los node_ids a enteros (si la propiedad se almacena como número)
-        try:
-            node_ids_int = [int(node_id) for node_id in node_ids]
-        except ValueError:
-            node_ids_int = node_ids  # Si falla la conversión, se mantienen como strings
-
-        query = f"""
-        MATCH (n:{label})
-        WHERE n.id IN $node_ids
-        SET n += $props
-        RETURN count(n) AS updatedCount
-        """
-        params = {"node_ids": node_ids_int, "props": new_properties}
-
-        with neo4j_conn._driver.session() as session:
+        query, params = cypher.update_multiple_nodes_query(
+            label, node_ids, new_properties
+        )
+
+        with neo4j_conn.session() as session:
             result = session.run(query, params)
             record = result.single()
             if record:
+                caching.invalidate_labels([label])
                 return Response(
                     {
                         "message": "Nodos actualizados correctamente",
@@ -433,28 +688,16 @@ def remove_multiple_nodes_properties(request):
         label = serializer.validated_data["label"]
         props_to_remove = serializer.validated_data["properties"]
 
-        # Convertir los node_ids a enteros, si corresponde
-        try:
-            node_ids_int = [int(nid) for nid in node_ids]
-        except ValueError:
-            node_ids_int = node_ids  # En caso de que se almacenen como strings
-
-        # Construir la cláusula REMOVE a partir de la lista de propiedades
-        remove_clause = ", ".join(f"n.{prop}" for prop in props_to_remove)
-
-        query = f"""
-        MATCH (n:{label})
-        WHERE n.id IN $node_ids
-        REMOVE {remove_clause}
-        RETURN count(n) AS updatedCount
-        """
-        params = {"node_ids": node_ids_int}
+        query, params = cypher.remove_multiple_nodes_properties_query(
+            label, node_ids, props_to_remove
+        )
 
         try:
-            with neo4j_conn._driver.session() as session:
+            with neo4j_conn.session() as session:
                 result = session.run(query, params)
                 record = result.single()
                 if record is not None:
+                    caching.invalidate_labels([label])
                     return Response(
                         {
                             "message": "Propiedades eliminadas de los nodos",
@@ -498,32 +741,14 @@ def create_relationship(request):
                 status=400,
             )
 
-        # Convertir node ids a entero, si la propiedad "id" es numérica
-        try:
-            node1_id = int(data["node1_id"])
-            node2_id = int(data["node2_id"])
-        except ValueError:
-            # Si falla, usarlos como string
-            node1_id = data["node1_id"]
-            node2_id = data["node2_id"]
-
-        label1 = data["label1"]
-        label2 = data["label2"]
-        rel_type = data["rel_type"]
-        props = data["properties"]
-
-        # Construir la consulta Cypher. Utilizamos f-string para inyectar los labels y el tipo de relación.
-        query = f"""
-        MATCH (n1:{label1} {{ id: $node1_id }}), (n2:{label2} {{ id: $node2_id }})
-        CREATE (n1)-[r:{rel_type} $props]->(n2)
-        RETURN elementId(r) AS rel_id, properties(r) AS rel_properties
-        """
-        params = {"node1_id": node1_id, "node2_id": node2_id, "props": props}
-
-        with neo4j_conn._driver.session() as session:
+        query, params = cypher.create_relationship_query(data)
+
+        with neo4j_conn.session() as session:
             result = session.run(query, params)
             record = result.single()
             if record:
+                catalog.register(RELATIONSHIP_TYPE, [data["rel_type"]])
+                feed.cache.relationships_changed([data])
                 return Response(
                     {
                         "message": "Relación creada correctamente",
@@ -560,63 +785,55 @@ def update_bulk_relationships(request):
       - rel_type: Tipo de la relación (ej: "AMIGOS")
       - Propiedades adicionales a agregar/actualizar en la relación (ej: sueldo, tipo_amistad, etc.)
 
-    Se procesa cada relación de forma individual y se acumulan errores si no se encuentra alguno de los nodos o la relación.
+    Las relaciones se agrupan por (label1, label2, rel_type) y cada grupo se envía como una
+    sola consulta UNWIND dentro de una misma transacción de escritura. Se acumulan errores por
+    cada objeto cuyos nodos no se encuentren, y sus posiciones en la lista se retornan en
+    'unmatchedIndices'.
+
+    Con un cuerpo application/x-ndjson (un objeto por línea, y mode/batch_size
+    opcionales en la URL) las relaciones se leen y se aplican en lotes a medida
+    que llegan.
+
+    Con "parallel": true (y "chunk_size" opcional) las relaciones se reparten en
+    lotes por nodo de inicio que se aplican en paralelo, cada uno en su propia
+    transacción (ver parallel.py); los lotes que fallan se reportan en 'errors'.
     """
+    if ndjson.is_ndjson(request):
+        return _stream_bulk_relationships(
+            request,
+            bulk.update_props,
+            cypher.update_relationships_batch_query,
+            "updatedCount",
+            "Proceso completado.",
+            validation.RELATIONSHIP_MERGE_SCHEMA,
+        )
+
     serializer = RelationshipBulkUpdateSerializer(data=request.data)
     if serializer.is_valid():
         rels = serializer.validated_data["relationships"]
-        total_updated = 0
-        errors = []
-
-        with neo4j_conn._driver.session() as session:
-            for rel in rels:
-                # Extraer datos obligatorios
-                label1 = rel.get("label1")
-                label2 = rel.get("label2")
-                node1_id = rel.get("node1_id")
-                node2_id = rel.get("node2_id")
-                rel_type = rel.get("rel_type")
-
-                # Extraer las propiedades adicionales (remover las claves de control)
-                props = {
-                    k: v
-                    for k, v in rel.items()
-                    if k not in ["label1", "label2", "rel_type", "node1_id", "node2_id"]
-                }
 
-                # Construir la consulta dinámicamente (sin usar APOC, para evitar problemas de procedimiento)
-                query = f"""
-                MATCH (a:{label1} {{id: $node1_id}}), (b:{label2} {{id: $node2_id}})
-                MERGE (a)-[r:{rel_type}]->(b)
-                ON CREATE SET r += $props
-                ON MATCH SET r += $props
-                RETURN count(r) AS updatedCount
-                """
-                params = {"node1_id": node1_id, "node2_id": node2_id, "props": props}
-
-                result = session.run(query, params)
-                record = result.single()
-                if record:
-                    count = record["updatedCount"]
-                    if count == 0:
-                        errors.append(
-                            f"No se encontró la relación entre {label1} con id {node1_id} y {label2} con id {node2_id}."
-                        )
-                    else:
-                        total_updated += count
-                else:
-                    errors.append(
-                        f"Error al actualizar la relación entre {label1} con id {node1_id} y {label2} con id {node2_id}."
-                    )
+        failed = None
+        if serializer.validated_data["parallel"]:
+            matched, failed = parallel.run_parallel(
+                bulk.group_relationships(rels, bulk.update_props),
+                cypher.update_relationships_batch_query,
+                serializer.validated_data.get("chunk_size"),
+            )
+            feed.cache.relationships_changed(rels)
+        else:
+            matched, _ = _run_bulk_relationships(
+                rels, bulk.update_props, cypher.update_relationships_batch_query
+            )
+        # MERGE pudo crear tipos de relación nuevos
+        catalog.register(
+            RELATIONSHIP_TYPE, bulk.relationship_types(rels[idx] for idx in matched)
+        )
 
         # Retornar respuesta final: si hay errores, se informan junto con el total actualizado.
-        response_data = {
-            "message": "Proceso completado.",
-            "updatedCount": total_updated,
-        }
-        if errors:
-            response_data["errors"] = errors
-        return Response(response_data)
+        response_data, status = bulk.relationships_response(
+            rels, matched, "updatedCount", "Proceso completado.", failed=failed
+        )
+        return Response(response_data, status=status)
     return Response(serializer.errors, status=400)
 
 
@@ -647,63 +864,52 @@ def remove_bulk_relationships(request):
       ]
     }
 
-    Para cada objeto, se ejecuta la siguiente consulta:
+    Opcionalmente, "mode" puede ser "best_effort" (por defecto: se aplican las relaciones
+    que coinciden) o "all_or_nothing" (si alguna no coincide, no se aplica ningún cambio
+    y se responde 409).
+
+    Los objetos se agrupan por (label1, label2, rel_type) y cada grupo se ejecuta como una
+    sola consulta, todas en una misma transacción de escritura:
 
-    MATCH (a:<label1> {id: $node1_id}), (b:<label2> {id: $node2_id})
+    UNWIND $rows AS row
+    MATCH (a:<label1> {id: row.node1_id}), (b:<label2> {id: row.node2_id})
     MATCH (a)-[r:<rel_type>]->(b)
-    REMOVE r.<prop1>, r.<prop2>, ...
-    RETURN count(r) AS updatedCount
+    SET r += row.props        // {<prop1>: null, <prop2>: null, ...}
+    RETURN row.idx AS idx, count(r) AS count
 
-    Se acumulan errores en caso de que no se encuentren los nodos o la relación.
+    Se acumulan errores en caso de que no se encuentren los nodos o la relación, y se
+    retornan las posiciones en 'matchedIndices' y 'unmatchedIndices'.
     """
+    if ndjson.is_ndjson(request):
+        # Un objeto por línea; mode y batch_size van en la URL
+        return _stream_bulk_relationships(
+            request,
+            bulk.remove_props,
+            cypher.remove_relationships_properties_batch_query,
+            "updatedCount",
+            "Proceso completado.",
+            validation.RELATIONSHIP_REMOVE_SCHEMA,
+        )
+
     serializer = RelationshipBulkRemoveSerializer(data=request.data)
     if serializer.is_valid():
         rels = serializer.validated_data["relationships"]
-        total_updated = 0
-        errors = []
-
-        with neo4j_conn._driver.session() as session:
-            for rel in rels:
-                label1 = rel.get("label1")
-                label2 = rel.get("label2")
-                node1_id = rel.get("node1_id")
-                node2_id = rel.get("node2_id")
-                rel_type = rel.get("rel_type")
-                props_to_remove = rel.get("properties", [])
-
-                # Construir la cláusula REMOVE a partir de la lista de propiedades
-                remove_clause = ", ".join(f"r.{prop}" for prop in props_to_remove)
-
-                query = f"""
-                MATCH (a:{label1} {{id: $node1_id}}), (b:{label2} {{id: $node2_id}})
-                MATCH (a)-[r:{rel_type}]->(b)
-                REMOVE {remove_clause}
-                RETURN count(r) AS updatedCount
-                """
-                params = {"node1_id": node1_id, "node2_id": node2_id}
 
-                result = session.run(query, params)
-                record = result.single()
-                if record:
-                    count = record["updatedCount"]
-                    if count == 0:
-                        errors.append(
-                            f"No se encontró la relación entre {label1} con id {node1_id} y {label2} con id {node2_id}."
-                        )
-                    else:
-                        total_updated += count
-                else:
-                    errors.append(
-                        f"Error al procesar la relación entre {label1} con id {node1_id} y {label2} con id {node2_id}."
-                    )
+        matched, rolled_back = _run_bulk_relationships(
+            rels,
+            bulk.remove_props,
+            cypher.remove_relationships_properties_batch_query,
+            serializer.validated_data["mode"],
+        )
 
-        response_data = {
-            "message": "Proceso completado.",
-            "updatedCount": total_updated,
-        }
-        if errors:
-            response_data["errors"] = errors
-        return Response(response_data)
+        response_data, status = bulk.relationships_response(
+            rels,
+            matched,
+            "updatedCount",
+            "Proceso completado.",
+            rolled_back=rolled_back,
+        )
+        return Response(response_data, status=status)
     return Response(serializer.errors, status=400)
 
 
@@ -720,60 +926,43 @@ def delete_multiple_nodes_with_checks(request):
         "node_ids": ["1", "2", "3"]
     }
 
-    Para cada nodo:
+    Opcionalmente, "batch_size": N divide la eliminación en lotes de N ids, cada uno en
+    su propia transacción (CALL {} IN TRANSACTIONS), para listas muy grandes.
+
+    Todos los ids se procesan en una sola consulta (y una sola transacción, salvo que se
+    indique batch_size). Para cada nodo:
       - Si no se encuentra, se reporta error.
       - Si tiene relaciones, se reporta error indicando que no se puede eliminar.
       - Si no tiene relaciones, se elimina.
 
-    Se retorna la cantidad de nodos eliminados y una lista de errores (si los hay).
+    Se retorna la cantidad de nodos eliminados, los ids en 'deleted', 'notFound' y
+    'hasRelationships', y una lista de errores (si los hay).
     """
     serializer = MultipleNodesDeleteWithChecksSerializer(data=request.data)
     if serializer.is_valid():
         label = serializer.validated_data["label"]
-        node_ids = serializer.validated_data["node_ids"]
-        deleted_count = 0
-        errors = []
+        node_ids = cypher.parse_node_ids(
+            serializer.validated_data["node_ids"], serializer.validated_data["label"]
+        )
+        batch_size = serializer.validated_data.get("batch_size")
 
-        # Convertir los node_ids a enteros, si la propiedad "id" es numérica
-        try:
-            node_ids_int = [int(nid) for nid in node_ids]
-        except ValueError:
-            node_ids_int = node_ids  # Si falla la conversión, se usan como string
-
-        with neo4j_conn._driver.session() as session:
-            for nid in node_ids_int:
-                params = {"node_id": nid}
-                # Verificar si el nodo existe y cuántas relaciones tiene
-                query_check = f"""
-                MATCH (n:{label} {{ id: $node_id }})
-                OPTIONAL MATCH (n)-[r]-()
-                RETURN n, count(r) AS relCount
-                """
-                result = session.run(query_check, params)
-                record = result.single()
-                if record is None or record["n"] is None:
-                    errors.append(f"Nodo con id {nid} no encontrado.")
-                    continue
-                if record["relCount"] > 0:
-                    errors.append(
-                        f"Nodo con id {nid} no puede ser eliminado porque tiene relaciones."
-                    )
-                    continue
-
-                # Si no tiene relaciones, eliminar el nodo
-                query_delete = f"""
-                MATCH (n:{label} {{ id: $node_id }})
-                DELETE n
-                """
-                session.run(query_delete, params)
-                deleted_count += 1
-
-        response_data = {
-            "message": "Proceso de eliminación completado.",
-            "deletedCount": deleted_count,
-        }
-        if errors:
-            response_data["errors"] = errors
+        query = cypher.delete_nodes_with_checks_query(
+            label, in_transactions=batch_size is not None
+        )
+        params = {"node_ids": node_ids, "batch_size": batch_size}
+
+        with neo4j_conn.session() as session:
+            if batch_size is not None:
+                # CALL {} IN TRANSACTIONS solo se permite en transacciones implícitas
+                records = list(session.run(query, params))
+            else:
+                records = session.execute_write(
+                    cypher.run_steps, cypher.fetch_all, query, params
+                )
+
+        response_data = bulk.node_deletion_response(records)
+        if response_data["deletedCount"]:
+            caching.invalidate_labels([label])
         return Response(response_data)
     return Response(serializer.errors, status=400)
 
@@ -803,57 +992,121 @@ def delete_bulk_relationships(request):
       ]
     }
 
-    Para cada objeto se ejecuta la siguiente consulta:
+    Opcionalmente, "mode" puede ser "best_effort" (por defecto) o "all_or_nothing"
+    (si alguna relación no coincide, no se elimina ninguna y se responde 409).
+
+    Los objetos se agrupan por (label1, label2, rel_type) y cada grupo se ejecuta como una
+    sola consulta, todas en una misma transacción de escritura:
 
-    MATCH (a:<label1> {id: $node1_id}), (b:<label2> {id: $node2_id})
+    UNWIND $rows AS row
+    MATCH (a:<label1> {id: row.node1_id}), (b:<label2> {id: row.node2_id})
     MATCH (a)-[r:<rel_type>]->(b)
     DELETE r
-    RETURN count(r) AS deletedCount
+    RETURN row.idx AS idx, count(r) AS count
 
-    Se acumulan errores si no se encuentra la relación o alguno de los nodos.
+    Se acumulan errores si no se encuentra la relación o alguno de los nodos, y se
+    retornan las posiciones en 'matchedIndices' y 'unmatchedIndices'.
     """
+    if ndjson.is_ndjson(request):
+        # Un objeto por línea; mode y batch_size van en la URL
+        return _stream_bulk_relationships(
+            request,
+            None,
+            cypher.delete_relationships_batch_query,
+            "deletedCount",
+            "Proceso de eliminación completado.",
+            validation.RELATIONSHIP_SCHEMA,
+            with_type=True,
+        )
+
     serializer = RelationshipBulkDeleteSerializer(data=request.data)
     if serializer.is_valid():
         rels = serializer.validated_data["relationships"]
-        total_deleted = 0
-        errors = []
-
-        with neo4j_conn._driver.session() as session:
-            for rel in rels:
-                label1 = rel.get("label1")
-                label2 = rel.get("label2")
-                node1_id = rel.get("node1_id")
-                node2_id = rel.get("node2_id")
-                rel_type = rel.get("rel_type")
-
-                query = f"""
-                MATCH (a:{label1} {{id: $node1_id}}), (b:{label2} {{id: $node2_id}})
-                MATCH (a)-[r:{rel_type}]->(b)
-                DELETE r
-                RETURN count(r) AS deletedCount
-                """
-                params = {"node1_id": node1_id, "node2_id": node2_id}
 
-                result = session.run(query, params)
-                record = result.single()
-                if record is not None:
-                    count = record["deletedCount"]
-                    if count == 0:
-                        errors.append(
-                            f"No se encontró la relación {rel_type} entre {label1} con id {node1_id} y {label2} con id {node2_id}."
-                        )
-                    else:
-                        total_deleted += count
-                else:
-                    errors.append(
-                        f"Error al procesar la relación {rel_type} entre {label1} con id {node1_id} y {label2} con id {node2_id}."
-                    )
+        matched, rolled_back = _run_bulk_relationships(
+            rels,
+            None,
+            cypher.delete_relationships_batch_query,
+            serializer.validated_data["mode"],
+        )
 
-        response_data = {
-            "message": "Proceso de eliminación completado.",
-            "deletedCount": total_deleted,
-        }
-        if errors:
-            response_data["errors"] = errors
-        return Response(response_data)
+        response_data, status = bulk.relationships_response(
+            rels,
+            matched,
+            "deletedCount",
+            "Proceso de eliminación completado.",
+            with_type=True,
+            rolled_back=rolled_back,
+        )
+        return Response(response_data, status=status)
     return Response(serializer.errors, status=400)
+
+
+"""
+Trabajos masivos en segundo plano
+"""
+
+
+@api_view(["POST"])
+def submit_bulk_job(request):
+    """
+    Encola un trabajo masivo y retorna su estado (202) sin esperar a que termine.
+
+    JSON de ejemplo:
+    {
+        "operation": "update-bulk-relationships",
+        "payload": { "relationships": [ ... ] },
+        "batch_size": 5000
+    }
+
+    'payload' es el mismo cuerpo que recibe el endpoint indicado en 'operation'
+    (update-bulk-relationships, remove-bulk-relationship, delete-bulk-relationships
+    o delete-multiple-nodes). El progreso se consulta en /api/jobs/<id>/.
+    Sin 'batch_size' se usa el del payload, si lo tiene; 'parallel' y
+    'chunk_size' no se admiten (400).
+    """
+    serializer = BulkJobSubmitSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=400)
+
+    operation = serializer.validated_data["operation"]
+    payload_serializer_class, _ = jobs.OPERATIONS[operation]
+    payload = payload_serializer_class(data=serializer.validated_data["payload"])
+    if not payload.is_valid():
+        return Response({"payload": payload.errors}, status=400)
+    errors = jobs.option_errors(operation, payload.validated_data)
+    if errors:
+        return Response({"payload": errors}, status=400)
+
+    job = jobs.submit(
+        operation, payload.validated_data, serializer.validated_data.get("batch_size")
+    )
+    return Response(BulkJobSerializer(job).data, status=202)
+
+
+@api_view(["GET"])
+def bulk_job_status(request, job_id):
+    """
+    Estado de un trabajo: filas procesadas, elementos afectados, errores hasta el
+    momento, throughput (filas/s) y, cuando termina, la respuesta final en 'result'.
+    """
+    job = BulkJob.objects.filter(pk=job_id).first()
+    if job is None:
+        return Response({"error": "Trabajo no encontrado."}, status=404)
+    return Response(BulkJobSerializer(job).data)
+
+
+@api_view(["POST"])
+def cancel_bulk_job(request, job_id):
+    """
+    Pide la cancelación de un trabajo. Los lotes ya confirmados no se revierten,
+    salvo en mode all_or_nothing, donde no se aplica ningún cambio.
+    """
+    job = BulkJob.objects.filter(pk=job_id).first()
+    if job is None:
+        return Response({"error": "Trabajo no encontrado."}, status=404)
+    if job.status in BulkJob.FINISHED:
+        return Response(
+            {"error": f"El trabajo ya terminó ({job.status})."}, status=409
+        )
+    return Response(BulkJobSerializer(jobs.cancel(job)).data)
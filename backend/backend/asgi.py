@@ -13,4 +13,22 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+
+async def application(scope, receive, send):
+    # Django no maneja eventos "lifespan"; los atendemos aquí para cerrar el
+    # pool del driver asíncrono de Neo4j cuando el servidor se apaga.
+    if scope["type"] == "lifespan":
+        from api.neo4j_connection import async_neo4j_conn
+
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await async_neo4j_conn.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    else:
+        await django_application(scope, receive, send)
@@ -25,6 +25,70 @@ NEO4J_URI = env("NEO4J_URI")
 NEO4J_USER = env("NEO4J_USER")
 NEO4J_PASSWORD = env("NEO4J_PASSWORD")
 
+# Pool de conexiones del driver de Neo4j (uno por proceso/worker)
+NEO4J_MAX_CONNECTION_POOL_SIZE = env.int("NEO4J_MAX_CONNECTION_POOL_SIZE", default=100)
+NEO4J_CONNECTION_ACQUISITION_TIMEOUT = env.float(
+    "NEO4J_CONNECTION_ACQUISITION_TIMEOUT", default=60.0
+)  # segundos
+NEO4J_MAX_CONNECTION_LIFETIME = env.float(
+    "NEO4J_MAX_CONNECTION_LIFETIME", default=3600.0
+)  # segundos
+NEO4J_KEEP_ALIVE = env.bool("NEO4J_KEEP_ALIVE", default=True)
+NEO4J_FETCH_SIZE = env.int("NEO4J_FETCH_SIZE", default=1000)  # registros por lote
+
+# Cantidad de formas de búsqueda (labels + filtros + operadores) cuyo Cypher se guarda en caché
+SEARCH_QUERY_CACHE_SIZE = env.int("SEARCH_QUERY_CACHE_SIZE", default=256)
+
+# Filas por transacción (UNWIND) en la creación masiva de nodos
+BULK_CREATE_CHUNK_SIZE = env.int("BULK_CREATE_CHUNK_SIZE", default=1000)
+
+# Filas por lote en los endpoints masivos con cuerpo NDJSON
+BULK_STREAM_BATCH_SIZE = env.int("BULK_STREAM_BATCH_SIZE", default=1000)
+# Errores que se guardan y retornan por ingesta NDJSON; los demás solo se cuentan
+BULK_STREAM_MAX_ERRORS = env.int("BULK_STREAM_MAX_ERRORS", default=1000)
+
+# update-bulk-relationships con parallel=true (ver api/parallel.py): lotes en curso
+# a la vez, filas por lote, reintentos por deadlock y espera base entre reintentos
+BULK_PARALLEL_WORKERS = env.int("BULK_PARALLEL_WORKERS", default=4)
+BULK_PARALLEL_CHUNK_SIZE = env.int("BULK_PARALLEL_CHUNK_SIZE", default=10000)
+BULK_DEADLOCK_RETRIES = env.int("BULK_DEADLOCK_RETRIES", default=5)
+BULK_RETRY_BACKOFF = env.float("BULK_RETRY_BACKOFF", default=0.1)  # segundos
+
+# Trabajos masivos en segundo plano (ver api/jobs.py): hilos por proceso, filas por
+# lote y cantidad de errores que se muestran mientras el trabajo avanza
+BULK_JOB_WORKERS = env.int("BULK_JOB_WORKERS", default=2)
+BULK_JOB_BATCH_SIZE = env.int("BULK_JOB_BATCH_SIZE", default=1000)
+BULK_JOB_MAX_ERRORS = env.int("BULK_JOB_MAX_ERRORS", default=100)
+
+# Índice de recomendaciones de usuarios (ver api/recommendations.py): segundos entre
+# reconstrucciones, candidatos guardados por usuario y grado máximo de un intermediario
+RECOMMENDATION_INDEX_TTL = env.int("RECOMMENDATION_INDEX_TTL", default=900)
+RECOMMENDATION_INDEX_SIZE = env.int("RECOMMENDATION_INDEX_SIZE", default=50)
+RECOMMENDATION_MAX_DEGREE = env.int("RECOMMENDATION_MAX_DEGREE", default=1000)
+# Construir el índice al iniciar cada worker de gunicorn que no lo heredó del
+# maestro (ver gunicorn.conf.py): una lectura completa del grafo por worker
+RECOMMENDATION_INDEX_WARMUP = env.bool("RECOMMENDATION_INDEX_WARMUP", default=False)
+
+# Feed de inicio (ver api/feed.py): usuarios con la primera página en caché por
+# proceso, elementos guardados por usuario y segundos de vigencia de cada entrada
+FEED_CACHE_SIZE = env.int("FEED_CACHE_SIZE", default=1000)
+FEED_HEAD_SIZE = env.int("FEED_HEAD_SIZE", default=50)
+FEED_CACHE_TTL = env.int("FEED_CACHE_TTL", default=60)
+
+# Catálogo de labels, tipos de relación y propiedades (ver api/catalog.py):
+# segundos entre recargas, y mínimo entre recargas provocadas por un nombre desconocido
+SCHEMA_CATALOG_TTL = env.int("SCHEMA_CATALOG_TTL", default=60)
+SCHEMA_CATALOG_MIN_REFRESH = env.int("SCHEMA_CATALOG_MIN_REFRESH", default=5)
+
+# Tipos de las propiedades (ver api/coercion.py), por ejemplo
+# PROPERTY_TYPES={"Usuario.edad": "Integer", "Usuario.id": "Integer"}
+PROPERTY_TYPES = env.json("PROPERTY_TYPES", default={})
+PROPERTY_TYPES_FROM_DATABASE = env.bool("PROPERTY_TYPES_FROM_DATABASE", default=True)
+PROPERTY_TYPES_TTL = env.int("PROPERTY_TYPES_TTL", default=3600)  # segundos
+
+# Crear restricciones e índices de Neo4j al iniciar (ver `manage.py bootstrap_schema`)
+NEO4J_BOOTSTRAP_SCHEMA = env.bool("NEO4J_BOOTSTRAP_SCHEMA", default=False)
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.1/howto/deployment/checklist/
@@ -90,6 +154,8 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # Los trabajos masivos escriben su progreso desde otros hilos
+        "OPTIONS": {"timeout": 20},
     }
 }
 
@@ -126,6 +192,25 @@ USE_TZ = True
 
 CORS_ALLOW_ALL_ORIGINS = True
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Por defecto en memoria local; CACHE_URL=redis://127.0.0.1:6379/1 para compartirla entre workers
+
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
+
+# Segundos que se guardan los resultados de get_aggregated_data
+AGGREGATE_CACHE_TTL = env.int("AGGREGATE_CACHE_TTL", default=30)
+
+# Django REST Framework
+# Las respuestas se codifican con orjson cuando está instalado (ver api/renderers.py)
+
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "api.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+}
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.1/howto/static-files/
 
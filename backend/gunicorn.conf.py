@@ -0,0 +1,83 @@
+"""
+Configuración de gunicorn para el backend.
+
+Uso:
+    gunicorn backend.wsgi -c gunicorn.conf.py
+
+El driver de Neo4j se crea de forma perezosa dentro de cada proceso y se
+vuelve a crear después del fork (ver api/neo4j_connection.py). Con preload_app
+(GUNICORN_PRELOAD_APP=true, por defecto) Django se carga en el proceso maestro,
+que carga los tipos de las propiedades y construye el índice de
+recomendaciones una sola vez antes de crear los workers (ver when_ready): los
+workers los heredan en lugar de consultar cada uno la base. Las recargas de
+cada PROPERTY_TYPES_TTL y RECOMMENDATION_INDEX_TTL sí las hace cada worker por
+su cuenta.
+"""
+
+import multiprocessing
+import os
+import time
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+preload_app = os.environ.get("GUNICORN_PRELOAD_APP", "true").lower() == "true"
+
+
+def when_ready(server):
+    # En el maestro, antes de crear los workers: cargar los tipos y construir el
+    # índice aquí y cerrar el driver, para que los workers no hereden sus sockets
+    if not server.cfg.preload_app:
+        return
+    from api.coercion import registry
+    from api.neo4j_connection import neo4j_conn
+    from api.recommendations import index
+
+    registry.refresh()  # registra los errores y deja los tipos configurados
+    started = time.monotonic()
+    try:
+        index.refresh()
+    except Exception:
+        server.log.exception("No se pudo construir el índice de recomendaciones")
+    else:
+        elapsed = time.monotonic() - started
+        server.log.info("Índice de recomendaciones construido en %.1f s", elapsed)
+    finally:
+        neo4j_conn.close()
+
+
+def post_worker_init(worker):
+    # Los trabajos masivos de workers que ya terminaron no se van a completar
+    from django.db import DatabaseError
+
+    from api import jobs
+
+    try:
+        jobs.fail_orphaned()
+    except DatabaseError:
+        worker.log.warning("Sin tabla de trabajos masivos: falta migrate")
+
+    # Sin preload_app, cargar los tipos de las propiedades en segundo plano al
+    # iniciar el worker, en lugar de en la primera petición
+    from api.coercion import registry
+
+    if not registry.is_loaded():
+        registry.start_refresh()
+
+    # Sin preload_app (o si falló en el maestro), construir el índice de
+    # recomendaciones en segundo plano al iniciar el worker, para que ninguna
+    # petición tenga que esperarlo. Cada worker lee todo el grafo, por lo que es
+    # opcional (RECOMMENDATION_INDEX_WARMUP)
+    from django.conf import settings
+
+    from api.recommendations import index
+
+    if settings.RECOMMENDATION_INDEX_WARMUP and not index.is_built():
+        index.start_refresh()
+
+
+def worker_exit(server, worker):
+    # Cerrar el pool de conexiones del worker al apagarse
+    from api.neo4j_connection import neo4j_conn
+
+    neo4j_conn.close()
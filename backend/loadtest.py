@@ -0,0 +1,114 @@
+"""
+Prueba de carga para comparar los endpoints síncronos (WSGI) y asíncronos (ASGI).
+
+Primero se levanta el servidor en el modo a medir, por ejemplo:
+
+    gunicorn backend.wsgi -c gunicorn.conf.py                 # modo WSGI
+    uvicorn backend.asgi:application --workers 4 --port 8001  # modo ASGI
+
+y luego se ejecuta:
+
+    python loadtest.py --url http://127.0.0.1:8000/api/search-nodes/
+    python loadtest.py --url http://127.0.0.1:8001/api/async/search-nodes/
+
+o ambos en una sola corrida para ver la comparación lado a lado:
+
+    python loadtest.py \
+        --url http://127.0.0.1:8000/api/search-nodes/ \
+        --url http://127.0.0.1:8001/api/async/search-nodes/
+
+Se reporta el throughput (peticiones/s) y la latencia p50/p95/p99 de cada URL.
+"""
+
+import argparse
+import json
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_PAYLOAD = {
+    "labels": ["Usuario"],
+    "filters": {"fecha_registro": {"operator": ">=", "value": "2022-01-01"}},
+    "limit": 50,
+}
+
+
+def send_request(url, method, body):
+    request = urllib.request.Request(
+        url, data=body, method=method, headers={"Content-Type": "application/json"}
+    )
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request) as response:
+            response.read()
+            ok = response.status < 400
+    except (urllib.error.URLError, ConnectionError):
+        ok = False
+    return time.perf_counter() - start, ok
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def run(url, method, body, requests, concurrency):
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        # Calentamiento para que el pool de conexiones del servidor esté abierto
+        list(pool.map(lambda _: send_request(url, method, body), range(concurrency)))
+
+        start = time.perf_counter()
+        results = list(
+            pool.map(lambda _: send_request(url, method, body), range(requests))
+        )
+        elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _ in results)
+    failures = sum(1 for _, ok in results if not ok)
+    return {
+        "url": url,
+        "requests": requests,
+        "concurrency": concurrency,
+        "failures": failures,
+        "throughput": requests / elapsed if elapsed else 0.0,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", action="append", required=True)
+    parser.add_argument("--method", default="POST")
+    parser.add_argument(
+        "--payload", help="Archivo JSON con el cuerpo de la petición (opcional)"
+    )
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+
+    payload = DEFAULT_PAYLOAD
+    if args.payload:
+        with open(args.payload, encoding="utf-8") as f:
+            payload = json.load(f)
+    body = json.dumps(payload).encode("utf-8")
+
+    print(
+        f"{'URL':<55} {'req/s':>9} {'media':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'fallos':>7}"
+    )
+    for url in args.url:
+        r = run(url, args.method, body, args.requests, args.concurrency)
+        print(
+            f"{r['url']:<55} {r['throughput']:>9.1f} {r['mean_ms']:>7.1f}ms "
+            f"{r['p50_ms']:>7.1f}ms {r['p95_ms']:>7.1f}ms {r['p99_ms']:>7.1f}ms {r['failures']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
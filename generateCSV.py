@@ -1,568 +1,999 @@
-import pandas as pd
+"""
+Genera los CSV de docs/ con los nodos y relaciones de la red social.
+
+    python generateCSV.py                # volúmenes de siempre (1500 usuarios)
+    python generateCSV.py --scale 1000   # 1.5M usuarios, ~33M filas en total
+
+Las cantidades de NODE_COUNTS y RELATIONSHIP_COUNTS se multiplican por --scale.
+Los ids, fechas, contadores, booleanos y extremos de las relaciones se generan
+con NumPy, y los textos de Faker (nombres, emails, oraciones, empresas) y las
+listas (intereses, hashtags, reacciones) se generan una sola vez, en pools de
+POOL_SIZE valores de los que cada fila toma uno al azar.
+
+Cada archivo se divide en shards de a lo sumo --chunk-size filas que generan
+--workers procesos en paralelo; cada proceso tiene en memoria un solo shard a
+la vez, por lo que la memoria no crece con la escala. Cada shard usa su propio
+generador aleatorio con semilla 42 + número de shard (y los pools, semilla 42),
+así que los archivos son los mismos con cualquier cantidad de procesos. Los
+shards se escriben como docs/<archivo>/part-NNNNNN.csv y al final se concatenan
+en docs/<archivo>.csv, salvo con --keep-shards.
+
+En una red social real unos pocos usuarios concentran la mayoría de los
+seguidores y unas pocas publicaciones la mayoría de los likes. Con
+--distribution zipf (por defecto) o preferential, los extremos de follows,
+likes, commented_on, watched y member_of se eligen según tablas alias con pesos
+de cola pesada (Popularity) en lugar de uniformemente, y los seguidores de cada
+influencer también tienen cola pesada. --distribution uniform mantiene el
+comportamiento anterior.
+
+Con --format parquet (requiere pyarrow) los archivos son docs/<archivo>.parquet,
+con las listas como listas de strings y las fechas como date32 en lugar de
+texto, en grupos de --row-group-size filas. load_graph lee los dos formatos.
+"""
+
+import argparse
+import os
 import random
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
 from faker import Faker
-import os
 
-# Inicializar Faker para generar datos aleatorios
-fake = Faker()
-Faker.seed(42)
-random.seed(42)
-
-# Crear carpeta de salida si no existe
-output_dir = "./docs"
-os.makedirs(output_dir, exist_ok=True)
-
-# Definir la cantidad de nodos
-users_count = 1500
-posts_count = 1200
-comments_count = 1000
-groups_count = 600
-reels_count = 700
-influencers_no_verified_count = 100
-influencers_verified_count = 100
-
-# Generar Usuarios (User)
-users = []
-for i in range(users_count):
-    users.append(
-        {
-            "id": i + 1,
-            "nombre": fake.name(),
-            "email": fake.email(),
-            "fecha_registro": fake.date_between(start_date="-5y", end_date="today"),
-            "intereses": ";".join(
-                random.sample(
-                    [
-                        "fútbol",
-                        "programación",
-                        "cine",
-                        "música",
-                        "viajes",
-                        "lectura",
-                        "fotografía",
-                        "baloncesto",
-                        "videojuegos",
-                        "historia",
-                        "cocina",
-                        "anime",
-                        "automovilismo",
-                        "ciencia ficción",
-                        "arte digital",
-                        "senderismo",
-                        "astronomía",
-                        "idiomas",
-                        "tecnología",
-                        "eSports",
-                        "diseño gráfico",
-                        "guitarra",
-                        "baile",
-                        "escalada",
-                        "psicología",
-                        "moda",
-                    ],
-                    k=random.randint(1, 4),
-                )
-            ),
-        }
-    )
-df_users = pd.DataFrame(users)
-df_users.to_csv(f"{output_dir}/users.csv", index=False)
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # dependencia opcional, solo para --format parquet
+    pa = None
+
+SEED = 42
+
+# Valores distintos de cada pool de textos de Faker y de listas
+POOL_SIZE = 10000
+
+# Cantidades con --scale 1
+NODE_COUNTS = {
+    "users": 1500,
+    "posts": 1200,
+    "comments": 1000,
+    "groups": 600,
+    "reels": 700,
+    "influencers_no": 100,
+    "influencers_verified": 100,
+}
 
+RELATIONSHIP_COUNTS = {
+    "friends": 2000,
+    "follows": 2500,
+    "mentions": 1500,
+    "likes_post": 3000,
+    "likes_comment": 2500,
+    "likes_reel": 2500,
+    "commented_on_post": 2000,
+    "commented_on_reel": 1500,
+    "member_of": 2000,
+    "watched": 2500,
+}
 
-# Generar Publicaciones (Post)
-posts = []
-for i in range(posts_count):
-    posts.append(
-        {
-            "id": i + 1,
-            "contenido": fake.sentence(nb_words=10),
-            "fecha_publicacion": fake.date_between(start_date="-5y", end_date="today"),
-            "likes": random.randint(0, 1000),
-            "privado": random.choice([True, False]),
-            "usuario_id": random.randint(1, users_count),
-        }
-    )
-df_posts = pd.DataFrame(posts)
-df_posts.to_csv(f"{output_dir}/posts.csv", index=False)
+# Seguidores de cada influencer con --distribution uniform (no depende de la
+# escala); con las otras distribuciones el mínimo es el primer valor y no hay
+# máximo más allá de INFLUENCER_MAX_FOLLOWERS
+INFLUENCER_FOLLOWERS = (5, 15)
+
+# Fracción de los usuarios que puede seguir a un mismo influencer
+INFLUENCER_MAX_FOLLOWERS = 0.1
+
+UNIFORM = "uniform"
+ZIPF = "zipf"
+PREFERENTIAL = "preferential"
+DISTRIBUTIONS = [UNIFORM, ZIPF, PREFERENTIAL]
+
+# Exponente de la distribución de grados del modelo de Barabási-Albert
+# (preferential attachment): P(k) ~ k^-3
+PREFERENTIAL_EXPONENT = 3.0
+
+# Tablas de popularidad: {tabla: (nodos, factor del exponente)}. Los usuarios
+# tienen dos, porque los que más siguen, dan like o ven reels no son los más
+# seguidos. La actividad es menos desigual que la popularidad (factor 0.5): con
+# los dos extremos igual de concentrados, los pares entre los usuarios más
+# activos y los nodos más populares se repetirían en una de cada cinco filas.
+POPULARITY_TABLES = {
+    "active_users": ("users", 0.5),
+    "popular_users": ("users", 1.0),
+    "posts": ("posts", 1.0),
+    "comments": ("comments", 1.0),
+    "reels": ("reels", 1.0),
+    "groups": ("groups", 1.0),
+}
 
-# Generar Comentarios (Comment)
-comments = []
-for i in range(comments_count):
-    comments.append(
-        {
-            "id": i + 1,
-            "contenido": fake.sentence(nb_words=15),
-            "fecha_comentario": fake.date_between(start_date="-5y", end_date="today"),
-            "likes": random.randint(0, 500),
-            "reacciones": ";".join(
-                random.sample(
-                    [
-                        "👍",
-                        "❤️",
-                        "😂",
-                        "😢",
-                        "😡",
-                        "🔥",
-                        "😍",
-                        "🤯",
-                        "👏",
-                        "🎉",
-                        "💯",
-                        "😎",
-                        "🙌",
-                        "🤔",
-                    ],
-                    k=random.randint(1, 3),
-                )
-            ),
-            "usuario_id": random.randint(1, users_count),
-            "post_id": random.randint(1, posts_count),
-        }
+INTERESES = [
+    "fútbol",
+    "programación",
+    "cine",
+    "música",
+    "viajes",
+    "lectura",
+    "fotografía",
+    "baloncesto",
+    "videojuegos",
+    "historia",
+    "cocina",
+    "anime",
+    "automovilismo",
+    "ciencia ficción",
+    "arte digital",
+    "senderismo",
+    "astronomía",
+    "idiomas",
+    "tecnología",
+    "eSports",
+    "diseño gráfico",
+    "guitarra",
+    "baile",
+    "escalada",
+    "psicología",
+    "moda",
+]
+
+REACCIONES = [
+    "👍",
+    "❤️",
+    "😂",
+    "😢",
+    "😡",
+    "🔥",
+    "😍",
+    "🤯",
+    "👏",
+    "🎉",
+    "💯",
+    "😎",
+    "🙌",
+    "🤔",
+]
+
+HASHTAGS = [
+    "#divertido",
+    "#música",
+    "#viral",
+    "#fitness",
+    "#comedia",
+    "#tecnología",
+    "#viajes",
+    "#gaming",
+    "#arte",
+    "#programación",
+    "#cine",
+    "#libros",
+    "#deportes",
+    "#innovación",
+    "#desarrollo",
+    "#salud",
+    "#aprendizaje",
+    "#fotografía",
+    "#naturaleza",
+    "#aventura",
+    "#motivation",
+]
+
+TIPOS_LIKE = ["👍", "❤️", "😂", "😢", "😡", "🔥"]
+TIPOS_COMENTARIO = ["Texto", "Sticker", "Emoji"]
+TIPOS_AMISTAD = ["Cercana", "Compañero de trabajo", "Conocido", "Mejor amigo"]
+FRECUENCIAS = ["Diaria", "Semanal", "Mensual", "Ocasional"]
+CATEGORIAS = ["Noticias", "Opinión", "Entretenimiento", "Deportes"]
+ROLES = ["Miembro", "Moderador", "Administrador"]
+VISIBILIDADES = ["Público", "Privado"]
+UBICACIONES = ["Guatemala", "México", "EE.UU", "España"]
+
+# Fechas entre hace 5 años y hoy, como fake.date_between("-5y", "today")
+TODAY = np.datetime64("today", "D")
+FIRST_DAY = TODAY - 5 * 365
+
+
+def list_pool(rnd, values, k_min, k_max, size):
+    # 'size' listas de k_min a k_max valores distintos, unidas con ';'
+    return np.array(
+        [
+            ";".join(rnd.sample(values, k=rnd.randint(k_min, k_max)))
+            for _ in range(size)
+        ],
+        dtype=object,
     )
-df_comments = pd.DataFrame(comments)
-df_comments.to_csv(f"{output_dir}/comments.csv", index=False)
 
-# Generar Grupos (Group)
-groups = []
-for i in range(groups_count):
-    groups.append(
-        {
-            "id": i + 1,
-            "nombre": fake.company(),
-            "descripcion": fake.sentence(nb_words=12),
-            "privado": random.choice([True, False]),
-            "miembros": random.randint(10, 1000),
+
+class AliasTable:
+    """
+    Muestreo de los índices 0..n-1 con probabilidad proporcional a 'weights',
+    por el método alias (Vose): la tabla se arma una vez en O(n) y cada muestra
+    cuesta un entero y un uniforme, por lo que sample() se vectoriza con NumPy
+    sin recorrer la distribución acumulada.
+    """
+
+    def __init__(self, weights):
+        n = len(weights)
+        prob = (weights * (n / weights.sum())).tolist()
+        alias = list(range(n))
+        small = [i for i, p in enumerate(prob) if p < 1.0]
+        large = [i for i, p in enumerate(prob) if p >= 1.0]
+        while small and large:
+            less, more = small.pop(), large[-1]
+            alias[less] = more
+            prob[more] -= 1.0 - prob[less]
+            if prob[more] < 1.0:
+                small.append(large.pop())
+        # Lo que queda es 1.0 salvo por errores de redondeo
+        for i in small + large:
+            prob[i] = 1.0
+        self.prob = np.array(prob)
+        self.alias = np.array(alias)
+
+    def sample(self, rng, n):
+        i = rng.integers(0, len(self.prob), n)
+        return np.where(rng.random(n) < self.prob[i], i, self.alias[i])
+
+
+def popularity_weights(rng, count, distribution, exponent):
+    """
+    Pesos de count nodos. Con zipf el peso del nodo de rango r es r^-exponent;
+    con preferential los pesos siguen una Pareto de índice 2, con la que los
+    grados esperados quedan como en preferential attachment (P(k) ~ k^-3). Los
+    rangos se asignan a ids al azar, para que los nodos más populares no sean
+    siempre los de id más bajo.
+    """
+    if distribution == ZIPF:
+        ranks = rng.permutation(count) + 1
+        return ranks.astype(float) ** -exponent
+    return 1.0 + rng.pareto(PREFERENTIAL_EXPONENT - 1.0, count)
+
+
+class Popularity:
+    """
+    Elige los extremos de las relaciones: ids uniformes entre 1 y count o,
+    con zipf/preferential, según las tablas alias de POPULARITY_TABLES.
+    """
+
+    def __init__(self, counts, distribution, exponent, seed):
+        self.distribution = distribution
+        self.exponent = exponent
+        self.tables = {}
+        if distribution == UNIFORM:
+            return
+        rng = np.random.default_rng(seed)
+        for table, (nodes, factor) in POPULARITY_TABLES.items():
+            weights = popularity_weights(rng, counts[nodes], distribution, exponent)
+            self.tables[table] = AliasTable(weights**factor)
+
+    def ids(self, rng, table, count, n):
+        if table not in self.tables:
+            return random_ids(rng, count, n)
+        return self.tables[table].sample(rng, n) + 1
+
+    def pairs(self, rng, source, target, count, n):
+        if not self.tables:
+            return random_pairs(rng, count, n)
+        # (a, b) con a != b: si coinciden, b pasa al id siguiente
+        a = self.ids(rng, source, count, n)
+        b = self.ids(rng, target, count, n)
+        return a, np.where(a == b, b % count + 1, b)
+
+    def follower_counts(self, rng, n, users):
+        """Seguidores de n influencers, con cola pesada salvo en uniform."""
+        low, high = INFLUENCER_FOLLOWERS
+        if self.distribution == UNIFORM:
+            return rng.integers(low, high + 1, n)
+        if self.distribution == ZIPF:
+            counts = low * rng.zipf(1.0 + self.exponent, n)
+        else:
+            tail = rng.pareto(PREFERENTIAL_EXPONENT - 1.0, n)
+            counts = np.floor(low * (1.0 + tail)).astype(int)
+        return np.minimum(counts, max(high, int(users * INFLUENCER_MAX_FOLLOWERS)))
+
+
+class Pools:
+    """
+    Textos de Faker y listas pregenerados, de los que se toman las filas, y las
+    tablas de popularidad de los extremos de las relaciones.
+    """
+
+    def __init__(self, seed, size, popularity):
+        self.popularity = popularity
+        fake = Faker()
+        fake.seed_instance(seed)
+        rnd = random.Random(seed)
+        self.names = np.array([fake.name() for _ in range(size)], dtype=object)
+        self.emails = np.array([fake.email() for _ in range(size)], dtype=object)
+        self.companies = np.array([fake.company() for _ in range(size)], dtype=object)
+        self.sentences = {
+            nb_words: np.array(
+                [fake.sentence(nb_words=nb_words) for _ in range(size)], dtype=object
+            )
+            for nb_words in (10, 12, 15)
         }
-    )
-df_groups = pd.DataFrame(groups)
-df_groups.to_csv(f"{output_dir}/groups.csv", index=False)
+        self.intereses = list_pool(rnd, INTERESES, 1, 4, size)
+        self.reacciones = list_pool(rnd, REACCIONES, 1, 3, size)
+        self.hashtags = list_pool(rnd, HASHTAGS, 1, 4, size)
+        self.tipos_comentario = list_pool(rnd, TIPOS_COMENTARIO, 1, 3, size)
 
-# Generar Reels (Reel)
-reels = []
-for i in range(reels_count):
-    reels.append(
-        {
-            "id": i + 1,
-            "duracion": round(random.uniform(5.0, 120.0), 2),
-            "fecha_publicacion": fake.date_between(start_date="-5y", end_date="today"),
-            "likes": random.randint(0, 5000),
-            "hashtags": ";".join(
-                random.sample(
-                    [
-                        "#divertido",
-                        "#música",
-                        "#viral",
-                        "#fitness",
-                        "#comedia",
-                        "#tecnología",
-                        "#viajes",
-                        "#gaming",
-                        "#arte",
-                        "#programación",
-                        "#cine",
-                        "#libros",
-                        "#deportes",
-                        "#innovación",
-                        "#desarrollo",
-                        "#salud",
-                        "#aprendizaje",
-                        "#fotografía",
-                        "#naturaleza",
-                        "#aventura",
-                        "#motivation",
-                    ],
-                    k=random.randint(1, 4),
-                )
-            ),
-            "usuario_id": random.randint(1, users_count),
+
+def pick(rng, values, n):
+    return np.asarray(values, dtype=object)[rng.integers(0, len(values), n)]
+
+
+def random_dates(rng, n):
+    return FIRST_DAY + rng.integers(0, (TODAY - FIRST_DAY).astype(int) + 1, n)
+
+
+def random_bools(rng, n):
+    return rng.random(n) < 0.5
+
+
+def random_ids(rng, count, n):
+    # n ids entre 1 y count
+    return rng.integers(1, count + 1, n)
+
+
+def random_pairs(rng, count, n):
+    # n pares (a, b) de ids entre 1 y count con a != b
+    a = random_ids(rng, count, n)
+    b = rng.integers(1, count, n)
+    return a, b + (b >= a)
+
+
+"""
+Generadores por bloque: reciben el generador aleatorio, los pools, las
+cantidades y 'rows' (las posiciones 0..total-1 del bloque), y retornan
+{archivo sin extensión: DataFrame} con las filas del bloque de cada archivo.
+"""
+
+
+def users_chunk(name, offset):
+    def generate(rng, pools, counts, rows):
+        n = len(rows)
+        return {
+            name: pd.DataFrame(
+                {
+                    "id": rows + 1 + offset(counts),
+                    "nombre": pick(rng, pools.names, n),
+                    "email": pick(rng, pools.emails, n),
+                    "fecha_registro": random_dates(rng, n),
+                    "intereses": pick(rng, pools.intereses, n),
+                }
+            )
         }
-    )
-df_reels = pd.DataFrame(reels)
-df_reels.to_csv(f"{output_dir}/reels.csv", index=False)
-
-# Generar Relaciones (CSV)
-relationships = {
-    "friends": [],
-    "follows": [],
-    "likes": [],
-    "commented_on": [],
-    "belongs_to": [],
-    "member_of": [],
-    "created": [],
-    "watched": [],
-    "mentions": [],
-    "posted": [],
-}
 
-# Generar Relaciones de Amistad (FRIENDS_WITH)
-for _ in range(2000):
-    u1, u2 = random.sample(range(1, users_count + 1), 2)
-    relationships["friends"].append(
+    return generate
+
+
+def posts_chunk(rng, pools, counts, rows):
+    # Cada publicación genera también su POSTED y su BELONGS_TO
+    n = len(rows)
+    ids = rows + 1
+    usuario = random_ids(rng, counts["users"], n)
+    fecha = random_dates(rng, n)
+    privado = random_bools(rng, n)
+    posts = pd.DataFrame(
         {
-            "usuario1_id": u1,
-            "usuario2_id": u2,
-            "desde": fake.date_between(start_date="-5y", end_date="today"),
-            "nivel_confianza": random.randint(1, 10),
-            "tipo_amistad": random.choice(
-                ["Cercana", "Compañero de trabajo", "Conocido", "Mejor amigo"]
-            ),
+            "id": ids,
+            "contenido": pick(rng, pools.sentences[10], n),
+            "fecha_publicacion": fecha,
+            "likes": rng.integers(0, 1001, n),
+            "privado": privado,
+            "usuario_id": usuario,
         }
     )
-
-# Generar Relaciones de Seguimiento (FOLLOWS)
-for _ in range(2500):
-    u1, u2 = random.sample(range(1, users_count + 1), 2)
-    relationships["follows"].append(
+    posted = pd.DataFrame(
         {
-            "usuario_id": u1,
-            "seguido_id": u2,
-            "desde": fake.date_between(start_date="-5y", end_date="today"),
-            "interaccion_frecuencia": random.choice(
-                ["Diaria", "Semanal", "Mensual", "Ocasional"]
-            ),
-            "razón": "Interés en su contenido",
+            "usuario_id": usuario,
+            "post_id": ids,
+            "fecha_posteo": fecha,
+            "visibilidad": pick(rng, VISIBILIDADES, n),
+            "ubicacion": pick(rng, UBICACIONES, n),
         }
     )
-
-
-# Generar Relaciones de Menciones (MENTIONS)
-for _ in range(1500):
-    u1, u2 = random.sample(range(1, users_count + 1), 2)
-    relationships["mentions"].append(
+    belongs_to = pd.DataFrame(
         {
-            "usuario_id": u1,
-            "mencionado_id": u2,
-            "fecha_mencion": fake.date_between(start_date="-5y", end_date="today"),
-            "tipo_mencion": "Texto",
-            "notificado": random.choice([True, False]),
+            "contenido_id": ids,
+            "usuario_id": usuario,
+            "tipo_contenido": "Post",
+            "fecha_creacion": fecha,
+            "privado": privado,
+            "categoria": pick(rng, CATEGORIAS, n),
         }
     )
+    return {"posts": posts, "posted": posted, "belongs_to": belongs_to}
+
 
-# Generar Likes en Publicaciones
-for _ in range(3000):
-    u, p = random.randint(1, users_count), random.randint(1, posts_count)
-    relationships["likes"].append(
+def comments_chunk(rng, pools, counts, rows):
+    # Cada comentario genera también su BELONGS_TO
+    n = len(rows)
+    ids = rows + 1
+    usuario = random_ids(rng, counts["users"], n)
+    fecha = random_dates(rng, n)
+    comments = pd.DataFrame(
         {
-            "usuario_id": u,
-            "contenido_id": p,
-            "tipo_contenido": "Post",
-            "fecha_like": fake.date_between(start_date="-5y", end_date="today"),
-            "tipo": random.choice(["👍", "❤️", "😂", "😢", "😡", "🔥"]),
-            "desde_movil": random.choice([True, False]),
+            "id": ids,
+            "contenido": pick(rng, pools.sentences[15], n),
+            "fecha_comentario": fecha,
+            "likes": rng.integers(0, 501, n),
+            "reacciones": pick(rng, pools.reacciones, n),
+            "usuario_id": usuario,
+            "post_id": random_ids(rng, counts["posts"], n),
         }
     )
-
-# Generar Likes en Comentarios
-for _ in range(2500):
-    u, c = random.randint(1, users_count), random.randint(1, comments_count)
-    relationships["likes"].append(
+    belongs_to = pd.DataFrame(
         {
-            "usuario_id": u,
-            "contenido_id": c,
+            "contenido_id": ids,
+            "usuario_id": usuario,
             "tipo_contenido": "Comment",
-            "fecha_like": fake.date_between(start_date="-5y", end_date="today"),
-            "tipo": random.choice(["👍", "❤️", "😂", "😢", "😡", "🔥"]),
-            "desde_movil": random.choice([True, False]),
+            "fecha_creacion": fecha,
+            "privado": False,
+            "categoria": pick(rng, CATEGORIAS, n),
         }
     )
+    return {"comments": comments, "belongs_to": belongs_to}
+
 
-# Generar Likes en Reels
-for _ in range(2500):
-    u, r = random.randint(1, users_count), random.randint(1, reels_count)
-    relationships["likes"].append(
+def groups_chunk(rng, pools, counts, rows):
+    n = len(rows)
+    groups = pd.DataFrame(
         {
-            "usuario_id": u,
-            "contenido_id": r,
-            "tipo_contenido": "Reel",
-            "fecha_like": fake.date_between(start_date="-5y", end_date="today"),
-            "tipo": random.choice(["👍", "❤️", "😂", "😢", "😡", "🔥"]),
-            "desde_movil": random.choice([True, False]),
+            "id": rows + 1,
+            "nombre": pick(rng, pools.companies, n),
+            "descripcion": pick(rng, pools.sentences[12], n),
+            "privado": random_bools(rng, n),
+            "miembros": rng.integers(10, 1001, n),
         }
     )
+    return {"groups": groups}
 
 
-# Generar Comentarios en Publicaciones
-for _ in range(2000):
-    u, p = random.randint(1, users_count), random.randint(1, posts_count)
-    relationships["commented_on"].append(
+def reels_chunk(rng, pools, counts, rows):
+    # Cada reel genera también su CREATED
+    n = len(rows)
+    ids = rows + 1
+    usuario = random_ids(rng, counts["users"], n)
+    fecha = random_dates(rng, n)
+    reels = pd.DataFrame(
         {
-            "usuario_id": u,
-            "contenido_id": p,
-            "tipo_contenido": "Post",
-            "fecha_comentario": fake.date_between(start_date="-5y", end_date="today"),
-            "tipo": random.sample(
-                ["Texto", "Sticker", "Emoji"], k=random.randint(1, 3)
-            ),
-            "editado": random.choice([True, False]),
+            "id": ids,
+            "duracion": np.round(rng.uniform(5.0, 120.0, n), 2),
+            "fecha_publicacion": fecha,
+            "likes": rng.integers(0, 5001, n),
+            "hashtags": pick(rng, pools.hashtags, n),
+            "usuario_id": usuario,
         }
     )
-
-# Generar Comentarios en Reels
-for _ in range(1500):
-    u, r = random.randint(1, users_count), random.randint(1, reels_count)
-    relationships["commented_on"].append(
+    created = pd.DataFrame(
         {
-            "usuario_id": u,
-            "contenido_id": r,
-            "tipo_contenido": "Reel",
-            "fecha_comentario": fake.date_between(start_date="-5y", end_date="today"),
-            "tipo": random.sample(
-                ["Texto", "Sticker", "Emoji"], k=random.randint(1, 3)
-            ),
-            "editado": random.choice([True, False]),
+            "usuario_id": usuario,
+            "reel_id": ids,
+            "fecha_creacion": fecha,
+            "visibilidad": pick(rng, VISIBILIDADES, n),
+            "ubicacion": pick(rng, UBICACIONES, n),
         }
     )
+    return {"reels": reels, "created": created}
 
 
-# Generar Relaciones de Pertenencia a Publicaciones
-for post in posts:
-    relationships["belongs_to"].append(
+def friends_chunk(rng, pools, counts, rows):
+    n = len(rows)
+    u1, u2 = random_pairs(rng, counts["users"], n)
+    friends = pd.DataFrame(
         {
-            "contenido_id": post["id"],
-            "usuario_id": post["usuario_id"],
-            "tipo_contenido": "Post",
-            "fecha_creacion": post["fecha_publicacion"],
-            "privado": post["privado"],
-            "categoria": random.choice(
-                ["Noticias", "Opinión", "Entretenimiento", "Deportes"]
-            ),
+            "usuario1_id": u1,
+            "usuario2_id": u2,
+            "desde": random_dates(rng, n),
+            "nivel_confianza": rng.integers(1, 11, n),
+            "tipo_amistad": pick(rng, TIPOS_AMISTAD, n),
         }
     )
+    return {"friends": friends}
+
 
-# Generar Relaciones de Pertenencia a Comentarios
-for comment in comments:
-    relationships["belongs_to"].append(
+def follows_chunk(rng, pools, counts, rows):
+    n = len(rows)
+    u1, u2 = pools.popularity.pairs(
+        rng, "active_users", "popular_users", counts["users"], n
+    )
+    follows = pd.DataFrame(
         {
-            "contenido_id": comment["id"],
-            "usuario_id": comment["usuario_id"],
-            "tipo_contenido": "Comment",
-            "fecha_creacion": comment["fecha_comentario"],
-            "privado": False,
-            "categoria": random.choice(
-                ["Noticias", "Opinión", "Entretenimiento", "Deportes"]
-            ),
+            "usuario_id": u1,
+            "seguido_id": u2,
+            "desde": random_dates(rng, n),
+            "interaccion_frecuencia": pick(rng, FRECUENCIAS, n),
+            "razón": "Interés en su contenido",
         }
     )
+    return {"follows": follows}
 
-# Generar Relaciones de Membresía en Grupos (MEMBER_OF) asegurando que cada grupo tenga al menos un usuario
-usuarios_disponibles = list(range(1, users_count + 1))
-grupos_disponibles = list(range(1, groups_count + 1))
 
-# Asignar al menos un usuario a cada grupo
-for g in grupos_disponibles:
-    u = random.choice(usuarios_disponibles)  # Seleccionar un usuario aleatorio
-    relationships["member_of"].append(
+def mentions_chunk(rng, pools, counts, rows):
+    n = len(rows)
+    u1, u2 = random_pairs(rng, counts["users"], n)
+    mentions = pd.DataFrame(
         {
-            "usuario_id": u,
-            "grupo_id": g,
-            "desde": fake.date_between(start_date="-5y", end_date="today"),
-            "rol": random.choice(["Miembro", "Moderador", "Administrador"]),
-            "activo": random.choice([True, False]),
+            "usuario_id": u1,
+            "mencionado_id": u2,
+            "fecha_mencion": random_dates(rng, n),
+            "tipo_mencion": "Texto",
+            "notificado": random_bools(rng, n),
         }
     )
+    return {"mentions": mentions}
 
-# Generar relaciones adicionales hasta llegar a 2000
-relaciones_faltantes = 2000 - len(relationships["member_of"])
-for _ in range(relaciones_faltantes):
-    u = random.choice(usuarios_disponibles)
-    g = random.choice(grupos_disponibles)
-    relationships["member_of"].append(
-        {
-            "usuario_id": u,
-            "grupo_id": g,
-            "desde": fake.date_between(start_date="-5y", end_date="today"),
-            "rol": random.choice(["Miembro", "Moderador", "Administrador"]),
-            "activo": random.choice([True, False]),
-        }
-    )
 
+def likes_chunk(kind, targets):
+    def generate(rng, pools, counts, rows):
+        n = len(rows)
+        popularity = pools.popularity
+        likes = pd.DataFrame(
+            {
+                "usuario_id": popularity.ids(rng, "active_users", counts["users"], n),
+                "contenido_id": popularity.ids(rng, targets, counts[targets], n),
+                "tipo_contenido": kind,
+                "fecha_like": random_dates(rng, n),
+                "tipo": pick(rng, TIPOS_LIKE, n),
+                "desde_movil": random_bools(rng, n),
+            }
+        )
+        return {"likes": likes}
 
-# Generar Relaciones de Creación de Reels (CREATED)
-for reel in reels:
-    relationships["created"].append(
-        {
-            "usuario_id": reel["usuario_id"],
-            "reel_id": reel["id"],
-            "fecha_creacion": reel["fecha_publicacion"],
-            "visibilidad": random.choice(["Público", "Privado"]),
-            "ubicacion": random.choice(["Guatemala", "México", "EE.UU", "España"]),
-        }
-    )
+    return generate
 
-# Generar Relaciones de Visualización de Reels (WATCHED)
-for _ in range(2500):
-    u = random.randint(1, users_count)
-    r = random.randint(1, reels_count)
-    relationships["watched"].append(
-        {
-            "usuario_id": u,
-            "reel_id": r,
-            "fecha_vista": fake.date_between(start_date="-5y", end_date="today"),
-            "duracion_vista": random.randint(1, 120),
-            "completo": random.choice([True, False]),
-        }
-    )
 
+def commented_on_chunk(kind, targets):
+    def generate(rng, pools, counts, rows):
+        n = len(rows)
+        popularity = pools.popularity
+        commented_on = pd.DataFrame(
+            {
+                "usuario_id": popularity.ids(rng, "active_users", counts["users"], n),
+                "contenido_id": popularity.ids(rng, targets, counts[targets], n),
+                "tipo_contenido": kind,
+                "fecha_comentario": random_dates(rng, n),
+                "tipo": pick(rng, pools.tipos_comentario, n),
+                "editado": random_bools(rng, n),
+            }
+        )
+        return {"commented_on": commented_on}
+
+    return generate
 
-# Generar Relaciones de Publicación de Posts (POSTED)
-for post in posts:
-    relationships["posted"].append(
+
+def member_of_chunk(rng, pools, counts, rows):
+    # Las primeras 'groups' filas asignan un miembro a cada grupo, de modo que
+    # ningún grupo quede vacío; el resto elige el grupo al azar
+    n = len(rows)
+    groups = counts["groups"]
+    popularity = pools.popularity
+    member_of = pd.DataFrame(
         {
-            "usuario_id": post["usuario_id"],
-            "post_id": post["id"],
-            "fecha_posteo": post["fecha_publicacion"],
-            "visibilidad": random.choice(["Público", "Privado"]),
-            "ubicacion": random.choice(["Guatemala", "México", "EE.UU", "España"]),
+            "usuario_id": popularity.ids(rng, "active_users", counts["users"], n),
+            "grupo_id": np.where(
+                rows < groups, rows + 1, popularity.ids(rng, "groups", groups, n)
+            ),
+            "desde": random_dates(rng, n),
+            "rol": pick(rng, ROLES, n),
+            "activo": random_bools(rng, n),
         }
     )
+    return {"member_of": member_of}
 
-# Generar usuarios influencers NO verificados
-influencers_no_verified = []
-for i in range(influencers_no_verified_count):
-    influencers_no_verified.append(
+
+def watched_chunk(rng, pools, counts, rows):
+    n = len(rows)
+    popularity = pools.popularity
+    watched = pd.DataFrame(
         {
-            "id": i + 1 + users_count,  # IDs 1 a 150 para no verificados
-            "nombre": fake.name(),
-            "email": fake.email(),
-            "fecha_registro": fake.date_between(start_date="-5y", end_date="today"),
-            "intereses": ";".join(
-                random.sample(
-                    [
-                        "fútbol",
-                        "programación",
-                        "cine",
-                        "música",
-                        "viajes",
-                        "lectura",
-                        "fotografía",
-                        "baloncesto",
-                        "videojuegos",
-                        "historia",
-                        "cocina",
-                        "anime",
-                        "automovilismo",
-                        "ciencia ficción",
-                        "arte digital",
-                        "senderismo",
-                        "astronomía",
-                        "idiomas",
-                        "tecnología",
-                        "eSports",
-                        "diseño gráfico",
-                        "guitarra",
-                        "baile",
-                        "escalada",
-                        "psicología",
-                        "moda",
-                    ],
-                    k=random.randint(1, 4),
-                )
-            ),
+            "usuario_id": popularity.ids(rng, "active_users", counts["users"], n),
+            "reel_id": popularity.ids(rng, "reels", counts["reels"], n),
+            "fecha_vista": random_dates(rng, n),
+            "duracion_vista": rng.integers(1, 121, n),
+            "completo": random_bools(rng, n),
         }
     )
-df_influencers_no_verified = pd.DataFrame(influencers_no_verified)
-df_influencers_no_verified.to_csv(f"{output_dir}/influencers_no.csv", index=False)
-
-# Generar usuarios influencers VERIFICADOS
-influencers_verified = []
-# Para evitar conflicto de IDs, se asigna un offset (por ejemplo, a partir del 151)
-for i in range(influencers_verified_count):
-    influencers_verified.append(
+    return {"watched": watched}
+
+
+def follows_influencers_chunk(rng, pools, counts, rows):
+    # 'rows' son influencers: cada uno recibe Popularity.follower_counts
+    # seguidores, elegidos entre los usuarios más activos
+    users = counts["users"]
+    popularity = pools.popularity
+    influencer_ids = rows + 1 + users
+    followers = popularity.follower_counts(rng, len(rows), users)
+    seguido = np.repeat(influencer_ids, followers)
+    n = len(seguido)
+    follows = pd.DataFrame(
         {
-            "id": i + 1 + influencers_no_verified_count + users_count,  # IDs 151 a 300
-            "nombre": fake.name(),
-            "email": fake.email(),
-            "fecha_registro": fake.date_between(start_date="-5y", end_date="today"),
-            "intereses": ";".join(
-                random.sample(
-                    [
-                        "fútbol",
-                        "programación",
-                        "cine",
-                        "música",
-                        "viajes",
-                        "lectura",
-                        "fotografía",
-                        "baloncesto",
-                        "videojuegos",
-                        "historia",
-                        "cocina",
-                        "anime",
-                        "automovilismo",
-                        "ciencia ficción",
-                        "arte digital",
-                        "senderismo",
-                        "astronomía",
-                        "idiomas",
-                        "tecnología",
-                        "eSports",
-                        "diseño gráfico",
-                        "guitarra",
-                        "baile",
-                        "escalada",
-                        "psicología",
-                        "moda",
-                    ],
-                    k=random.randint(1, 4),
-                )
+            "usuario_id": popularity.ids(rng, "active_users", users, n),
+            "seguido_id": seguido,
+            "desde": random_dates(rng, n),
+            "interaccion_frecuencia": pick(rng, FRECUENCIAS, n),
+            "razón": "Interés en su contenido",
+            "estado": np.where(
+                seguido > users + counts["influencers_no"], "Verified", "No Verified"
             ),
         }
     )
-df_influencers_verified = pd.DataFrame(influencers_verified)
-df_influencers_verified.to_csv(f"{output_dir}/influencers_verified.csv", index=False)
+    # Un influencer no recibe dos veces al mismo seguidor
+    follows = follows.drop_duplicates(subset=["usuario_id", "seguido_id"])
+    return {"follows_influencers": follows}
+
+
+def scaled_counts(scale):
+    counts = {
+        name: max(1, round(count * scale))
+        for name, count in {**NODE_COUNTS, **RELATIONSHIP_COUNTS}.items()
+    }
+    counts["users"] = max(counts["users"], 2)  # las relaciones necesitan dos
+    # Cada grupo recibe al menos un miembro
+    counts["member_of"] = max(counts["member_of"], counts["groups"])
+    counts["influencers"] = counts["influencers_no"] + counts["influencers_verified"]
+    return counts
+
+
+# Archivos que escriben los generadores (sin extensión)
+OUTPUT_FILES = [
+    "users",
+    "influencers_no",
+    "influencers_verified",
+    "posts",
+    "comments",
+    "reels",
+    "groups",
+    "friends",
+    "follows",
+    "follows_influencers",
+    "mentions",
+    "likes",
+    "commented_on",
+    "belongs_to",
+    "member_of",
+    "created",
+    "watched",
+    "posted",
+]
+
+
+def tasks(counts):
+    """[(nombre, filas, generador)] en el orden en que se escriben."""
+    return [
+        ("users", counts["users"], users_chunk("users", lambda c: 0)),
+        ("posts", counts["posts"], posts_chunk),
+        ("comments", counts["comments"], comments_chunk),
+        ("groups", counts["groups"], groups_chunk),
+        ("reels", counts["reels"], reels_chunk),
+        ("friends", counts["friends"], friends_chunk),
+        ("follows", counts["follows"], follows_chunk),
+        ("mentions", counts["mentions"], mentions_chunk),
+        ("likes_post", counts["likes_post"], likes_chunk("Post", "posts")),
+        (
+            "likes_comment",
+            counts["likes_comment"],
+            likes_chunk("Comment", "comments"),
+        ),
+        ("likes_reel", counts["likes_reel"], likes_chunk("Reel", "reels")),
+        (
+            "commented_on_post",
+            counts["commented_on_post"],
+            commented_on_chunk("Post", "posts"),
+        ),
+        (
+            "commented_on_reel",
+            counts["commented_on_reel"],
+            commented_on_chunk("Reel", "reels"),
+        ),
+        ("member_of", counts["member_of"], member_of_chunk),
+        ("watched", counts["watched"], watched_chunk),
+        (
+            "influencers_no",
+            counts["influencers_no"],
+            users_chunk("influencers_no", lambda c: c["users"]),
+        ),
+        (
+            "influencers_verified",
+            counts["influencers_verified"],
+            users_chunk(
+                "influencers_verified",
+                lambda c: c["users"] + c["influencers_no"],
+            ),
+        ),
+        ("follows_influencers", counts["influencers"], follows_influencers_chunk),
+    ]
 
 
-# Guardar relaciones en CSV
-for rel, data in relationships.items():
-    df_rel = pd.DataFrame(data)
-    df_rel.to_csv(f"{output_dir}/{rel}.csv", index=False)
+class CsvFormat:
+    """Escritura de los shards en CSV y su concatenación en un solo archivo."""
 
-print("Archivos CSV con relaciones generados correctamente ✅")
+    extension = ".csv"
 
+    def write(self, name, df, path):
+        df.to_csv(path, index=False)
 
-# Reinicializar la lista de follows para influencers
-follows_influencers = []
+    def concatenate(self, parts, path):
+        # Los bytes de cada shard se copian tal cual, sin su encabezado
+        with open(path, "wb") as out:
+            for i, part in enumerate(parts):
+                with open(part, "rb") as f:
+                    if i:
+                        f.readline()
+                    shutil.copyfileobj(f, out)
 
-# Obtener IDs de influencers de cada grupo
-influencer_no_verified_ids = df_influencers_no_verified["id"].tolist()
-influencer_verified_ids = df_influencers_verified["id"].tolist()
-# Unir ambos conjuntos (total 200)
-all_influencer_ids = influencer_no_verified_ids + influencer_verified_ids
 
-for influencer_id in all_influencer_ids:
-    # Seleccionar un número aleatorio de seguidores entre 5 y 15
-    num_followers = random.randint(5, 15)
-    # Candidatos: usuarios con IDs del 1 al 1500
-    candidate_followers = list(range(1, users_count + 1))
-    # Evitar que el influencer se siga a sí mismo (en caso de que su ID esté en ese rango)
-    if influencer_id in candidate_followers:
-        candidate_followers.remove(influencer_id)
-    followers = random.sample(candidate_followers, num_followers)
+# Columnas con listas separadas por ';', que en Parquet son listas de strings
+LIST_COLUMNS = {
+    "users": ["intereses"],
+    "influencers_no": ["intereses"],
+    "influencers_verified": ["intereses"],
+    "comments": ["reacciones"],
+    "reels": ["hashtags"],
+    "commented_on": ["tipo"],
+}
 
-    # Determinar el estado de verificación del influencer
-    verified_status = (
-        "Verified" if influencer_id in influencer_verified_ids else "No Verified"
+# Filas por grupo de filas (row group) de los archivos Parquet
+ROW_GROUP_SIZE = 100000
+
+
+class ParquetFormat:
+    """
+    Escritura en Parquet (requiere pyarrow): las columnas de LIST_COLUMNS son
+    listas y las fechas son date32, en lugar de texto. Al concatenar, los shards
+    se reparten en grupos de row_group_size filas.
+    """
+
+    extension = ".parquet"
+
+    def __init__(self, row_group_size=ROW_GROUP_SIZE):
+        if pa is None:
+            raise RuntimeError(
+                "--format parquet requiere pyarrow (pip install pyarrow)"
+            )
+        self.row_group_size = row_group_size
+
+    def write(self, name, df, path):
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        for i, field in enumerate(table.schema):
+            column = table.column(i)
+            if pa.types.is_timestamp(field.type):
+                column = column.cast(pa.date32())
+            elif field.name in LIST_COLUMNS.get(name, ()):
+                # split en C++ sobre toda la columna, sin recorrer las filas
+                column = pc.split_pattern(column, ";")
+            table = table.set_column(i, field.name, column)
+        pq.write_table(table, path, row_group_size=self.row_group_size)
+
+    def concatenate(self, parts, path):
+        # Un shard a la vez en memoria; lo que no completa un grupo se guarda
+        # para el siguiente, así todos los grupos salvo el último son iguales
+        writer, pending = None, None
+        try:
+            for part in parts:
+                table = pq.read_table(part)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                table = table.cast(writer.schema)
+                if pending is not None:
+                    table = pa.concat_tables([pending, table])
+                full = len(table) - len(table) % self.row_group_size
+                if full:
+                    writer.write_table(
+                        table.slice(0, full), row_group_size=self.row_group_size
+                    )
+                pending = table.slice(full)
+            if pending is not None and len(pending):
+                writer.write_table(pending)
+        finally:
+            if writer is not None:
+                writer.close()
+
+
+FORMATS = {"csv": CsvFormat, "parquet": ParquetFormat}
+
+
+def shard_dir(output_dir, name):
+    # docs/likes.csv se escribe primero como docs/likes/part-NNNNNN.csv
+    return os.path.join(output_dir, name)
+
+
+def shard_path(output_dir, name, shard_index, fmt):
+    return os.path.join(
+        shard_dir(output_dir, name), f"part-{shard_index:06d}{fmt.extension}"
     )
 
-    for follower in followers:
-        follows_influencers.append(
-            {
-                "usuario_id": follower,
-                "seguido_id": influencer_id,
-                "desde": fake.date_between(start_date="-5y", end_date="today"),
-                "interaccion_frecuencia": random.choice(
-                    ["Diaria", "Semanal", "Mensual", "Ocasional"]
-                ),
-                "razón": "Interés en su contenido",
-                "estado": verified_status,  # Se asigna Verified o No Verified
-            }
-        )
 
-df_follows = pd.DataFrame(follows_influencers)
-df_follows.to_csv(f"{output_dir}/follows_influencers.csv", index=False)
-print("Archivo follows_influencers.csv generado correctamente")
+def plan_shards(counts, chunk_size):
+    """
+    [(tarea, shard, primera fila, fin)]: cada tarea se divide en shards de a lo
+    sumo chunk_size filas, numerados en orden a lo largo de todas las tareas.
+    """
+    shards = []
+    for task_index, (_, total, _) in enumerate(tasks(counts)):
+        for first in range(0, total, chunk_size):
+            shards.append(
+                (task_index, len(shards), first, min(first + chunk_size, total))
+            )
+    return shards
+
+
+# Estado de cada proceso del pool (ver init_worker)
+_worker = {}
+
+
+def init_worker(pools, counts, output_dir, fmt, seed):
+    _worker.update(
+        pools=pools,
+        counts=counts,
+        tasks=tasks(counts),
+        output_dir=output_dir,
+        fmt=fmt,
+        seed=seed,
+    )
 
 
-print(
-    "Archivos CSV para influencers (verificados y no verificados) y relaciones follows generados correctamente ✅"
-)
+def run_shard(shard):
+    """
+    Genera un shard y escribe su parte de cada archivo. La semilla es la base
+    (42) más el número de shard, por lo que el resultado es el mismo sin importar
+    cuántos procesos se usen ni en qué orden terminen. Retorna (tarea,
+    {archivo: filas}).
+    """
+    task_index, shard_index, first, last = shard
+    _, _, chunk_fn = _worker["tasks"][task_index]
+    rng = np.random.default_rng(_worker["seed"] + shard_index)
+    rows = np.arange(first, last)
+    written = {}
+    output_dir, fmt = _worker["output_dir"], _worker["fmt"]
+    for name, df in chunk_fn(rng, _worker["pools"], _worker["counts"], rows).items():
+        fmt.write(name, df, shard_path(output_dir, name, shard_index, fmt))
+        written[name] = len(df)
+    return task_index, written
+
+
+def generate(
+    scale,
+    output_dir,
+    chunk_size,
+    workers=1,
+    keep_shards=False,
+    fmt="csv",
+    seed=SEED,
+    distribution=ZIPF,
+    exponent=1.0,
+    row_group_size=ROW_GROUP_SIZE,
+):
+    # Solo Parquet reparte las filas en grupos
+    fmt = ParquetFormat(row_group_size) if fmt == "parquet" else CsvFormat()
+    counts = scaled_counts(scale)
+    task_list = tasks(counts)
+    # Se eliminan las salidas anteriores, concatenadas o por shards y en
+    # cualquier formato, para que load_graph no lea archivos de otra ejecución
+    for name in OUTPUT_FILES:
+        for other in FORMATS.values():
+            target = os.path.join(output_dir, name + other.extension)
+            if os.path.exists(target):
+                os.remove(target)
+        shutil.rmtree(shard_dir(output_dir, name), ignore_errors=True)
+        os.makedirs(shard_dir(output_dir, name))
+
+    # Con pocas filas no hace falta un pool más grande que la tabla de usuarios
+    popularity = Popularity(counts, distribution, exponent, seed)
+    pools = Pools(seed, min(POOL_SIZE, counts["users"]), popularity)
+    shards = plan_shards(counts, chunk_size)
+    initargs = (pools, counts, output_dir, fmt, seed)
+
+    start = time.perf_counter()
+    rows_by_task = [0] * len(task_list)
+    if workers > 1:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=init_worker, initargs=initargs
+        ) as pool:
+            results = list(pool.map(run_shard, shards))
+    else:
+        init_worker(*initargs)
+        results = [run_shard(shard) for shard in shards]
+    for task_index, written in results:
+        rows_by_task[task_index] += sum(written.values())
+    for (name, _, _), rows in zip(task_list, rows_by_task):
+        print(f"{name}: {rows} filas")
+
+    if not keep_shards:
+        for name in OUTPUT_FILES:
+            directory = shard_dir(output_dir, name)
+            parts = sorted(
+                os.path.join(directory, part) for part in os.listdir(directory)
+            )
+            fmt.concatenate(parts, os.path.join(output_dir, name + fmt.extension))
+            shutil.rmtree(directory)
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"Archivos generados correctamente en {output_dir} ✅ "
+        f"({sum(rows_by_task)} filas en {elapsed:.1f} s, {workers} procesos)"
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Genera los CSV de nodos y relaciones de la red social."
+    )
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1,
+        help="Factor de escala de las cantidades (por defecto 1: 1500 usuarios).",
+    )
+    parser.add_argument(
+        "--output",
+        default="./docs",
+        help="Carpeta de salida (por defecto ./docs).",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=100000,
+        help="Filas por shard (por defecto 100000).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Procesos que generan shards en paralelo (por defecto, uno por CPU).",
+    )
+    parser.add_argument(
+        "--keep-shards",
+        action="store_true",
+        help=(
+            "Dejar cada archivo como una carpeta con un part-NNNNNN por shard "
+            "(por ejemplo docs/likes/part-000012.csv) en lugar de concatenarlos."
+        ),
+    )
+    parser.add_argument(
+        "--distribution",
+        choices=DISTRIBUTIONS,
+        default=ZIPF,
+        help=(
+            "Cómo se eligen los extremos de follows, likes, commented_on, watched "
+            "y member_of (por defecto zipf)."
+        ),
+    )
+    parser.add_argument(
+        "--zipf-exponent",
+        type=float,
+        default=1.0,
+        help="Exponente de la distribución zipf (por defecto 1.0).",
+    )
+    parser.add_argument(
+        "--format",
+        choices=list(FORMATS),
+        default="csv",
+        help=(
+            "Formato de los archivos (por defecto csv). parquet requiere pyarrow y "
+            "guarda las listas y fechas con su tipo."
+        ),
+    )
+    parser.add_argument(
+        "--row-group-size",
+        type=int,
+        default=ROW_GROUP_SIZE,
+        help=f"Filas por grupo de filas en Parquet (por defecto {ROW_GROUP_SIZE}).",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    generate(
+        args.scale,
+        args.output,
+        args.chunk_size,
+        args.workers,
+        args.keep_shards,
+        fmt=args.format,
+        distribution=args.distribution,
+        exponent=args.zipf_exponent,
+        row_group_size=args.row_group_size,
+    )